@@ -0,0 +1,57 @@
+"""
+Benchmark of the branch rollouts of JSBSimEnv.rollout_branches: branch steps per second of K branches of H steps from
+one snapshot with the env get_state / set_state loop, in the calling process and with 1 to --max-workers worker
+processes of a BranchRolloutPool.
+"""
+import argparse
+import os
+import time
+import numpy as np
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.branch_rollout import BranchRolloutPool
+
+
+def get_set_state_loop(env, actions):
+    state = env.get_state()
+    for branch in actions:
+        env.set_state(state)
+        for action in branch:
+            _, _, done, _ = env.step(action)
+            if done:
+                break
+    env.set_state(state)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--branches", type=int, default=64, help="K")
+    parser.add_argument("--horizon", type=int, default=50, help="H")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args()
+
+    env = JSBSimEnv(args.task)
+    env.seed(0)
+    env.reset()
+    snapshot = env.sim.save_snapshot()
+    low, high = env.task.get_action_bounds()
+    actions = np.random.default_rng(0).uniform(low, high, (args.branches, args.horizon, len(low)))
+    nb_steps = args.branches * args.horizon * args.number
+
+    start = time.perf_counter()
+    for _ in range(args.number):
+        get_set_state_loop(env, actions)
+    results = [("get_state / set_state loop", nb_steps / (time.perf_counter() - start))]
+    for num_workers in [0] + [2 ** i for i in range(args.max_workers.bit_length()) if 2 ** i <= args.max_workers]:
+        pool = BranchRolloutPool(args.task, num_workers=num_workers)
+        pool.rollout(snapshot, actions[:, :1])  # starts the simulations of the workers
+        start = time.perf_counter()
+        for _ in range(args.number):
+            pool.rollout(snapshot, actions)
+        results.append((f"rollout, {num_workers} workers", nb_steps / (time.perf_counter() - start)))
+        pool.close()
+    env.close()
+
+    for name, steps_per_s in results:
+        print(f"{name:28s} {steps_per_s:8.0f} branch steps/s")
@@ -0,0 +1,63 @@
+"""
+Import time benchmark of gym_jsbsim, measured with python -X importtime in fresh interpreters. Reports the cumulative
+import time of gym_jsbsim, the part spent in gym_jsbsim itself (without gym, which registration needs) and the
+heaviest modules it loads. Exits with an error if a task module, jsbsim, shapely or geographiclib is imported, or if
+--max-ms is given and the own import time of gym_jsbsim exceeds it.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+DEFERRED_MODULES = ("jsbsim", "shapely", "geographiclib", "gym_jsbsim.envs.taxi_utils")
+
+
+def measure_import(module):
+    """
+    Imports a module in a new interpreter.
+
+    :param module: name of the module
+
+    :return: dict mapping the names of the imported modules to their cumulative import time in us
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:  # header line
+            pass
+    return times
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of heaviest modules listed")
+    parser.add_argument("--max-ms", type=float, default=None, help="maximum own import time of gym_jsbsim")
+    args = parser.parse_args()
+
+    runs = [measure_import("gym_jsbsim") for _ in range(args.repeat)]
+    total = statistics.median(times["gym_jsbsim"] for times in runs) / 1000
+    gym = statistics.median(times.get("gym.envs.registration", 0) for times in runs) / 1000
+    own = total - gym
+    print(f"import gym_jsbsim  total: {total:7.1f} ms  gym: {gym:7.1f} ms  gym_jsbsim: {own:7.1f} ms")
+
+    times = runs[-1]
+    for name in sorted(times, key=times.get, reverse=True)[: args.top]:
+        print(f"  {times[name] / 1000:7.1f} ms  {name}")
+
+    errors = [
+        name
+        for name in times
+        if name.endswith("_task") or any(name == m or name.startswith(m + ".") for m in DEFERRED_MODULES)
+    ]
+    if errors:
+        sys.exit("modules imported by import gym_jsbsim: " + ", ".join(sorted(errors)))
+    if args.max_ms is not None and own > args.max_ms:
+        sys.exit(f"gym_jsbsim import time {own:.1f} ms exceeds {args.max_ms} ms")
@@ -0,0 +1,60 @@
+"""
+Benchmark of the startup time and peak memory of N environments created in one process, with and without
+the process-wide SimulationPool. Each mode runs in its own process so that peak RSS is measured separately.
+The environments are created, reset and closed a first time, then created and reset again,
+as a trainer rebuilding its environments would do.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import gym_jsbsim
+
+
+def startup(task_name, nb_envs, use_pool):
+    pool = gym_jsbsim.SIMULATION_POOL if use_pool else None
+    pool_size = gym_jsbsim.SIMULATION_POOL.max_size
+    gym_jsbsim.SIMULATION_POOL.resize(max(pool_size, nb_envs))
+
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        envs = [gym_jsbsim.make(f"GymJsbsim-{task_name}-v0", pool=pool) for _ in range(nb_envs)]
+        for env in envs:
+            env.reset()
+        timings.append(time.perf_counter() - start)
+        for env in envs:
+            env.close()
+
+    return {
+        "first_startup_s": timings[0],
+        "second_startup_s": timings[1],
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--envs", type=int, default=32)
+    parser.add_argument("--pool", choices=["yes", "no"])
+    args = parser.parse_args()
+
+    if args.pool:
+        print(json.dumps(startup(args.task, args.envs, args.pool == "yes")))
+    else:
+        for pool in ["no", "yes"]:
+            out = subprocess.run(
+                [sys.executable, __file__, "--task", args.task, "--envs", str(args.envs), "--pool", pool],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                universal_newlines=True,
+                check=True,
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(
+                f"pool={pool:3s} envs={args.envs}  first startup: {result['first_startup_s']:6.2f} s  "
+                f"second startup: {result['second_startup_s']:6.2f} s  peak RSS: {result['peak_rss_mb']:7.1f} MB"
+            )
@@ -0,0 +1,46 @@
+"""
+Benchmark of reset prefetching: reset latency percentiles and steps per second of a JSBSimEnv running short episodes,
+without prefetching and with spare simulations prepared by the prefetcher thread, cold and warm.
+"""
+import argparse
+import time
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+
+
+def run(task, warm_reset, prefetch, episodes, episode_steps, seed):
+    env = JSBSimEnv(task, warm_reset=warm_reset, prefetch=prefetch)
+    env.seed(seed)
+    action = np.mean(env.task.get_action_bounds(), axis=0)
+    env.reset()
+    env.reset_latencies.clear()
+    start = time.perf_counter()
+    for _ in range(episodes):
+        for _ in range(episode_steps):
+            env.step(action)
+        env.reset()
+    steps_per_s = episodes * episode_steps / (time.perf_counter() - start)
+    latencies = env.get_reset_latencies((50, 99, 100))
+    env.close()
+    return steps_per_s, latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--episodes", type=int, default=50)
+    parser.add_argument("--episode-steps", type=int, default=100)
+    parser.add_argument("--prefetch", type=int, default=1, help="number of spare simulations")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    task = gym_jsbsim.TASKS[args.task]
+    for warm_reset in (False, True):
+        for prefetch in (0, args.prefetch):
+            steps_per_s, latencies = run(task, warm_reset, prefetch, args.episodes, args.episode_steps, args.seed)
+            name = f"{'warm' if warm_reset else 'cold'} reset, prefetch={prefetch}"
+            print(
+                f"{name:28s} {steps_per_s:8.0f} steps/s  reset p50 {latencies[50]:7.2f} ms  "
+                f"p99 {latencies[99]:7.2f} ms  max {latencies[100]:7.2f} ms"
+            )
@@ -0,0 +1,38 @@
+"""
+Prints the profile of the steps of a task (time per phase and the most expensive property getters) and the steps per
+second of the environment with and without profiling.
+"""
+import argparse
+import time
+import gym_jsbsim
+
+
+def run_steps(task_name, nb_steps, profile):
+    env = gym_jsbsim.make(f"GymJsbsim-{task_name}-v0", profile=profile)
+    env.reset()
+    action = [0.0] * len(env.unwrapped.task.get_action_var())
+    start = time.perf_counter()
+    for _ in range(nb_steps):
+        _, _, done, _ = env.step(action)
+        if done:
+            env.reset()
+    steps_per_second = nb_steps / (time.perf_counter() - start)
+    profile = env.get_profile() if profile else None
+    env.close()
+    return steps_per_second, profile
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--top", type=int, default=10, help="number of property getters listed")
+    args = parser.parse_args()
+
+    disabled, _ = run_steps(args.task, args.steps, False)
+    enabled, profile = run_steps(args.task, args.steps, True)
+    print(f"profiling disabled: {disabled:8.0f} steps/s  enabled: {enabled:8.0f} steps/s")
+    for table in ("phases", "properties"):
+        print(table)
+        for name, measure in list(profile[table].items())[: args.top]:
+            print(f"  {name:40s} {measure['time'] * 1e6 / measure['count']:8.1f} us x {measure['count']}")
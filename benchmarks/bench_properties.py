@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of Simulation.get_property_value/set_property_value, comparing the accessors resolved once per
+Simulation (JSBSim property node, bounds and update function) with the former path dispatching on the property type
+and looking up the JSBSim property by name at every call.
+"""
+import argparse
+import timeit
+import gym_jsbsim
+from gym_jsbsim import Catalog as c
+from gym_jsbsim.catalogs.property import Property, CustomProperty
+from gym_jsbsim.simulation import Simulation
+
+
+def by_name_get_property_value(sim, prop):
+    if isinstance(prop, Property):
+        if prop.access == "R":
+            if prop.update:
+                prop.update(sim)
+        return sim.jsbsim_exec.get_property_value(prop.name_jsbsim)
+    elif isinstance(prop, CustomProperty):
+        return prop.read(sim)
+
+
+def by_name_set_property_value(sim, prop, value):
+    if isinstance(prop, Property):
+        if value < prop.min:
+            value = prop.min
+        elif value > prop.max:
+            value = prop.max
+        sim.jsbsim_exec.set_property_value(prop.name_jsbsim, value)
+        if "W" in prop.access:
+            if prop.update:
+                prop.update(sim)
+    elif isinstance(prop, CustomProperty):
+        return prop.write(sim, value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    sim = Simulation(init_conditions=gym_jsbsim.TASKS["HeadingControlTask"].init_conditions)
+    cases = [
+        ("get position_h_sl_ft", c.position_h_sl_ft, None),
+        ("get delta_heading (update)", c.delta_heading, None),
+        ("set fcs_aileron_cmd_norm", c.fcs_aileron_cmd_norm, 0.1),
+        ("set fcs_throttle_cmd_norm (update)", c.fcs_throttle_cmd_norm, 0.5),
+    ]
+    for name, prop, value in cases:
+        if value is None:
+            before = timeit.timeit(lambda: by_name_get_property_value(sim, prop), number=args.number)
+            after = timeit.timeit(lambda: sim.get_property_value(prop), number=args.number)
+        else:
+            before = timeit.timeit(lambda: by_name_set_property_value(sim, prop, value), number=args.number)
+            after = timeit.timeit(lambda: sim.set_property_value(prop, value), number=args.number)
+        print(
+            f"{name:36s} before: {args.number / before:10.0f} calls/s  after: {args.number / after:10.0f} calls/s  "
+            f"speedup: {before / after:4.1f}x"
+        )
+    sim.close()
@@ -0,0 +1,56 @@
+"""
+Benchmark of the overhead of recording the task output properties at each step of a JSBSimEnv: steps per second
+without recording, with Python lists of get_property_values, and with the EpisodeRecorder of the "csv" render mode.
+"""
+import argparse
+import tempfile
+import time
+import gym_jsbsim
+from gym_jsbsim.recorder import CSV, NPZ
+
+
+def steps_per_second(task_name, nb_steps, record=None, **kwargs):
+    env = gym_jsbsim.make(f"GymJsbsim-{task_name}-v0")
+    env.reset()
+    action = [0.0, 0.0, 0.0, 0.8]
+    output = env.unwrapped.task.get_output()
+    telemetry = []
+    start = time.perf_counter()
+    for _ in range(nb_steps):
+        _, _, done, _ = env.step(action)
+        if done:
+            env.reset()
+        if record == "lists":
+            sim = env.unwrapped.sim
+            telemetry.append(sim.get_property_values(output))
+        elif record == "recorder":
+            env.render(mode="csv", **kwargs)
+    env.close()  # waits for the recorder to write the episode
+    return nb_steps / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--decimation", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="the best of repeat runs is kept")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        configurations = {
+            "no recording": dict(record=None),
+            "lists": dict(record="lists"),
+            **{
+                f"recorder {file_format}": dict(
+                    record="recorder", directory=directory, file_format=file_format, decimation=args.decimation
+                )
+                for file_format in (CSV, NPZ)
+            },
+        }
+        results = {name: 0 for name in configurations}
+        for _ in range(args.repeat):
+            for name, kwargs in configurations.items():
+                results[name] = max(results[name], steps_per_second(args.task, args.steps, **kwargs))
+    for name, value in results.items():
+        print(f"{name:15s} {value:8.0f} steps/s  overhead: {100 * (results['no recording'] / value - 1):5.1f}%")
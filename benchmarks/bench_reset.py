@@ -0,0 +1,30 @@
+"""
+Benchmark of the number of resets per second of JSBSimEnv, with a new simulation built at each reset (cold)
+or with the loaded simulation sent back to its initial conditions (warm).
+"""
+import argparse
+import time
+import gym_jsbsim
+
+
+def resets_per_second(task_name, warm_reset, nb_resets=100):
+    env = gym_jsbsim.make(f"GymJsbsim-{task_name}-v0", warm_reset=warm_reset)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(nb_resets):
+        env.reset()
+    elapsed = time.perf_counter() - start
+    env.close()
+    return nb_resets / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", nargs="*", default=list(gym_jsbsim.TASKS))
+    parser.add_argument("--resets", type=int, default=100)
+    args = parser.parse_args()
+
+    for task_name in args.tasks:
+        cold = resets_per_second(task_name, False, args.resets)
+        warm = resets_per_second(task_name, True, args.resets)
+        print(f"{task_name:30s} cold: {cold:8.1f} resets/s   warm: {warm:8.1f} resets/s   speedup: {warm / cold:5.1f}x")
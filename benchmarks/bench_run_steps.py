@@ -0,0 +1,45 @@
+"""
+Benchmark of Simulation.run_steps: time of a JSBSim integration step alone, in run_steps, and in run_steps recording
+a trace of the task reward properties, to show the share of the Python loop in the sub-steps of an agent step.
+"""
+import argparse
+import time
+import gym_jsbsim
+
+
+def microseconds_per_step(func, nb_steps, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) * 1e6 / (nb_steps * number)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--nb-steps", type=int, default=20, help="integration steps per call")
+    parser.add_argument("--number", type=int, default=500)
+    args = parser.parse_args()
+
+    env = gym_jsbsim.make(f"GymJsbsim-{args.task}-v0").unwrapped
+    env.reset()
+    sim = env.sim
+    trace = env.task.get_reward_var()
+    jsbsim_run = sim.jsbsim_exec.run
+
+    def run_only():
+        for _ in range(args.nb_steps):
+            jsbsim_run()
+
+    results = [
+        ("jsbsim run", microseconds_per_step(run_only, args.nb_steps, args.number)),
+        ("run_steps", microseconds_per_step(lambda: sim.run_steps(args.nb_steps), args.nb_steps, args.number)),
+        (
+            f"run_steps + trace of {len(trace)} properties",
+            microseconds_per_step(lambda: sim.run_steps(args.nb_steps, trace), args.nb_steps, args.number),
+        ),
+    ]
+    env.close()
+
+    for name, duration in results:
+        print(f"{name:40s} {duration:7.2f} us/step")
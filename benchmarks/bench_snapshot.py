@@ -0,0 +1,38 @@
+"""
+Benchmark of the number of snapshots saved and restored per second by a JSBSimEnv, compared with the property
+dictionaries of get_state and set_state.
+"""
+import argparse
+import time
+import gym_jsbsim
+
+
+def calls_per_second(func, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return number / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--number", type=int, default=1000)
+    args = parser.parse_args()
+
+    env = gym_jsbsim.make(f"GymJsbsim-{args.task}-v0").unwrapped
+    env.reset()
+    for _ in range(10):
+        env.step(env.action_space.sample())
+
+    state = env.get_state()
+    snapshot = env.save_snapshot()
+    get_state = calls_per_second(env.get_state, args.number)
+    set_state = calls_per_second(lambda: env.set_state(state), args.number)
+    save_snapshot = calls_per_second(env.save_snapshot, args.number)
+    restore_snapshot = calls_per_second(lambda: env.restore_snapshot(snapshot), args.number)
+    env.close()
+
+    print(f"{len(state)} properties in get_state, {snapshot.state.size + snapshot.values.size} values in a snapshot")
+    print(f"save     get_state: {get_state:8.0f} /s  save_snapshot:    {save_snapshot:8.0f} /s")
+    print(f"restore  set_state: {set_state:8.0f} /s  restore_snapshot: {restore_snapshot:8.0f} /s")
@@ -0,0 +1,46 @@
+"""
+Benchmark of the throughput of JSBSimSubprocVectorEnv from 1 to 64 worker processes.
+Each worker runs --envs-per-worker simulations, so the number of simulations grows with the number of workers
+and the steps per second (summed over all simulations) should grow close to linearly up to the number of cores.
+"""
+import argparse
+import os
+import time
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim.jsbsim_subproc_vector_env import JSBSimSubprocVectorEnv
+
+
+def steps_per_second(task_name, num_workers, envs_per_worker, nb_steps):
+    num_envs = num_workers * envs_per_worker
+    env = JSBSimSubprocVectorEnv(gym_jsbsim.TASKS[task_name], num_envs=num_envs, num_workers=num_workers)
+    try:
+        env.reset()
+        random_state = np.random.RandomState(0)
+        low, high = env.action_space.low, env.action_space.high
+        actions = [random_state.uniform(low, high) for _ in range(nb_steps)]
+        start = time.perf_counter()
+        for action in actions:
+            env.step(action)
+        elapsed = time.perf_counter() - start
+    finally:
+        env.close()
+    return num_envs * nb_steps / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--envs-per-worker", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cpus")
+    reference = None
+    for num_workers in args.workers:
+        result = steps_per_second(args.task, num_workers, args.envs_per_worker, args.steps)
+        reference = reference or result / num_workers
+        print(
+            f"workers: {num_workers:3d}  steps/s: {result:10.1f}  efficiency: {result / (reference * num_workers):5.2f}"
+        )
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark of taxi_path.update_path2, comparing the centerline preprocessed into NumPy segment arrays and a grid
+(vectorized distances and local east-north bearings) with the former path building shapely Points, computing one
+WGS84 geodesic per point and the distance to the whole centerline LineString.
+"""
+import argparse
+import random
+import timeit
+from shapely.geometry import Point
+from gym_jsbsim.envs.taxi_utils import taxi_path, get_bearing
+
+
+def shapely_update_path2(path, aircraft_loc, aircraft_heading, id_path, nb_point):
+    next_point = False
+    output = []
+    id_path = min(id_path, len(path.centerlinepoints) - 1)
+
+    angle_basic = aircraft_heading - get_bearing(aircraft_loc, path.centerlinepoints[id_path])
+    angle_basic360 = (abs(angle_basic) + 360) % 360
+    angle_ac_nextpoint = min(angle_basic360, 360 - angle_basic360)
+
+    if Point(aircraft_loc).distance(Point(path.centerlinepoints[id_path])) * 100000 < 1 or angle_ac_nextpoint > 60:
+        next_point = True
+        my_points_state = path.centerlinepoints[
+            id_path + 1 : min(id_path + nb_point + 1, len(path.centerlinepoints) - 1)
+        ]
+    else:
+        my_points_state = path.centerlinepoints[id_path : min(id_path + nb_point, len(path.centerlinepoints) - 1)]
+    for p in my_points_state:
+        output.append([p, Point(aircraft_loc).distance(Point(p)) * 100000, get_bearing(aircraft_loc, p)])
+
+    path.shortest_dist = path.centerline.distance(Point(aircraft_loc)) * 100000
+    return output, next_point
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=10000)
+    parser.add_argument("--points", type=int, default=8, help="number of next centerline points")
+    args = parser.parse_args()
+
+    path = taxi_path()
+    rng = random.Random(0)
+    states = []
+    for _ in range(args.number):
+        i = rng.randrange(len(path.centerlinepoints))
+        long, lat = path.centerlinepoints[i]
+        states.append(((long + rng.gauss(0, 1e-4), lat + rng.gauss(0, 1e-4)), rng.uniform(0, 360), i))
+
+    before = timeit.timeit(
+        lambda: [shapely_update_path2(path, loc, heading, i, args.points) for loc, heading, i in states], number=1
+    )
+    after = timeit.timeit(
+        lambda: [path.update_path2(loc, heading, i, args.points) for loc, heading, i in states], number=1
+    )
+    print(
+        f"update_path2  before: {args.number / before:8.0f} calls/s  after: {args.number / after:8.0f} calls/s  "
+        f"speedup: {before / after:4.1f}x"
+    )
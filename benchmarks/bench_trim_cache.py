@@ -0,0 +1,46 @@
+"""
+Benchmark of the trim cache: time of Simulation.reset running the initial conditions and the engines steady state,
+restoring the state from a TrimCache in memory, and loading it from the files of the cache (a cache of another
+worker), for the initial conditions of a task.
+"""
+import argparse
+import tempfile
+import time
+import gym_jsbsim
+from gym_jsbsim.simulation import Simulation
+from gym_jsbsim.trim_cache import TrimCache
+
+
+def milliseconds_per_reset(sim, init_conditions, number, before_reset=None):
+    duration = 0.0
+    for _ in range(number):
+        if before_reset is not None:
+            before_reset()
+        start = time.perf_counter()
+        sim.reset(init_conditions)
+        duration += time.perf_counter() - start
+    return duration * 1000 / number
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    task = gym_jsbsim.TASKS[args.task]()
+    init_conditions = task.get_initial_conditions()
+    with tempfile.TemporaryDirectory() as path:
+        cache = TrimCache(path=path)
+        sim = Simulation(task.aircraft_name, init_conditions, task.jsbsim_freq, task.agent_interaction_steps)
+        results = [("run_ic + steady state", milliseconds_per_reset(sim, init_conditions, args.number))]
+        sim.trim_cache = cache
+        sim.reset(init_conditions)
+        results.append(("trim cache hit, memory", milliseconds_per_reset(sim, init_conditions, args.number)))
+        results.append(
+            ("trim cache hit, file", milliseconds_per_reset(sim, init_conditions, args.number, cache.clear))
+        )
+        sim.close()
+
+    for name, duration in results:
+        print(f"{name:28s} {duration:6.3f} ms/reset")
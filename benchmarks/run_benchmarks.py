@@ -0,0 +1,210 @@
+"""
+Benchmark suite of the registered tasks: for each task and each jsbsim_freq / agent_interaction_steps configuration,
+steps per second of a JSBSimEnv, cold and warm reset latency, steps per second of a JSBSimVectorEnv and peak RSS,
+plus the import time of gym_jsbsim. Each configuration runs in its own process so that its peak RSS is measured
+separately. Actions are drawn from a seeded random generator (or fixed) so that runs are reproducible.
+
+The results are written as JSON. With --compare, they are compared with the results of a previous run and the
+script fails if a throughput drops (or a latency grows) by more than --tolerance.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import numpy as np
+
+# measures of a configuration where higher is better, the others are latencies and memory
+THROUGHPUTS = ("steps_per_s", "vector_steps_per_s")
+
+
+def make_task(task_name, jsbsim_freq, agent_interaction_steps):
+    import gym_jsbsim
+
+    task = gym_jsbsim.TASKS[task_name]
+    attributes = {}
+    if jsbsim_freq is not None:
+        attributes["jsbsim_freq"] = jsbsim_freq
+    if agent_interaction_steps is not None:
+        attributes["agent_interaction_steps"] = agent_interaction_steps
+    return type(task.__name__, (task,), attributes) if attributes else task
+
+
+def make_policy(low, high, policy, seed):
+    """
+    :return: function returning the next action, an np.array of the shape of low
+    """
+    if policy == "fixed":
+        action = (low + high) / 2
+        return lambda: action
+    random_state = np.random.RandomState(seed)
+    return lambda: random_state.uniform(low, high)
+
+
+def benchmark_configuration(args):
+    from gym_jsbsim.jsbsim_env import JSBSimEnv
+    from gym_jsbsim.jsbsim_vector_env import JSBSimVectorEnv
+
+    task = make_task(args.task, args.jsbsim_freq, args.agent_interaction_steps)
+    result = {
+        "task": args.task,
+        "jsbsim_freq": task.jsbsim_freq,
+        "agent_interaction_steps": task.agent_interaction_steps,
+    }
+
+    env = JSBSimEnv(task)
+    start = time.perf_counter()
+    env.reset()
+    result["first_reset_ms"] = (time.perf_counter() - start) * 1000
+    policy = make_policy(*env.task.get_action_bounds(), args.policy, args.seed)
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        _, _, done, _ = env.step(policy())
+        if done:
+            env.reset()
+    result["steps_per_s"] = args.steps / (time.perf_counter() - start)
+    for name, warm_reset in [("cold_reset_ms", False), ("warm_reset_ms", True)]:
+        env.warm_reset = warm_reset
+        start = time.perf_counter()
+        for _ in range(args.resets):
+            env.reset()
+        result[name] = (time.perf_counter() - start) * 1000 / args.resets
+    env.close()
+
+    env = JSBSimVectorEnv(task, num_envs=args.num_envs)
+    env.reset()
+    low, high = env.task.get_action_bounds()
+    policy = make_policy(np.tile(low, (args.num_envs, 1)), np.tile(high, (args.num_envs, 1)), args.policy, args.seed)
+    nb_steps = max(1, args.steps // args.num_envs)
+    start = time.perf_counter()
+    for _ in range(nb_steps):
+        env.step(policy())
+    result["vector_steps_per_s"] = args.num_envs * nb_steps / (time.perf_counter() - start)
+    env.close()
+
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def run_configuration(args, task_name, jsbsim_freq, agent_interaction_steps):
+    command = [sys.executable, __file__, "--worker", "--task", task_name, "--policy", args.policy]
+    for option in ("steps", "resets", "num_envs", "seed"):
+        command += ["--" + option.replace("_", "-"), str(getattr(args, option))]
+    if jsbsim_freq is not None:
+        command += ["--jsbsim-freq", str(jsbsim_freq)]
+    if agent_interaction_steps is not None:
+        command += ["--agent-interaction-steps", str(agent_interaction_steps)]
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if process.returncode != 0:
+        return {
+            "task": task_name,
+            "jsbsim_freq": jsbsim_freq,
+            "agent_interaction_steps": agent_interaction_steps,
+            "error": process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "failed",
+        }
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def get_key(result):
+    return result["task"], result["jsbsim_freq"], result["agent_interaction_steps"]
+
+
+def compare(results, reference, tolerance):
+    """
+    Prints the ratios of the measures of results to the reference ones.
+
+    :return: list of str, the regressions larger than tolerance
+    """
+    regressions = []
+    if reference.get("import_ms") and results.get("import_ms"):
+        ratio = results["import_ms"] / reference["import_ms"]
+        print(f"import time: {ratio:5.2f}x")
+        if ratio > 1 + tolerance:
+            regressions.append(f"import time {ratio:.2f}x")
+    reference_results = {get_key(result): result for result in reference["results"]}
+    for result in results["results"]:
+        previous = reference_results.get(get_key(result))
+        if previous is None or "error" in result or "error" in previous:
+            continue
+        ratios = []
+        for name, value in result.items():
+            if name in ("task", "jsbsim_freq", "agent_interaction_steps") or not previous.get(name):
+                continue
+            ratio = value / previous[name]
+            ratios.append(f"{name} {ratio:5.2f}x")
+            if ratio < 1 - tolerance if name in THROUGHPUTS else ratio > 1 + tolerance:
+                regressions.append(f"{get_key(result)} {name} {ratio:.2f}x")
+        print(f"{str(get_key(result)):60s} " + "  ".join(ratios))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", nargs="*", default=None, help="defaults to all the registered tasks")
+    parser.add_argument("--jsbsim-freqs", type=int, nargs="*", default=[None], help="defaults to the task one")
+    parser.add_argument("--interaction-steps", type=int, nargs="*", default=[None], help="defaults to the task one")
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--resets", type=int, default=20)
+    parser.add_argument("--num-envs", type=int, default=8)
+    parser.add_argument("--policy", choices=["random", "fixed"], default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON file of the results, printed if not given")
+    parser.add_argument("--compare", default=None, help="JSON file of the results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    # a single configuration, run in a worker process
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--task", help=argparse.SUPPRESS)
+    parser.add_argument("--jsbsim-freq", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--agent-interaction-steps", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(benchmark_configuration(args)))
+        return
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from bench_import import measure_import
+    import jsbsim
+    import gym_jsbsim
+
+    import_ms = float(np.median([measure_import("gym_jsbsim")["gym_jsbsim"] for _ in range(3)])) / 1000
+    results = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "jsbsim": jsbsim.__version__,
+            "gym_jsbsim": getattr(gym_jsbsim, "__version__", None),
+            "args": {name: value for name, value in vars(args).items() if name not in ("worker", "task")},
+        },
+        "import_ms": import_ms,
+        "results": [],
+    }
+    print(f"import gym_jsbsim: {import_ms:.1f} ms", file=sys.stderr)
+    for task_name in args.tasks or list(gym_jsbsim.TASKS):
+        for jsbsim_freq in args.jsbsim_freqs:
+            for agent_interaction_steps in args.interaction_steps:
+                result = run_configuration(args, task_name, jsbsim_freq, agent_interaction_steps)
+                results["results"].append(result)
+                print(json.dumps(result), file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit("regressions: " + ", ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
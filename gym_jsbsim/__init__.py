@@ -1,3 +1,4 @@
+import importlib
 import os
 
 try:
@@ -5,8 +6,6 @@ try:
 except ImportError:
     pass
 
-from jsbsim import __version__ as jsbsim_version
-
 from gym.envs.registration import registry, register, make, spec
 from gym_jsbsim.envs import TASKS
 from gym_jsbsim.catalogs import Catalog
@@ -25,9 +24,6 @@ with OpenAI Gym so that they can be instantiated with a gym.make(id)
        env = gym.make('GymJsbsim-{task}-v0')
 
 """
-if __jsbsim_version__ != jsbsim_version:
-    print("Warning: You are using jsbsim-{} while gym-jsbsin was generated with {}".format(jsbsim_version, __jsbsim_version__))
-
 if "JSBSIM_ROOT_DIR" not in os.environ:
     os.environ["JSBSIM_ROOT_DIR"] = os.path.join(os.path.dirname(__file__), "jsbsim-" + __jsbsim_version__)
 
@@ -35,5 +31,22 @@ for task_name in TASKS:
     register(
         id=f"GymJsbsim-{task_name}-v0",
         entry_point="gym_jsbsim.jsbsim_env:JSBSimEnv",
-        kwargs=dict(task=TASKS[task_name]),
+        kwargs=dict(task=task_name),  # the task module is only imported by make
     )
+
+# modules importing jsbsim, loaded on first access
+LAZY_ATTRIBUTES = {
+    "SimulationPool": "gym_jsbsim.simulation_pool",
+    "SIMULATION_POOL": "gym_jsbsim.simulation_pool",
+    "JSBSimVectorEnv": "gym_jsbsim.jsbsim_vector_env",
+    "JSBSimSubprocVectorEnv": "gym_jsbsim.jsbsim_subproc_vector_env",
+    "SnapshotStore": "gym_jsbsim.snapshot_store",
+    "TrimCache": "gym_jsbsim.trim_cache",
+    "BranchRolloutPool": "gym_jsbsim.branch_rollout",
+}
+
+
+def __getattr__(name):
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(LAZY_ATTRIBUTES[name]), name)
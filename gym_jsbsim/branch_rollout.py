@@ -0,0 +1,266 @@
+import multiprocessing
+import os
+import pickle
+import traceback
+import numpy as np
+from gym_jsbsim.envs import get_task
+from gym_jsbsim.simulation import Simulation
+
+# answers of the workers
+DONE = b"d"
+ERROR = b"e"
+
+
+def get_simulations(task, sims, n):
+    """
+
+    Gets n simulations of a task, adding new ones to sims if it has less. The simulations of another aircraft or
+
+    frequency, e.g. of a task changed since the last rollout, are closed and replaced.
+
+    :param task: Task
+
+    :param sims: list of Simulation, kept warm from a rollout to the next one
+
+    :param n: number of simulations
+
+    :return: list of n Simulation
+
+    """
+    for sim in sims:
+        if sim.aircraft_name != task.aircraft_name or sim.jsbsim_freq != task.jsbsim_freq:
+            sim.close()
+    sims[:] = [sim for sim in sims if sim.jsbsim_exec is not None]
+    while len(sims) < n:
+        sims.append(
+            Simulation(
+                aircraft_name=task.aircraft_name,
+                init_conditions=task.get_initial_conditions(),
+                jsbsim_freq=task.jsbsim_freq,
+            )
+        )
+    props = task.get_catalog_props()
+    for sim in sims:
+        sim.agent_interaction_steps = task.agent_interaction_steps
+        sim.set_catalog(props)
+        sim.taxi_path = task.taxi_path
+    return sims[:n]
+
+
+def rollout_branches(task, sims, snapshot, actions, seed):
+    """
+
+    Runs K branches from a snapshot, each with its sequence of H actions, the simulations of sims in turn.
+
+    A branch stops at its first terminal state, as an episode of JSBSimVectorEnv: its next observations repeat
+
+    the terminal one (not clipped), its next rewards are 0 and its next dones are True. The terminal conditions of
+
+    the task are only checked for the branches inside the observation bounds.
+
+    Each group of len(sims) branches is a batch of the task: the running statistics of its rewards (see
+
+    Task.reset_batch) start with the branches, and a stopped branch keeps its slot in the batch so that they stay
+
+    those of its branch.
+
+    :param task: Task
+
+    :param sims: list of Simulation, at least one, restored from the snapshot by each group of len(sims) branches
+
+    :param snapshot: gym_jsbsim.simulation.Snapshot the branches start from
+
+    :param actions: np.array of shape (K, H, n_actions)
+
+    :param seed: int, the random events of the task are drawn from a generator of this seed in every branch,
+
+        so that the branches only differ by their actions
+
+    :return: (observations of shape (K, H, n_obs), rewards of shape (K, H), dones of shape (K, H))
+
+    """
+    observation_var, action_var, reward_var = task.get_observation_var(), task.get_action_var(), task.get_reward_var()
+    observation_low, observation_high = task.get_observation_bounds()
+    nb_branches, horizon = actions.shape[:2]
+    observations = np.zeros((nb_branches, horizon, len(observation_var)))
+    rewards = np.zeros((nb_branches, horizon))
+    dones = np.zeros((nb_branches, horizon), dtype=bool)
+    values = np.empty((len(sims), len(reward_var)))
+
+    for start in range(0, nb_branches, len(sims)):
+        branches = np.arange(start, min(start + len(sims), nb_branches))
+        group_sims = sims[: len(branches)]
+        for sim in group_sims:
+            sim.restore_snapshot(snapshot)
+            sim.np_random = np.random.default_rng(seed)
+        task.reset_batch(len(branches))
+        # the values of a stopped branch stay those of its terminal state
+        group_values = {prop: values[: len(branches), k] for k, prop in enumerate(reward_var)}
+        running = np.ones(len(branches), dtype=bool)
+        for t in range(horizon):
+            for j in np.flatnonzero(running):
+                i, sim = branches[j], group_sims[j]
+                sim.set_property_values_from(action_var, actions[i, t])
+                sim.run()
+                sim.get_property_values_into(observation_var, observations[i, t])
+                sim.get_property_values_into(reward_var, values[j])
+            reward = task.get_reward_batch(group_values, group_sims)
+            rewards[branches[running], t] = reward[running]
+            state = observations[branches, t]
+            is_contained = ((state >= observation_low) & (state <= observation_high)).all(axis=1)
+            done = running & ~is_contained
+            index = np.flatnonzero(running & is_contained)
+            if len(index):
+                contained_values = {prop: value[index] for prop, value in group_values.items()}
+                done[index] = task.is_terminal_batch(contained_values, [group_sims[j] for j in index])
+            for i in branches[done]:
+                dones[i, t:] = True
+                observations[i, t + 1 :] = observations[i, t]
+            running &= ~done
+            if not running.any():
+                break
+    return observations, rewards, dones
+
+
+def worker(pipe):
+    """
+
+    Runs the rollouts sent by a BranchRolloutPool on simulations kept warm between them.
+
+    """
+    sims = []
+    try:
+        while True:
+            message = pipe.recv()
+            if message is None:
+                break
+            task, snapshot, actions, seed, nb_sims = message
+            try:
+                task = pickle.loads(task)
+                result = rollout_branches(task, get_simulations(task, sims, nb_sims), snapshot, actions, seed)
+                pipe.send((DONE, result))
+            except Exception:
+                pipe.send((ERROR, traceback.format_exc()))
+    finally:
+        for sim in sims:
+            sim.close()
+        pipe.close()
+
+
+class BranchRolloutPool:
+    """
+
+    A pool of worker processes running branches from a snapshot, e.g. the candidate action sequences of a model
+
+    predictive controller or the children of a search tree node.
+
+    The K branches of a rollout are split in contiguous groups, one per worker. Each worker restores the snapshot in
+
+    its simulations, kept warm from one rollout to the next, and runs its branches; the JSBSim bindings hold the GIL,
+
+    so the branches run in parallel in processes, not threads. The snapshot is restored through the initial
+
+    conditions without the past derivatives of the integrators (see Simulation.restore_snapshot): every branch
+
+    starts from the same state, unlike get_state / set_state which go through state_to_ic.
+
+    The task is sent to the workers, pickled, with each rollout: the branches follow its current configuration,
+
+    e.g. its taxi_path or the variables of define_state and define_action.
+
+    """
+
+    def __init__(self, task, num_workers=None, sims_per_worker=8, context=None):
+        """
+
+        Constructor. Starts the workers.
+
+        :param task: the Task instance of the branches, or a Task subclass or the name of a task of gym_jsbsim.TASKS
+
+        :param num_workers: number of worker processes, defaults to the number of cpus. With 0, the branches run
+
+            in the calling process
+
+        :param sims_per_worker: maximum number of simulations of a worker, its branches run in groups of this size
+
+        :param context: multiprocessing start method, defaults to the platform one
+
+        """
+        task = get_task(task)
+        self.task = task() if isinstance(task, type) else task
+        self.num_workers = (os.cpu_count() or 1) if num_workers is None else num_workers
+        self.sims_per_worker = sims_per_worker
+        self.sims = []  # simulations of the rollouts run in the calling process
+        self.pipes = []
+        self.processes = []
+        ctx = multiprocessing.get_context(context)
+        for _ in range(self.num_workers):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(target=worker, args=(child_pipe,), daemon=True)
+            process.start()
+            child_pipe.close()
+            self.pipes.append(parent_pipe)
+            self.processes.append(process)
+        self.closed = False
+
+    def rollout(self, snapshot, actions, seed=0):
+        """
+
+        Runs K branches from a snapshot, see rollout_branches.
+
+        :param snapshot: gym_jsbsim.simulation.Snapshot of a simulation of the task aircraft
+
+        :param actions: np.array of shape (K, H, n_actions)
+
+        :param seed: int, seed of the random events of the task, the same in every branch
+
+        :return: (observations of shape (K, H, n_obs), rewards of shape (K, H), dones of shape (K, H))
+
+        """
+        actions = np.asarray(actions, dtype=float)
+        if not (actions.ndim == 3 and actions.shape[2] == len(self.task.get_action_var())):
+            raise ValueError("actions must be of shape (K, H, n_actions)")
+        if snapshot.aircraft_name != self.task.aircraft_name:
+            raise ValueError(f"snapshot of {snapshot.aircraft_name} for a task of {self.task.aircraft_name}")
+        if not self.pipes:
+            sims = get_simulations(self.task, self.sims, min(len(actions), self.sims_per_worker))
+            return rollout_branches(self.task, sims, snapshot, actions, seed)
+
+        # pickled once, before anything is sent, so that a task that cannot be pickled fails here
+        task = pickle.dumps(self.task)
+        groups = [group for group in np.array_split(actions, len(self.pipes)) if len(group)]
+        for pipe, group in zip(self.pipes, groups):
+            pipe.send((task, snapshot, group, seed, min(len(group), self.sims_per_worker)))
+        results, errors = [], []
+        for pipe, _ in zip(self.pipes, groups):
+            answer, result = pipe.recv()
+            if answer == ERROR:
+                errors.append(result)
+            else:
+                results.append(result)
+        if errors:
+            raise RuntimeError("Error in BranchRolloutPool worker:\n" + errors[0])
+        return tuple(np.concatenate(arrays) for arrays in zip(*results))
+
+    def close(self):
+        """ Stops the workers and closes the simulations. """
+        if self.closed:
+            return
+        self.closed = True
+        for pipe in self.pipes:
+            try:
+                pipe.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for pipe in self.pipes:
+            pipe.close()
+        for sim in self.sims:
+            sim.close()
+        self.sims.clear()
+
+    def __del__(self):
+        self.close()
@@ -1,4 +1,9 @@
+import hashlib
+import json
+import os
 import re
+from collections.abc import Mapping
+from enum import Enum
 from gym_jsbsim.catalogs.property import Property
 from gym_jsbsim.catalogs.jsbsim_catalog import JsbsimCatalog
 from gym_jsbsim.catalogs.my_catalog import MyCatalog
@@ -14,11 +19,19 @@ class DynamicCatalog(dict):
     def __getitem__(self, name):
         try:
             return super().__getitem__(name)
-        except KeyError:  # look for the property in MyCatalog and JsbsimCatalog
+        except KeyError:  # look for the property in MyCatalog, JsbsimCatalog and the loaded aircraft
             try:
                 self[name] = MyCatalog[name].value
             except KeyError:
-                self[name] = JsbsimCatalog[name].value
+                try:
+                    self[name] = JsbsimCatalog[name].value
+                except KeyError:
+                    for catalog in JSBSIM_CATALOGS.values():
+                        if name in catalog:
+                            self[name] = catalog[name]
+                            break
+                    else:
+                        raise
         return super().__getitem__(name)
 
     def __getattr__(self, name):
@@ -29,19 +42,251 @@ class DynamicCatalog(dict):
 
         Add to Catalog jsbsim properties from jbsbsim_props
 
-        :param jsbsim_props: list of 'name_jsbsim (access)' of jsbsim properties
+        :param jsbsim_props: list of 'name_jsbsim (access)' of jsbsim properties, or str of one per line
 
         """
-        for jsbsim_prop in jsbsim_props:
-            [name_jsbsim, access] = jsbsim_prop.split(" ")
-            access = re.sub(r"[\(\)]", "", access)  # remove parenthesis from the flag
-            name = re.sub(r"_$", "", re.sub(r"[\-/\]\[]+", "_", name_jsbsim))  # get property name from jsbsim name
+        for name, (name_jsbsim, access) in parse_jsbsim_props(jsbsim_props).items():
             if name not in self:
-                try:
-                    self[name] = JsbsimCatalog[name].value
-                except KeyError:
-                    self[name] = Property(name_jsbsim=name_jsbsim, access=access)
+                self[name] = make_jsbsim_property(name, name_jsbsim, access)
+
+
+class JsbsimPropertyCatalog(Mapping):
+    """
+
+    A read-only catalog of the JSBSim properties of an aircraft. A Property is only created at the first access
+
+    to its name.
+
+    """
+
+    def __init__(self, jsbsim_props):
+        """
+
+        :param jsbsim_props: dict mapping names to (name_jsbsim, access) of the JSBSim properties
+
+        """
+        self.jsbsim_props = jsbsim_props
+        self.props = {}
+
+    def __getitem__(self, name):
+        prop = self.props.get(name)
+        if prop is None:
+            name_jsbsim, access = self.jsbsim_props[name]
+            prop = self.props[name] = make_jsbsim_property(name, name_jsbsim, access)
+        return prop
+
+    def __contains__(self, name):
+        return name in self.jsbsim_props
+
+    def __iter__(self):
+        return iter(self.jsbsim_props)
+
+    def __len__(self):
+        return len(self.jsbsim_props)
+
+
+class CatalogView(Mapping):
+    """
+
+    A read-only view of a shared catalog of JSBSim properties extended with the properties of a task,
+
+    which take precedence over the shared ones of the same name
+
+    """
+
+    def __init__(self, base, props=()):
+        """
+
+        :param base: mapping of names to Properties, shared and not modified
+
+        :param props: list of Properties
+
+        """
+        self.base = base
+        self.props = {get_property_name(prop): prop for prop in props}
+
+    def __getitem__(self, name):
+        try:
+            return self.props[name]
+        except KeyError:
+            return self.base[name]
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __iter__(self):
+        yield from self.props
+        for name in self.base:
+            if name not in self.props:
+                yield name
+
+    def __len__(self):
+        return len(self.base) + sum(1 for name in self.props if name not in self.base)
+
+
+def get_property_name(prop):
+    """
+
+    Get the name of a property in the catalogs: its name in MyCatalog or JsbsimCatalog, else the name derived from
+
+    its JSBSim name
+
+    :param prop: Property
+
+    :return: str
+
+    """
+    if isinstance(prop, Enum):
+        return prop.name
+    name = PROPERTY_NAMES.get(prop)
+    if name is None:
+        name = get_name(prop.name_jsbsim)
+    return name
+
+
+def get_name(name_jsbsim):
+    """ Get the catalog name of a JSBSim property from its JSBSim name, a str. """
+    name = NAME_SEPARATORS.sub("_", name_jsbsim)
+    return name[:-1] if name.endswith("_") else name
+
+
+def parse_jsbsim_props(jsbsim_props):
+    """
+
+    Parse the output of FGFDMExec.query_property_catalog
+
+    :param jsbsim_props: list of 'name_jsbsim (access)' of jsbsim properties, or str of one per line
+
+    :return: dict mapping names to (name_jsbsim, access), in the order of jsbsim_props
+
+    """
+    if isinstance(jsbsim_props, str):
+        jsbsim_props = jsbsim_props.splitlines()
+    props = {}
+    for jsbsim_prop in jsbsim_props:
+        name_jsbsim, _, access = jsbsim_prop.rpartition(" ")
+        if name_jsbsim:
+            props.setdefault(get_name(name_jsbsim), (name_jsbsim, access.strip("()")))
+    return props
+
+
+def make_jsbsim_property(name, name_jsbsim, access):
+    """ Get the Property of JsbsimCatalog named name, else create it from its JSBSim name and access flag. """
+    try:
+        return JsbsimCatalog[name].value
+    except KeyError:
+        return Property(name_jsbsim=name_jsbsim, access=access)
+
+
+def get_catalog_file_key(aircraft_name, root_dir):
+    """
+
+    Get the key of the catalog cache file of an aircraft, a hash of the JSBSim version, the JSBSim root directory and
+
+    the size and modification time of the XML files of the aircraft, engine and systems directories, so that the file
+
+    is not read after one of them changed.
+
+    :param aircraft_name: name of the aircraft
+
+    :param root_dir: JSBSim root directory, with the aircraft, engine and systems directories
+
+    :return: str
+
+    """
+    import jsbsim
+
+    key = hashlib.sha1(f"{jsbsim.__version__}:{os.path.realpath(root_dir)}:{aircraft_name}".encode())
+    filenames = []
+    for dirpath, _, files in os.walk(os.path.join(root_dir, "aircraft", aircraft_name)):
+        filenames.extend(os.path.join(dirpath, f) for f in files if f.endswith(".xml"))
+    for directory in ("engine", "systems"):
+        path = os.path.join(root_dir, directory)
+        if os.path.isdir(path):
+            filenames.extend(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".xml"))
+    for filename in sorted(filenames):
+        stat = os.stat(filename)
+        key.update(f"{os.path.relpath(filename, root_dir)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return key.hexdigest()[:16]
+
+
+def get_jsbsim_catalog(aircraft_name, jsbsim_exec, cache_dir=None):
+    """
+
+    Get the JSBSim properties of an aircraft. They are collected once per process, JSBSim version and root directory,
+
+    from the catalog cache file of the aircraft if it exists, else from its first loaded JSBSim instance.
+
+    :param aircraft_name: name of the aircraft loaded in jsbsim_exec
+
+    :param jsbsim_exec: jsbsim.FGFDMExec, before its initial conditions are run
+
+    :param cache_dir: directory of the catalog cache files, defaults to CATALOG_CACHE_DIR
+
+    :return: JsbsimPropertyCatalog
+
+    """
+    import jsbsim
+
+    root_dir = os.fspath(jsbsim_exec.get_root_dir())
+    key = (jsbsim.__version__, root_dir, aircraft_name)
+    catalog = JSBSIM_CATALOGS.get(key)
+    if catalog is not None:
+        return catalog
+
+    cache_dir = cache_dir or CATALOG_CACHE_DIR
+    filename = None
+    if cache_dir:
+        try:
+            filename = os.path.join(
+                cache_dir, f"catalog-{aircraft_name}-{get_catalog_file_key(aircraft_name, root_dir)}.json"
+            )
+        except OSError:
+            pass
+    jsbsim_props = None
+    if filename and os.path.exists(filename):
+        try:
+            with open(filename) as f:
+                jsbsim_props = {name: tuple(value) for name, value in json.load(f).items()}
+        except (OSError, ValueError):
+            jsbsim_props = None
+    if jsbsim_props is None:
+        jsbsim_props = parse_jsbsim_props(jsbsim_exec.query_property_catalog(""))
+        if filename:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                # write then rename so that concurrent processes never read a partial file
+                tmp_filename = f"{filename}.{os.getpid()}.tmp"
+                with open(tmp_filename, "w") as f:
+                    json.dump(jsbsim_props, f)
+                os.replace(tmp_filename, filename)
+            except OSError:
+                pass
+
+    catalog = JSBSIM_CATALOGS[key] = JsbsimPropertyCatalog(jsbsim_props)
+    return catalog
+
+
+# names of the properties of MyCatalog and JsbsimCatalog
+PROPERTY_NAMES = {
+    **{prop.value: name for name, prop in JsbsimCatalog.__members__.items()},
+    **{prop.value: name for name, prop in MyCatalog.__members__.items()},
+}
+
+# separators of the JSBSim property names replaced in the catalog names
+NAME_SEPARATORS = re.compile(r"[\-/\]\[]+")
+
+# (JSBSim version, JSBSim root directory, aircraft name) -> JsbsimPropertyCatalog, shared by all the simulations of
+# the process
+JSBSIM_CATALOGS = {}
 
+# directory of the JSBSim property catalog cache files, in the user cache directory, set to None to always query JSBSim
+CATALOG_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "gym_jsbsim"
+)
 
-# an instantiation of DynamicCatalog used for simulation
+# an instantiation of DynamicCatalog used to look up properties by name
 Catalog = DynamicCatalog()
@@ -128,7 +128,8 @@ class JsbsimCatalog(Property, Enum):
         value = sim.get_property_value(prop)
         n = sim.jsbsim_exec.get_propulsion().get_num_engines()
         for i in range(1, n):
-            sim.jsbsim_exec.set_property_value(prop.name_jsbsim + "[" + str(i) + "]", value)
+            _, set_value = sim.get_node(prop.name_jsbsim + "[" + str(i) + "]")
+            set_value(value)
 
     def update_equal_throttle_pos(sim):
         JsbsimCatalog.update_equal_engine_props(sim, JsbsimCatalog.fcs_throttle_pos_norm)
@@ -176,8 +177,8 @@ class JsbsimCatalog(Property, Enum):
     @staticmethod
     def update_equal_brake_props(sim):
         value = sim.get_property_value(JsbsimCatalog.fcs_center_brake_cmd_norm)
-        sim.jsbsim_exec.set_property_value(JsbsimCatalog.fcs_left_brake_cmd_norm.name_jsbsim, value)
-        sim.jsbsim_exec.set_property_value(JsbsimCatalog.fcs_right_brake_cmd_norm.name_jsbsim, value)
+        sim.get_node(JsbsimCatalog.fcs_left_brake_cmd_norm.name_jsbsim)[1](value)
+        sim.get_node(JsbsimCatalog.fcs_right_brake_cmd_norm.name_jsbsim)[1](value)
 
     def update_equal_brake_cmd(sim):
         JsbsimCatalog.update_equal_brake_props(sim)
@@ -2,11 +2,21 @@ from enum import Enum
 from gym.spaces import Box, Discrete
 from gym_jsbsim.catalogs.property import Property
 from gym_jsbsim.catalogs.jsbsim_catalog import JsbsimCatalog
-from gym_jsbsim.envs.taxi_utils import *
 from gym_jsbsim.catalogs import utils
 from numpy.linalg import norm
 
-taxiPath = taxi_path()
+# default centerline followed by the taxi tasks, built by get_taxi_path on first use and shared read-only by the
+# simulations: the position on the path is kept in each simulation id_path and shortest_dist properties
+taxiPath = None
+
+
+def get_taxi_path():
+    global taxiPath
+    if taxiPath is None:
+        from gym_jsbsim.envs.taxi_utils import taxi_path
+
+        taxiPath = taxi_path()
+    return taxiPath
 
 # taxi_freq_state = 30
 
@@ -99,7 +109,8 @@ class MyCatalog(Property, Enum):
 
     def update_da(sim):
         # collect next points
-        df, next_p = taxiPath.update_path2(
+        path = sim.taxi_path if sim.taxi_path is not None else get_taxi_path()
+        df, next_p, shortest_dist = path.get_next_points(
             (
                 sim.get_property_value(JsbsimCatalog.position_long_gc_deg),
                 sim.get_property_value(JsbsimCatalog.position_lat_geod_deg),
@@ -114,7 +125,7 @@ class MyCatalog(Property, Enum):
             sim.set_property_value(MyCatalog.id_path, sim.get_property_value(MyCatalog.id_path) + 1)
 
         # set shortest dist
-        sim.set_property_value(MyCatalog.shortest_dist, taxiPath.shortest_dist)
+        sim.set_property_value(MyCatalog.shortest_dist, shortest_dist)
 
         # set next distance (di) and angles (ai) of the centerlines
         for i in range(1, len(df) + 1):
@@ -172,6 +183,27 @@ class MyCatalog(Property, Enum):
             except:
                 pass
 
+    # target conditions
+
+    target_altitude_ft = Property(
+        "tc/h-sl-ft",
+        "target altitude MSL [ft]",
+        JsbsimCatalog.position_h_sl_ft.min,
+        JsbsimCatalog.position_h_sl_ft.max,
+    )
+    target_heading_deg = Property(
+        "tc/target-heading-deg",
+        "target heading [deg]",
+        JsbsimCatalog.attitude_psi_deg.min,
+        JsbsimCatalog.attitude_psi_deg.max,
+    )
+    target_vg = Property("tc/target-vg", "target ground velocity [ft/s]")
+    target_time = Property("tc/target-time-sec", "target time [sec]", 0)
+    target_latitude_geod_deg = Property("tc/target-latitude-geod-deg", "target geocentric latitude [deg]", -90, 90)
+    target_longitude_geod_deg = Property(
+        "tc/target-longitude-geod-deg", "target geocentric longitude [deg]", -180, 180
+    )
+
     # position and attitude
 
     delta_altitude = Property(
@@ -181,6 +213,7 @@ class MyCatalog(Property, Enum):
         40000,
         access="R",
         update=update_delta_altitude,
+        depends=(target_altitude_ft, JsbsimCatalog.position_h_sl_ft),
     )
     delta_heading = Property(
         "position/delta-heading-to-target-deg",
@@ -189,6 +222,7 @@ class MyCatalog(Property, Enum):
         180,
         access="R",
         update=update_delta_heading,
+        depends=(target_heading_deg, JsbsimCatalog.attitude_psi_deg),
     )
 
     # controls command
@@ -246,27 +280,6 @@ class MyCatalog(Property, Enum):
         update=update_detect_extreme_state,
     )
 
-    # target conditions
-
-    target_altitude_ft = Property(
-        "tc/h-sl-ft",
-        "target altitude MSL [ft]",
-        JsbsimCatalog.position_h_sl_ft.min,
-        JsbsimCatalog.position_h_sl_ft.max,
-    )
-    target_heading_deg = Property(
-        "tc/target-heading-deg",
-        "target heading [deg]",
-        JsbsimCatalog.attitude_psi_deg.min,
-        JsbsimCatalog.attitude_psi_deg.max,
-    )
-    target_vg = Property("tc/target-vg", "target ground velocity [ft/s]")
-    target_time = Property("tc/target-time-sec", "target time [sec]", 0)
-    target_latitude_geod_deg = Property("tc/target-latitude-geod-deg", "target geocentric latitude [deg]", -90, 90)
-    target_longitude_geod_deg = Property(
-        "tc/target-longitude-geod-deg", "target geocentric longitude [deg]", -180, 180
-    )
-
     # following path
 
     steady_flight = Property("steady_flight", "steady flight mode", 0, 1000000)
@@ -274,7 +287,20 @@ class MyCatalog(Property, Enum):
     id_path = Property("id_path", "where I am in the centerline path")
 
     # dist_heading_centerline_matrix = Property('dist_heading_centerline_matrix', 'dist_heading_centerline_matrix', '2D matrix with dist,angle of the next point from the aircraft to 1km (max 10 points)', [0, -45, 0, -45, 0, -45, 0, -45, 0, -45, 0, -45, 0, -45, 0, -45], [1000, 45, 1000, 45, 1000, 45, 1000, 45, 1000, 45, 1000, 45, 1000, 45, 1000, 45])
-    d1 = Property("d1", "d1", 0, 1000, access="R", update=update_da)
+    d1 = Property(
+        "d1",
+        "d1",
+        0,
+        1000,
+        access="R",
+        update=update_da,
+        depends=(
+            JsbsimCatalog.position_long_gc_deg,
+            JsbsimCatalog.position_lat_geod_deg,
+            JsbsimCatalog.attitude_psi_deg,
+            id_path,
+        ),
+    )
     d2 = Property("d2", "d2", 0, 1000, access="R")
     d3 = Property("d3", "d3", 0, 1000, access="R")
     d4 = Property("d4", "d4", 0, 1000, access="R")
@@ -7,8 +7,11 @@ A class to wrap and extend the Property object implemented in JSBSim
 
 """
 
-Property = namedtuple("Property", "name_jsbsim description min max access spaces clipped update")
-Property.__new__.__defaults__ = (None, None, float("-inf"), float("+inf"), "RW", Box, True, None)
+# update: function of the Simulation run when the property is read (access "R") or written (access "W")
+# depends: for a read property, the properties its update function reads. If given, the value is only updated
+#   again after a Simulation run or a write to one of them through the Simulation
+Property = namedtuple("Property", "name_jsbsim description min max access spaces clipped update depends")
+Property.__new__.__defaults__ = (None, None, float("-inf"), float("+inf"), "RW", Box, True, None, None)
 
 CustomProperty = namedtuple("CustomProperty", "name_jsbsim description min max access spaces clipped read write")
 CustomProperty.__new__.__defaults__ = (None, None, float("-inf"), float("+inf"), "RW", Box, False, None, None)
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from os import listdir
 from os import path
 import importlib
@@ -12,8 +13,46 @@ for f in ENVS_FILES:
         name_class = name_file.title().replace("_", "")
         TASKS_NAMES[name_file] = name_class
 
-TASKS = {}
-for f in TASKS_NAMES:
-    module = importlib.import_module("gym_jsbsim.envs." + f)
-    my_class = getattr(module, TASKS_NAMES[f])
-    TASKS[TASKS_NAMES[f]] = my_class
+
+class TaskRegistry(Mapping):
+    """
+
+    A mapping of the task class names to the task classes.
+
+    The *_task modules are only listed at import: a module is imported the first time one of its tasks is looked up.
+
+    """
+
+    def __init__(self, tasks_names):
+        """
+
+        :param tasks_names: dict mapping the *_task module names to the names of their task class
+
+        """
+        self.modules = {name_class: name_file for name_file, name_class in tasks_names.items()}
+
+    def __getitem__(self, name):
+        module = importlib.import_module("gym_jsbsim.envs." + self.modules[name])
+        return getattr(module, name)
+
+    def __iter__(self):
+        return iter(self.modules)
+
+    def __len__(self):
+        return len(self.modules)
+
+
+TASKS = TaskRegistry(TASKS_NAMES)
+
+
+def get_task(task):
+    """
+
+    Gets a task class.
+
+    :param task: a Task subclass, or the name of a task of TASKS
+
+    :return: the Task subclass
+
+    """
+    return TASKS[task] if isinstance(task, str) else task
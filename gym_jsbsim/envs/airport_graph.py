@@ -0,0 +1,345 @@
+import hashlib
+import heapq
+import os
+import struct
+import numpy as np
+from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.envs.taxi_utils import taxi_path, get_bearing, WGS84_A, WGS84_E2
+
+"""
+
+Load the Aerodrome Surface Routing Network (ASRN) of an AMDB (ED-99 airport mapping database) shapefile export
+
+into a compact node/edge graph, cached in a .npz file, and compute taxi routes on it.
+
+"""
+
+# AMDB export of Toulouse-Blagnac, the package ships its routing network layers; another AMDB export can be set in
+# the GYM_JSBSIM_AMDB_DIR environment variable
+AMDB_DIR = os.environ.get(
+    "GYM_JSBSIM_AMDB_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "amdb")
+)
+
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "gym_jsbsim"
+)
+
+# AMDB layers of the routing network
+NODE_LAYER = "AM_AsrnNode"
+EDGE_LAYER = "AM_AsrnEdge"
+
+# AMDB node types
+NODE_HOLDING_POSITION = 1
+NODE_PARKING_STAND = 5
+
+
+def read_shp(filename):
+    """
+    Read the geometries of a shapefile of points or polylines (with or without Z and M values).
+
+    :param filename: path of the .shp file
+    :return: list of np.array of shape (n, 2) of (long,lat), the points of each record (all parts together)
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    geometries = []
+    offset = 100
+    while offset < len(data):
+        _, length = struct.unpack(">ii", data[offset : offset + 8])
+        content = offset + 8
+        (shape_type,) = struct.unpack("<i", data[content : content + 4])
+        if shape_type == 0:
+            points = np.empty((0, 2))
+        elif shape_type in (1, 11, 21):
+            points = np.frombuffer(data, dtype="<f8", count=2, offset=content + 4).reshape(1, 2)
+        elif shape_type in (3, 13, 23):
+            num_parts, num_points = struct.unpack("<ii", data[content + 36 : content + 44])
+            points = np.frombuffer(data, dtype="<f8", count=2 * num_points, offset=content + 44 + 4 * num_parts)
+            points = points.reshape(num_points, 2)
+        else:
+            raise ValueError(f"shape type {shape_type} unhandled in {filename}")
+        geometries.append(points.astype(float))
+        offset = content + 2 * length
+    return geometries
+
+
+def read_dbf(filename, fields=None):
+    """
+    Read the attributes of a dBase file as strings.
+
+    :param filename: path of the .dbf file
+    :param fields: names of the fields to read, defaults to all
+    :return: dict mapping each field name to the list of its values
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    num_records, header_length, record_length = struct.unpack("<IHH", data[4:12])
+    columns = []
+    position = 1  # deletion flag
+    for offset in range(32, header_length - 1, 32):
+        name = data[offset : offset + 11].split(b"\0")[0].decode("ascii")
+        length = data[offset + 16]
+        if fields is None or name in fields:
+            columns.append((name, position, length))
+        position += length
+    values = {name: [] for name, _, _ in columns}
+    for i in range(num_records):
+        record = data[header_length + i * record_length : header_length + (i + 1) * record_length]
+        for name, position, length in columns:
+            values[name].append(record[position : position + length].decode("latin1").strip())
+    return values
+
+
+def polyline_length(points):
+    """
+    :param points: np.array of shape (n, 2) of (long,lat)
+    :return: length in meters, summed over segments in the local east-north plane of their middle
+    """
+    d_long = np.radians(np.diff(points[:, 0]))
+    d_lat = np.radians(np.diff(points[:, 1]))
+    lat_m = np.radians(points[:-1, 1]) + d_lat / 2
+    w2 = 1 - WGS84_E2 * np.sin(lat_m) ** 2
+    east = d_long * WGS84_A / np.sqrt(w2) * np.cos(lat_m)
+    north = d_lat * WGS84_A * (1 - WGS84_E2) / w2 ** 1.5
+    return float(np.hypot(east, north).sum())
+
+
+class AirportGraph(object):
+    """
+    Routing graph of an airport: nodes with their coordinates, type and name, and undirected edges
+
+    with their length and centerline points, all stored in NumPy arrays.
+    """
+
+    def __init__(self, node_coords, node_types, node_names, edge_nodes, edge_lengths, edge_offsets, edge_points):
+        """
+        :param node_coords: np.array of shape (n, 2) of (long,lat)
+        :param node_types: np.array of the AMDB node types
+        :param node_names: np.array of str, the stand or taxiway of each node
+        :param edge_nodes: np.array of shape (m, 2), the indexes of the nodes of each edge
+        :param edge_lengths: np.array of the edge lengths in meters
+        :param edge_offsets: np.array of size m + 1, edge i points are edge_points[edge_offsets[i]:edge_offsets[i+1]]
+        :param edge_points: np.array of shape (p, 2) of (long,lat), from the first to the second node of each edge
+        """
+        self.node_coords = node_coords
+        self.node_types = node_types
+        self.node_names = node_names
+        self.edge_nodes = edge_nodes
+        self.edge_lengths = edge_lengths
+        self.edge_offsets = edge_offsets
+        self.edge_points = edge_points
+
+        # adjacency of the nodes in compressed sparse rows: the edges of node i are
+        # adjacency[adjacency_offsets[i]:adjacency_offsets[i+1]]
+        nodes = np.concatenate([edge_nodes[:, 0], edge_nodes[:, 1]])
+        order = np.argsort(nodes, kind="stable")
+        self.adjacency = (order % len(edge_nodes)).astype(np.int64)
+        self.adjacency_offsets = np.searchsorted(nodes[order], np.arange(len(node_coords) + 1))
+
+    @classmethod
+    def from_amdb(cls, amdb_dir=AMDB_DIR):
+        """
+        Parse the ASRN node and edge layers of an AMDB shapefile export.
+
+        :param amdb_dir: directory of the AMDB layers
+        :return: AirportGraph
+        """
+        nodes = read_dbf(os.path.join(amdb_dir, NODE_LAYER + ".dbf"), ["idnumber", "nodetype", "idnetwrk"])
+        node_geometries = read_shp(os.path.join(amdb_dir, NODE_LAYER + ".shp"))
+        edges = read_dbf(os.path.join(amdb_dir, EDGE_LAYER + ".dbf"), ["node1ref", "node2ref"])
+        edge_geometries = read_shp(os.path.join(amdb_dir, EDGE_LAYER + ".shp"))
+
+        index = {idnumber: i for i, idnumber in enumerate(nodes["idnumber"])}
+        node_coords = np.array([points[0] for points in node_geometries])
+        node_types = np.array([int(t) if t.isdigit() else -1 for t in nodes["nodetype"]], dtype=np.int8)
+        node_names = np.array(nodes["idnetwrk"])
+
+        edge_nodes = []
+        polylines = []
+        for node1, node2, points in zip(edges["node1ref"], edges["node2ref"], edge_geometries):
+            if node1 not in index or node2 not in index or len(points) == 0:
+                continue
+            i, j = index[node1], index[node2]
+            # orient the centerline from the first to the second node
+            if np.hypot(*(points[0] - node_coords[j])) < np.hypot(*(points[0] - node_coords[i])):
+                points = points[::-1]
+            edge_nodes.append((i, j))
+            polylines.append(points)
+
+        edge_offsets = np.cumsum([0] + [len(points) for points in polylines])
+        return cls(
+            node_coords=node_coords,
+            node_types=node_types,
+            node_names=node_names,
+            edge_nodes=np.array(edge_nodes, dtype=np.int64).reshape(-1, 2),
+            edge_lengths=np.array([polyline_length(points) for points in polylines]),
+            edge_offsets=edge_offsets,
+            edge_points=np.concatenate(polylines) if polylines else np.empty((0, 2)),
+        )
+
+    @classmethod
+    def load(cls, filename):
+        """
+        :param filename: path of a .npz file written by AirportGraph.save
+        :return: AirportGraph
+        """
+        with np.load(filename) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    def save(self, filename):
+        """
+        :param filename: path of the .npz file
+        """
+        np.savez(
+            filename,
+            node_coords=self.node_coords,
+            node_types=self.node_types,
+            node_names=self.node_names,
+            edge_nodes=self.edge_nodes,
+            edge_lengths=self.edge_lengths,
+            edge_offsets=self.edge_offsets,
+            edge_points=self.edge_points,
+        )
+
+    def find_nodes(self, name, node_types=(NODE_PARKING_STAND, NODE_HOLDING_POSITION)):
+        """
+        :param name: name of a parking stand or of the taxiway of a holding position
+        :param node_types: AMDB types of the nodes to look for
+        :return: np.array of the indexes of the nodes
+        """
+        return np.flatnonzero((self.node_names == name) & np.isin(self.node_types, node_types))
+
+    def get_edge_points(self, edge, from_node):
+        """
+        :param edge: index of the edge
+        :param from_node: index of the node the edge is traveled from
+        :return: np.array of shape (n, 2) of (long,lat)
+        """
+        points = self.edge_points[self.edge_offsets[edge] : self.edge_offsets[edge + 1]]
+        return points if self.edge_nodes[edge, 0] == from_node else points[::-1]
+
+    def shortest_path(self, sources, targets):
+        """
+        Dijkstra search of the shortest path from any of the sources to any of the targets.
+
+        :param sources: list of node indexes
+        :param targets: list of node indexes
+        :return: (list of node indexes, list of edge indexes) of the path
+        """
+        targets = set(int(target) for target in targets)
+        dist = np.full(len(self.node_coords), np.inf)
+        previous = np.full(len(self.node_coords), -1, dtype=np.int64)  # edge reaching each node
+        queue = []
+        for source in sources:
+            dist[source] = 0
+            queue.append((0.0, int(source)))
+        heapq.heapify(queue)
+        while queue:
+            d, node = heapq.heappop(queue)
+            if d > dist[node]:
+                continue
+            if node in targets:
+                break
+            for edge in self.adjacency[self.adjacency_offsets[node] : self.adjacency_offsets[node + 1]].tolist():
+                i, j = self.edge_nodes[edge]
+                neighbour = int(j if i == node else i)
+                d_neighbour = d + self.edge_lengths[edge]
+                if d_neighbour < dist[neighbour]:
+                    dist[neighbour] = d_neighbour
+                    previous[neighbour] = edge
+                    heapq.heappush(queue, (d_neighbour, neighbour))
+        else:
+            raise ValueError("no route between the nodes")
+
+        nodes, edges = [node], []
+        while previous[node] >= 0 and dist[node] > 0:
+            edge = int(previous[node])
+            i, j = self.edge_nodes[edge]
+            node = int(j if i == node else i)
+            nodes.append(node)
+            edges.append(edge)
+        return nodes[::-1], edges[::-1]
+
+    def route(self, start, goal):
+        """
+        Compute the shortest taxi route between two parking stands or holding positions.
+
+        :param start: name of a parking stand or of the taxiway of a holding position, or node index
+        :param goal: name of a parking stand or of the taxiway of a holding position, or node index
+        :return: list of (long,lat), the centerline points of the route
+        """
+        sources = self.find_nodes(start) if isinstance(start, str) else [start]
+        targets = self.find_nodes(goal) if isinstance(goal, str) else [goal]
+        if len(sources) == 0 or len(targets) == 0:
+            raise ValueError(f"unknown stand or holding position: {start if len(sources) == 0 else goal}")
+        if set(np.ravel(sources).tolist()) & set(np.ravel(targets).tolist()):
+            raise ValueError(f"the route from {start} to {goal} starts at its goal")
+        nodes, edges = self.shortest_path(sources, targets)
+        points = [self.node_coords[nodes[0]][np.newaxis]]
+        for node, edge in zip(nodes, edges):
+            points.append(self.get_edge_points(edge, node)[1:])
+        points = np.concatenate(points)
+        # drop the repeated points at the junctions of the edges
+        keep = np.ones(len(points), dtype=bool)
+        keep[1:] = (np.diff(points, axis=0) != 0).any(axis=1)
+        if keep.sum() < 2:
+            raise ValueError(f"the route from {start} to {goal} has no segment")
+        return [tuple(p) for p in points[keep].tolist()]
+
+    def taxi_path(self, start, goal):
+        """
+        :param start: name of a parking stand or of the taxiway of a holding position, or node index
+        :param goal: name of a parking stand or of the taxiway of a holding position, or node index
+        :return: taxi_path following the route from start to goal
+        """
+        return taxi_path(self.route(start, goal))
+
+
+def get_route_initial_conditions(route):
+    """
+    :param route: list of (long,lat), the centerline points of a route
+    :return: dict mapping the initial position and heading properties to the start of the route, along its first segment
+    """
+    if len(route) < 2:
+        raise ValueError("a route has at least two points")
+    heading = get_bearing(route[0], route[1])
+    return {
+        c.ic_long_gc_deg: route[0][0],
+        c.ic_lat_geod_deg: route[0][1],
+        c.ic_psi_true_deg: heading,
+        c.target_heading_deg: heading,
+    }
+
+
+def load_airport_graph(amdb_dir=AMDB_DIR, cache_dir=CACHE_DIR):
+    """
+    Load the routing graph of an AMDB export, parsing its shapefiles only if the graph is not cached yet.
+
+    The cache file is named after the size and modification time of the layers, so it is rebuilt when they change.
+
+    :param amdb_dir: directory of the AMDB layers
+    :param cache_dir: directory of the .npz cache files, or None to always parse the shapefiles
+    :return: AirportGraph
+    """
+    if cache_dir is None:
+        return AirportGraph.from_amdb(amdb_dir)
+
+    key = hashlib.sha1(os.path.realpath(amdb_dir).encode())
+    for layer in (NODE_LAYER, EDGE_LAYER):
+        for extension in (".shp", ".dbf"):
+            stat = os.stat(os.path.join(amdb_dir, layer + extension))
+            key.update(f"{layer}{extension}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    filename = os.path.join(cache_dir, f"asrn-{key.hexdigest()[:16]}.npz")
+
+    if os.path.exists(filename):
+        return AirportGraph.load(filename)
+    graph = AirportGraph.from_amdb(amdb_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # write then rename so that concurrent workers never read a partial file
+        tmp_filename = f"{filename}.{os.getpid()}.tmp.npz"
+        graph.save(tmp_filename)
+        os.replace(tmp_filename, filename)
+    except OSError:
+        pass
+    return graph
@@ -1,7 +1,7 @@
 from gym_jsbsim.task import Task
 from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.reward_spec import RewardSpec, Term, WEIGHTED_SUM, LAPLACE, laplace
 import math
-import random
 import numpy as np
 
 """
@@ -20,6 +20,16 @@ class ApproachControlTask(Task):
         c.fcs_throttle_cmd_norm,
     ]
 
+    reward_var = [
+        c.delta_heading,
+        c.delta_altitude,
+        c.accelerations_a_pilot_x_ft_sec2,
+        c.accelerations_a_pilot_y_ft_sec2,
+        c.accelerations_a_pilot_z_ft_sec2,
+        c.target_altitude_ft,
+        c.position_h_sl_ft,
+    ]
+
     init_conditions = {
         c.ic_h_sl_ft: 2000,
         c.ic_terrain_elevation_ft: 0,
@@ -42,23 +52,22 @@ class ApproachControlTask(Task):
         c.steady_flight: 150,
     }
 
-    def get_reward(self, state, sim):
-
-        heading_r = math.exp(-math.fabs(sim.get_property_value(c.delta_heading)))
-
-        alt_r = math.exp(-math.fabs(sim.get_property_value(c.delta_altitude)))
-
-        angle_speed_r = math.exp(
-            -(
-                0.1 * math.fabs(sim.get_property_value(c.accelerations_a_pilot_x_ft_sec2))
-                + 0.1 * math.fabs(sim.get_property_value(c.accelerations_a_pilot_y_ft_sec2))
-                + 0.8 * math.fabs(sim.get_property_value(c.accelerations_a_pilot_z_ft_sec2))
-            )
-        )
-
-        reward = 0.4 * heading_r + 0.1 * alt_r + 0.4 * angle_speed_r
-
-        return reward
+    reward_spec = RewardSpec(
+        [
+            laplace(c.delta_heading),
+            laplace(c.delta_altitude),
+            Term(
+                [
+                    (c.accelerations_a_pilot_x_ft_sec2, 1 / 0.1),
+                    (c.accelerations_a_pilot_y_ft_sec2, 1 / 0.1),
+                    (c.accelerations_a_pilot_z_ft_sec2, 1 / 0.8),
+                ],
+                LAPLACE,
+            ),
+        ],
+        weights=[0.4, 0.1, 0.4],
+        combine=WEIGHTED_SUM,
+    )
 
     def is_terminal(self, state, sim):
         sim.set_property_value(c.target_altitude_ft, sim.get_property_value(c.target_altitude_ft) - 1)
@@ -66,3 +75,14 @@ class ApproachControlTask(Task):
             sim.get_property_value(c.target_altitude_ft) < 20
             or math.fabs(sim.get_property_value(c.delta_altitude)) > 5000
         )
+
+    def is_terminal_batch(self, values, sims):
+        """
+        Check terminal states of a batch of simulations, see is_terminal
+        """
+        # the target altitude decreases by 1 foot every step
+        target_altitude = values[c.target_altitude_ft] - 1
+        for sim, value in zip(sims, target_altitude):
+            sim.set_property_value(c.target_altitude_ft, value)
+        delta_altitude = target_altitude - values[c.position_h_sl_ft]
+        return (target_altitude < 20) | (np.fabs(delta_altitude) > 5000)
@@ -2,7 +2,6 @@ from gym_jsbsim.task import Task
 from gym_jsbsim.envs.heading_control_task import HeadingControlTask
 from gym_jsbsim.catalogs.catalog import Catalog as c
 import math
-import random
 import numpy as np
 
 """
@@ -22,11 +21,11 @@ class HeadingAltitudeControlTask(HeadingControlTask):
                 return True
 
             alt_delta = (int(sim.get_property_value(c.steady_flight) / 150) * 100) % 5000
-            sign = random.choice([+1.0, -1.0])
+            sign = sim.np_random.choice([+1.0, -1.0])
             new_alt = sim.get_property_value(c.target_altitude_ft) + sign * alt_delta
 
             angle = int(sim.get_property_value(c.steady_flight) / 150) * 10
-            sign = random.choice([+1.0, -1.0])
+            sign = sim.np_random.choice([+1.0, -1.0])
             new_heading = sim.get_property_value(c.target_heading_deg) + sign * angle
             new_heading = (new_heading + 360) % 360
 
@@ -37,20 +36,29 @@ class HeadingAltitudeControlTask(HeadingControlTask):
 
             sim.set_property_value(c.steady_flight, sim.get_property_value(c.steady_flight) + 150)
 
-        # if acceleration are too high stop the simulation
-        acceleration_limit_x = 2.0  # "g"s
-        acceleration_limit_y = 2.0  # "g"s
-        acceleration_limit_z = 2.0  # "g"s
-        if sim.get_property_value(c.simulation_sim_time_sec) > 10:
-            if (
-                math.fabs(sim.get_property_value(c.accelerations_n_pilot_x_norm)) > acceleration_limit_x
-                or math.fabs(sim.get_property_value(c.accelerations_n_pilot_y_norm)) > acceleration_limit_y
-                or math.fabs(sim.get_property_value(c.accelerations_n_pilot_z_norm) + 1) > acceleration_limit_z
-            ):  # z component is expected to be -1 g
-                return True
+        return Task.is_terminal(self, state, sim)
+
+    def is_terminal_batch(self, values, sims):
+        """
+        Check terminal states of a batch of simulations, see is_terminal
+        """
+        time = values[c.simulation_sim_time_sec]
+        steady_flight = values[c.steady_flight]
+
+        # Change heading and altitude every 150 seconds if the target heading and altitude were reached
+        change = time >= steady_flight
+        terminal = change & ((np.fabs(values[c.delta_heading]) > 10) | (np.fabs(values[c.delta_altitude]) >= 100))
+        for i in np.flatnonzero(change & ~terminal):
+            alt_delta = (int(steady_flight[i] / 150) * 100) % 5000
+            sign = sims[i].np_random.choice([+1.0, -1.0])
+            new_alt = values[c.target_altitude_ft][i] + sign * alt_delta
+
+            angle = int(steady_flight[i] / 150) * 10
+            sign = sims[i].np_random.choice([+1.0, -1.0])
+            new_heading = (values[c.target_heading_deg][i] + sign * angle + 360) % 360
+
+            sims[i].set_property_value(c.target_altitude_ft, max(new_alt, 3000))
+            sims[i].set_property_value(c.target_heading_deg, new_heading)
+            sims[i].set_property_value(c.steady_flight, steady_flight[i] + 150)
 
-        # End up the simulation if the aircraft is on an extreme state
-        # TODO: Is an altitude check needed?
-        return (sim.get_property_value(c.position_h_sl_ft) < 3000) or bool(
-            sim.get_property_value(c.detect_extreme_state)
-        )
+        return terminal | Task.is_terminal_batch(self, values, sims)
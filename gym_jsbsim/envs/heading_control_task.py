@@ -1,7 +1,7 @@
 from gym_jsbsim.task import Task
 from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.reward_spec import RewardSpec, TerminalSpec, Term, Condition, AllOf, AnyOf, gaussian
 import math
-import random
 import numpy as np
 
 """
@@ -31,6 +31,22 @@ class HeadingControlTask(Task):
         c.fcs_throttle_cmd_norm,
     ]
 
+    reward_var = [
+        c.delta_heading,
+        c.delta_altitude,
+        c.attitude_roll_rad,
+        c.velocities_u_fps,
+        c.accelerations_n_pilot_x_norm,
+        c.accelerations_n_pilot_y_norm,
+        c.accelerations_n_pilot_z_norm,
+        c.simulation_sim_time_sec,
+        c.steady_flight,
+        c.target_heading_deg,
+        c.target_altitude_ft,
+        c.position_h_sl_ft,
+        c.detect_extreme_state,
+    ]
+
     init_conditions = {
         c.ic_h_sl_ft: 10000,
         c.ic_terrain_elevation_ft: 0,
@@ -53,43 +69,40 @@ class HeadingControlTask(Task):
         c.steady_flight: 150,
     }
 
-    def get_reward(self, state, sim):
-        """
-        Compute reward for task
-        """
-        # Reward is built as a geometric mean of scaled gaussian rewards for each relevant variable
-
-        heading_error_scale = 5.0  # degrees
-        heading_r = math.exp(-((sim.get_property_value(c.delta_heading) / heading_error_scale) ** 2))
-
-        alt_error_scale = 50.0  # feet
-        alt_r = math.exp(-((sim.get_property_value(c.delta_altitude) / alt_error_scale) ** 2))
-
-        roll_error_scale = 0.35  # radians ~= 20 degrees
-        roll_r = math.exp(-((sim.get_property_value(c.attitude_roll_rad) / roll_error_scale) ** 2))
-
-        speed_error_scale = 16  # fps (~5%)
-        speed_r = math.exp(-(((sim.get_property_value(c.velocities_u_fps) - 800) / speed_error_scale) ** 2))
-
-        # accel scale in "g"s
-        accel_error_scale_x = 0.1
-        accel_error_scale_y = 0.1
-        accel_error_scale_z = 0.5
-        try:
-            accel_r = math.exp(
-                -(
-                    (sim.get_property_value(c.accelerations_n_pilot_x_norm) / accel_error_scale_x) ** 2
-                    + (sim.get_property_value(c.accelerations_n_pilot_y_norm) / accel_error_scale_y) ** 2
-                    + ((sim.get_property_value(c.accelerations_n_pilot_z_norm) + 1) / accel_error_scale_z) ** 2
-                )  # normal value for z component is -1 g
-            ) ** (
-                1 / 3
-            )  # geometric mean
-        except OverflowError:
-            accel_r = 0
-
-        reward = (heading_r * alt_r * accel_r * roll_r * speed_r) ** (1 / 5)
-        return reward
+    # Reward is built as a geometric mean of scaled gaussian rewards for each relevant variable
+    reward_spec = RewardSpec(
+        [
+            gaussian(c.delta_heading, 5.0),  # degrees
+            gaussian(c.delta_altitude, 50.0),  # feet
+            # accel scale in "g"s, normal value for z component is -1 g, geometric mean of the 3 components
+            Term(
+                [
+                    (c.accelerations_n_pilot_x_norm, 0.1),
+                    (c.accelerations_n_pilot_y_norm, 0.1),
+                    (c.accelerations_n_pilot_z_norm, 0.5, -1.0),
+                ],
+                power=1 / 3,
+            ),
+            gaussian(c.attitude_roll_rad, 0.35),  # radians ~= 20 degrees
+            gaussian(c.velocities_u_fps, 16, offset=800),  # fps (~5%)
+        ]
+    )
+
+    terminal_spec = TerminalSpec(
+        # if acceleration are too high stop the simulation
+        AllOf(
+            Condition(c.simulation_sim_time_sec, ">", 10),
+            AnyOf(
+                Condition(c.accelerations_n_pilot_x_norm, ">", 2.0, absolute=True),  # "g"s
+                Condition(c.accelerations_n_pilot_y_norm, ">", 2.0, absolute=True),
+                Condition(c.accelerations_n_pilot_z_norm, ">", 2.0, offset=1, absolute=True),  # expected to be -1 g
+            ),
+        ),
+        # End up the simulation if the aircraft is on an extreme state
+        # TODO: Is an altitude check needed?
+        Condition(c.position_h_sl_ft, "<", 3000),
+        Condition(c.detect_extreme_state, "!=", 0),
+    )
 
     def is_terminal(self, state, sim):
         # Change heading every 150 seconds
@@ -101,7 +114,7 @@ class HeadingControlTask(Task):
                 return True
 
             angle = int(sim.get_property_value(c.steady_flight) / 150) * 10
-            sign = random.choice([+1.0, -1.0])
+            sign = sim.np_random.choice([+1.0, -1.0])
             new_heading = sim.get_property_value(c.target_heading_deg) + sign * angle
             new_heading = (new_heading + 360) % 360
 
@@ -111,20 +124,23 @@ class HeadingControlTask(Task):
 
             sim.set_property_value(c.steady_flight, sim.get_property_value(c.steady_flight) + 150)
 
-        # if acceleration are too high stop the simulation
-        acceleration_limit_x = 2.0  # "g"s
-        acceleration_limit_y = 2.0  # "g"s
-        acceleration_limit_z = 2.0  # "g"s
-        if sim.get_property_value(c.simulation_sim_time_sec) > 10:
-            if (
-                math.fabs(sim.get_property_value(c.accelerations_n_pilot_x_norm)) > acceleration_limit_x
-                or math.fabs(sim.get_property_value(c.accelerations_n_pilot_y_norm)) > acceleration_limit_y
-                or math.fabs(sim.get_property_value(c.accelerations_n_pilot_z_norm) + 1) > acceleration_limit_z
-            ):  # z component is expected to be -1 g
-                return True
+        return Task.is_terminal(self, state, sim)
 
-        # End up the simulation if the aircraft is on an extreme state
-        # TODO: Is an altitude check needed?
-        return (sim.get_property_value(c.position_h_sl_ft) < 3000) or bool(
-            sim.get_property_value(c.detect_extreme_state)
-        )
+    def is_terminal_batch(self, values, sims):
+        """
+        Check terminal states of a batch of simulations, see is_terminal
+        """
+        time = values[c.simulation_sim_time_sec]
+        steady_flight = values[c.steady_flight]
+
+        # Change heading every 150 seconds if the target heading and altitude were reached
+        change = time >= steady_flight
+        terminal = change & ((np.fabs(values[c.delta_heading]) > 10) | (np.fabs(values[c.delta_altitude]) >= 100))
+        for i in np.flatnonzero(change & ~terminal):
+            angle = int(steady_flight[i] / 150) * 10
+            sign = sims[i].np_random.choice([+1.0, -1.0])
+            new_heading = (values[c.target_heading_deg][i] + sign * angle + 360) % 360
+            sims[i].set_property_value(c.target_heading_deg, new_heading)
+            sims[i].set_property_value(c.steady_flight, steady_flight[i] + 150)
+
+        return terminal | Task.is_terminal_batch(self, values, sims)
@@ -1,7 +1,8 @@
 from gym_jsbsim.task import Task
 from gym_jsbsim.catalogs.catalog import Catalog as c
-import random
+from gym_jsbsim.reward_spec import TerminalSpec, Condition
 import math
+import numpy as np
 
 """
     A task in which the agent must follow taxiway centerline trajectory.
@@ -14,6 +15,8 @@ class TaxiControlTask(Task):
 
     action_var = [c.fcs_steer_cmd_norm, c.fcs_center_brake_cmd_norm, c.fcs_throttle_cmd_norm]
 
+    reward_var = [c.shortest_dist, c.velocities_vc_fps, c.simulation_sim_time_sec]
+
     k2f = 1.68781
     # INIT_AC_LON = 1.369889125000043  # loop
     # INIT_AC_LAT = 43.625578879000045 # loop
@@ -28,6 +31,11 @@ class TaxiControlTask(Task):
     perf_time = 0
     perf_time_avg = 0
 
+    # statistics of each simulation of a batch
+    avg_dist_batch = None
+    nb_step_batch = None
+    perf_time_batch = None
+
     init_conditions = {
         c.ic_h_sl_ft: INITIAL_ALTITUDE_FT,
         c.ic_terrain_elevation_ft: INITIAL_ALTITUDE_FT,  # Blagnac Ariport Altittude (148.72m = 487.9265f)
@@ -50,6 +58,30 @@ class TaxiControlTask(Task):
         c.id_path: 0,
     }
 
+    terminal_spec = TerminalSpec(
+        Condition(c.simulation_sim_time_sec, ">=", 450),
+        Condition(c.shortest_dist, ">=", 20, absolute=True),
+        Condition(c.velocities_vc_fps, ">", 20 * k2f, absolute=True),
+        Condition(c.velocities_vc_fps, "<", 5 * k2f, absolute=True),
+    )
+
+    def define_route(self, start, goal, graph=None):
+        """
+        Follow the shortest taxi route between two parking stands or holding positions of an airport, starting at
+        the first point of the route with the heading of its first segment
+
+        :param start: name of a parking stand or of the taxiway of a holding position, or node index
+        :param goal: name of a parking stand or of the taxiway of a holding position, or node index
+        :param graph: gym_jsbsim.envs.airport_graph.AirportGraph, defaults to the one of load_airport_graph
+        """
+        from gym_jsbsim.envs.airport_graph import get_route_initial_conditions, load_airport_graph
+        from gym_jsbsim.envs.taxi_utils import taxi_path
+
+        graph = load_airport_graph() if graph is None else graph
+        route = graph.route(start, goal)
+        self.taxi_path = taxi_path(route)
+        self.define_init_conditions({**self.init_conditions, **get_route_initial_conditions(route)})
+
     def get_reward(self, state, sim):
         """
         Reward with distance to the centerline and average velocity during the simulation
@@ -75,18 +107,38 @@ class TaxiControlTask(Task):
 
         return reward
 
-    def is_terminal(self, state, sim):
+    def reset_batch(self, nb_sims, indexes=None):
+        """
+        Reset the statistics of the simulations starting a new episode, see Task.reset_batch
+        """
+        if indexes is None or self.nb_step_batch is None or len(self.nb_step_batch) != nb_sims:
+            self.avg_dist_batch = np.zeros(nb_sims)
+            self.nb_step_batch = np.zeros(nb_sims)
+            self.perf_time_batch = np.zeros(nb_sims)
+        else:
+            self.avg_dist_batch[indexes] = 0
+            self.nb_step_batch[indexes] = 0
+            self.perf_time_batch[indexes] = 0
+
+    def get_reward_batch(self, values, sims):
+        """
+        Compute reward for a batch of simulations, see get_reward
+        """
+        if self.nb_step_batch is None or len(self.nb_step_batch) != len(sims):
+            self.reset_batch(len(sims))
+
+        shortest_dist = values[c.shortest_dist]
+        sim_time = values[c.simulation_sim_time_sec]
+
+        dist_r = np.exp(-shortest_dist)
+
+        self.avg_dist_batch += np.fabs(shortest_dist)
+        self.nb_step_batch += 1
 
-        terminal = (
-            sim.get_property_value(c.simulation_sim_time_sec) >= 450
-            or math.fabs(sim.get_property_value(c.shortest_dist)) >= 20
-            or math.fabs(sim.get_property_value(c.velocities_vc_fps)) > 20 * self.k2f
-            or math.fabs(sim.get_property_value(c.velocities_vc_fps)) < 5 * self.k2f
-        )
+        self.perf_time_batch += np.fabs(values[c.velocities_vc_fps])
+        av_vel = self.perf_time_batch / self.nb_step_batch
+        dist_total = av_vel * sim_time
 
-        # if terminal:
-        #     print('Simulation ended at t='+str(sim.get_property_value(c.simulation_sim_time_sec)))
-        #     print('Avg dist to central line: '+str(self.avg_dist / self.nb_step))
-        #     print('Avg vel: '+str(self.perf_time / self.nb_step))
+        dist_total_norm = dist_total / (20.0 * self.k2f * sim_time)
 
-        return terminal
+        return 0.8 * dist_r + 0.2 * dist_total_norm
@@ -1,7 +1,12 @@
+import math
 import numpy as np
 from shapely.geometry import Point, LineString
 from geographiclib.geodesic import Geodesic
 
+# WGS84 semi-major axis [m] and first eccentricity squared
+WGS84_A = 6378137.0
+WGS84_E2 = 6.69437999014e-3
+
 
 def get_bearing(p1, p2):
     """
@@ -15,12 +20,41 @@ def get_bearing(p1, p2):
     return (brng + 360) % 360
 
 
+def get_bearings(p1, points):
+    """
+    Bearings computed in the local east-north plane at mid latitude between p1 and each point, matching
+
+    the WGS84 geodesic bearings for points a few kilometers away.
+
+    :param p1: (long,lat)
+    :param points: np.array of shape (n, 2) of (long,lat)
+    :return: np.array of bearings in degrees [0,360]
+    """
+    long1, lat1 = p1
+    d_long = np.radians(points[:, 0] - long1)
+    d_lat = np.radians(points[:, 1] - lat1)
+    lat_m = math.radians(lat1) + d_lat / 2
+    sin_lat_m = np.sin(lat_m)
+    w2 = 1 - WGS84_E2 * sin_lat_m ** 2
+    # radii of curvature in the prime vertical and in the meridian
+    n = WGS84_A / np.sqrt(w2)
+    m = WGS84_A * (1 - WGS84_E2) / w2 ** 1.5
+    # bearing of the chord at mid latitude, minus half of the meridian convergence to get it at p1
+    brng = np.degrees(np.arctan2(d_long * n * np.cos(lat_m), d_lat * m) - d_long * sin_lat_m / 2)
+    return (brng + 360) % 360
+
+
 class taxi_path(object):
     """
     Compute n centerline next points in regards to the aircraft location and heading.
     """
 
-    def __init__(self):
+    def __init__(self, centerlinepoints=None):
+        """
+        :param centerlinepoints: list of (long,lat) of the centerline to follow, e.g. an AirportGraph route,
+
+            defaults to a loop around Toulouse-Blagnac
+        """
 
         # LOOP
         self.centerlinepoints = [
@@ -157,43 +191,160 @@ class taxi_path(object):
             (1.369889125000043, 43.625578879000045),
         ]
 
+        if centerlinepoints is not None:
+            self.centerlinepoints = list(centerlinepoints)
+
         self.centerline = LineString(self.centerlinepoints)
         self.shortest_dist = None
 
-    def update_path2(self, aircraft_loc, aircraft_heading, id_path, nb_point):
+        self.build_index()
+
+    def build_index(self, cell_size=0.002):
         """
-        :param ref_pts: aircraft (longitude,latitude)
-        :param ac_heading:
-        :param id_path: the id of the next centerline point from the centerlipoints list
+        Preprocess the centerline into arrays of segments and a grid of the segments crossing each cell.
+
+        :param cell_size: size of the grid cells in degrees
+        """
+        self.points = np.array(self.centerlinepoints)
+        self.segment_start = self.points[:-1]
+        self.segment_vector = self.points[1:] - self.points[:-1]
+        length2 = (self.segment_vector ** 2).sum(axis=1)
+        self.segment_length2 = np.where(length2 > 0, length2, 1)
+
+        self.cell_size = cell_size
+        self.grid_origin = self.points.min(axis=0)
+        self.grid = {}
+        low = self.get_cell(np.minimum(self.points[:-1], self.points[1:]))
+        high = self.get_cell(np.maximum(self.points[:-1], self.points[1:]))
+        for i in range(len(self.segment_start)):
+            for x in range(low[i, 0], high[i, 0] + 1):
+                for y in range(low[i, 1], high[i, 1] + 1):
+                    self.grid.setdefault((x, y), []).append(i)
+
+    def get_cell(self, coords):
+        """
+        :param coords: np.array of (long,lat)
+        :return: np.array of the grid cells (x, y) containing coords
+        """
+        return np.floor((coords - self.grid_origin) / self.cell_size).astype(int)
+
+    def segment_distances(self, p, index):
+        """
+        :param p: np.array (long,lat)
+        :param index: np.array or slice of segment indexes
+        :return: np.array of the distances in degrees between p and the segments
+        """
+        start = self.segment_start[index]
+        vector = self.segment_vector[index]
+        t = np.clip(((p - start) * vector).sum(axis=1) / self.segment_length2[index], 0, 1)
+        return np.hypot(start[:, 0] + t * vector[:, 0] - p[0], start[:, 1] + t * vector[:, 1] - p[1])
+
+    def get_shortest_dist(self, p, id_path, window=8):
+        """
+        Compute the distance between p and the centerline, searched first in the segments around id_path,
+
+        then in the segments of the grid cells closer to p than this first distance.
+
+        :param p: np.array (long,lat)
+        :param id_path: the id of the next centerline point from the centerlinepoints list
+        :param window: number of segments searched before and after id_path
+        :return: distance in degrees
+        """
+        start, stop = max(id_path - window, 0), min(id_path + window, len(self.segment_start))
+        dist = self.segment_distances(p, slice(start, stop)).min()
+
+        low, high = self.get_cell(p - dist), self.get_cell(p + dist)
+        if (high - low + 1).prod() > len(self.grid):
+            candidates = range(len(self.segment_start))
+        else:
+            candidates = set()
+            for x in range(low[0], high[0] + 1):
+                for y in range(low[1], high[1] + 1):
+                    candidates.update(self.grid.get((x, y), ()))
+        candidates = [i for i in candidates if not start <= i < stop]
+        if candidates:
+            dist = min(dist, self.segment_distances(p, np.array(candidates)).min())
+        return dist
+
+    def get_shortest_dists(self, points):
+        """
+        Compute the distances between K aircraft and the centerline in one batch.
+
+        :param points: np.array of shape (K, 2) of (long,lat)
+        :return: np.array of shape (K,) of the distances in meters
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        start = self.segment_start[None, :, :]
+        vector = self.segment_vector[None, :, :]
+        offset = points[:, None, :] - start
+        t = np.clip((offset * vector).sum(axis=2) / self.segment_length2[None, :], 0, 1)
+        dists = np.hypot(offset[:, :, 0] - t * vector[:, :, 0], offset[:, :, 1] - t * vector[:, :, 1])
+        return dists.min(axis=1) * 100000
+
+    def get_next_points(self, aircraft_loc, aircraft_heading, id_path, nb_point):
+        """
+        Compute the next centerline points and the distance to the centerline. The path is not modified,
+
+        so that it can be shared by several simulations.
+
+        :param aircraft_loc: aircraft (longitude,latitude)
+        :param aircraft_heading: aircraft heading in degrees
+        :param id_path: the id of the next centerline point from the centerlinepoints list
         :param nb_point: The number of point to take in account
-        :return: list[[(long,lat),distance,heading],[.....]]
+        :return: (list[[(long,lat),distance,heading],[.....]], bool True to move to the next point,
+            shortest distance to the centerline in meters)
         """
         next_point = False
-        output = []
-        id_path = min(id_path, len(self.centerlinepoints) - 1)
+        nb_centerlinepoints = len(self.centerlinepoints)
+        id_path = min(id_path, nb_centerlinepoints - 1)
+        p = np.array(aircraft_loc, dtype=float)
+
+        # compute distance and heading of the next point and the n points after it
+        stop = max(min(id_path + nb_point + 1, nb_centerlinepoints - 1), id_path + 1)
+        points = self.points[id_path:stop]
+        dists = np.hypot(points[:, 0] - p[0], points[:, 1] - p[1]) * 100000
+        bearings = get_bearings(aircraft_loc, points)
 
         # compute angle between aircraft and next point
-        angle_basic = aircraft_heading - get_bearing(aircraft_loc, self.centerlinepoints[id_path])
+        angle_basic = aircraft_heading - bearings[0]
         angle_basic360 = (abs(angle_basic) + 360) % 360
         angle_ac_nextpoint = min(angle_basic360, 360 - angle_basic360)
 
-        if Point(aircraft_loc).distance(Point(self.centerlinepoints[id_path])) * 100000 < 1 or angle_ac_nextpoint > 60:
+        if dists[0] < 1 or angle_ac_nextpoint > 60:
             # I move to the next centerline point
             next_point = True
             # I keep my next n points
-            my_points_state = self.centerlinepoints[
-                id_path + 1 : min(id_path + nb_point + 1, len(self.centerlinepoints) - 1)
-            ]
+            start, stop = id_path + 1, min(id_path + nb_point + 1, nb_centerlinepoints - 1)
         else:
             # I keep my next n points
-            my_points_state = self.centerlinepoints[id_path : min(id_path + nb_point, len(self.centerlinepoints) - 1)]
-        # I compute heading and distance of my next n points
-        for p in my_points_state:
-            output.append([p, Point(aircraft_loc).distance(Point(p)) * 100000, get_bearing(aircraft_loc, p)])
+            start, stop = id_path, min(id_path + nb_point, nb_centerlinepoints - 1)
+        output = [
+            [self.centerlinepoints[i], dist, bearing]
+            for i, dist, bearing in zip(
+                range(start, stop),
+                dists[start - id_path : stop - id_path].tolist(),
+                bearings[start - id_path : stop - id_path].tolist(),
+            )
+        ]
 
         # Compute the shortest distance to the centerline
-        self.shortest_dist = (
-            self.centerline.distance(Point(aircraft_loc)) * 100000
+        shortest_dist = (
+            self.get_shortest_dist(p, id_path) * 100000
         )  # Point((1.3578, 43.587434)).distance(Point((1.3577, 43.587288)))*100000 = 17m
 
+        return output, next_point, shortest_dist
+
+    def update_path2(self, aircraft_loc, aircraft_heading, id_path, nb_point):
+        """
+        get_next_points keeping the shortest distance in self.shortest_dist, not safe when the path is shared
+
+        :param ref_pts: aircraft (longitude,latitude)
+        :param ac_heading:
+        :param id_path: the id of the next centerline point from the centerlipoints list
+        :param nb_point: The number of point to take in account
+        :return: list[[(long,lat),distance,heading],[.....]]
+        """
+        output, next_point, self.shortest_dist = self.get_next_points(
+            aircraft_loc, aircraft_heading, id_path, nb_point
+        )
         return output, next_point
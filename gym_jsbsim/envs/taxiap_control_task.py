@@ -1,7 +1,8 @@
 from gym_jsbsim.task import Task
 from gym_jsbsim.catalogs.catalog import Catalog as c
-import random
+from gym_jsbsim.reward_spec import RewardSpec, TerminalSpec, Condition, laplace
 import math
+import numpy as np
 
 """
     A task in which the agent must follow a taxiway centerline trajectory.
@@ -13,6 +14,7 @@ class TaxiapControlTask(Task):
     # Define State and Action
     state_var = [c.velocities_vc_fps, c.shortest_dist, c.d1, c.d2, c.d3, c.d4, c.a1, c.a2, c.a3, c.a4]
     action_var = [c.fcs_steer_cmd_norm]
+    reward_var = [c.shortest_dist, c.velocities_vc_fps, c.simulation_sim_time_sec, c.a3]
 
     k2f = 1.68781  # Knot to feet
     INIT_AC_LON = 1.369889125000043  # loop
@@ -27,6 +29,10 @@ class TaxiapControlTask(Task):
     nb_step = 0
     r = 1
 
+    # statistics of each simulation of a batch
+    avg_dist_batch = None
+    nb_step_batch = None
+
     # Set Initial condition for Taxi with Auto Pilot
     init_conditions = {
         c.ic_h_sl_ft: INITIAL_ALTITUDE_FT,
@@ -51,18 +57,43 @@ class TaxiapControlTask(Task):
         c.id_path: 0,  # ID runaway path
     }
 
+    # Reward according to distance to the centerline
+    reward_spec = RewardSpec([laplace(c.shortest_dist, power=2)])
+
+    # End the simulation if aircraft is up to 10 meters from the centerline
+    terminal_spec = TerminalSpec(
+        Condition(c.simulation_sim_time_sec, ">=", 450),
+        Condition(c.shortest_dist, ">=", 10, absolute=True),
+        Condition(c.velocities_vc_fps, "<=", 5.0 * k2f, absolute=True),
+    )
+
+    def define_route(self, start, goal, graph=None):
+        """
+        Follow the shortest taxi route between two parking stands or holding positions of an airport, starting at
+        the first point of the route with the heading of its first segment
+
+        :param start: name of a parking stand or of the taxiway of a holding position, or node index
+        :param goal: name of a parking stand or of the taxiway of a holding position, or node index
+        :param graph: gym_jsbsim.envs.airport_graph.AirportGraph, defaults to the one of load_airport_graph
+        """
+        from gym_jsbsim.envs.airport_graph import get_route_initial_conditions, load_airport_graph
+        from gym_jsbsim.envs.taxi_utils import taxi_path
+
+        graph = load_airport_graph() if graph is None else graph
+        route = graph.route(start, goal)
+        self.taxi_path = taxi_path(route)
+        self.define_init_conditions({**self.init_conditions, **get_route_initial_conditions(route)})
+
     def get_reward(self, state, sim):
         """
         Reward according to distance to the centerline.
         """
-        shortest_dist_r = math.exp(-math.fabs(sim.get_property_value(c.shortest_dist)))
-
         self.avg_dist += math.fabs(sim.get_property_value(c.shortest_dist))
         self.nb_step += 1
 
         # print(sim.get_property_value(c.shortest_dist), sim.get_property_value(c.velocities_vc_fps), sim.get_property_value(c.fcs_steer_cmd_norm))
 
-        return shortest_dist_r * shortest_dist_r
+        return Task.get_reward(self, state, sim)
 
     def is_terminal(self, state, sim):
 
@@ -70,10 +101,6 @@ class TaxiapControlTask(Task):
         End the simulation if aircraft is up to 10 meters from the centerline
         """
 
-        # Add random noise to velocity command
-        # if (sim.get_property_value(c.id_path)%10>=1 and sim.get_property_value(c.id_path)%10<2):
-        #     self.r = random.uniform(0.0, 1.5)
-
         # Set velocity of the aircraft according to turn and straight line
         a = sim.get_property_value(c.a3)
         if abs(a) > 10:  # TURN
@@ -81,11 +108,7 @@ class TaxiapControlTask(Task):
         else:  # STRAIGHTLINE
             sim.set_property_value(c.target_vg, 15.0 * self.k2f * self.r)
 
-        terminal = (
-            sim.get_property_value(c.simulation_sim_time_sec) >= 450
-            or math.fabs(sim.get_property_value(c.shortest_dist)) >= 10
-            or math.fabs(sim.get_property_value(c.velocities_vc_fps)) <= 5.0 * self.k2f
-        )
+        terminal = Task.is_terminal(self, state, sim)
 
         # Some debug prints with average distance to the centerline
         # if terminal:
@@ -94,3 +117,37 @@ class TaxiapControlTask(Task):
         #     print('shortest distance: '+str(sim.get_property_value(c.shortest_dist)))
 
         return terminal
+
+    def reset_batch(self, nb_sims, indexes=None):
+        """
+        Reset the statistics of the simulations starting a new episode, see Task.reset_batch
+        """
+        if indexes is None or self.nb_step_batch is None or len(self.nb_step_batch) != nb_sims:
+            self.avg_dist_batch = np.zeros(nb_sims)
+            self.nb_step_batch = np.zeros(nb_sims)
+        else:
+            self.avg_dist_batch[indexes] = 0
+            self.nb_step_batch[indexes] = 0
+
+    def get_reward_batch(self, values, sims):
+        """
+        Compute reward for a batch of simulations, see get_reward
+        """
+        if self.nb_step_batch is None or len(self.nb_step_batch) != len(sims):
+            self.reset_batch(len(sims))
+
+        self.avg_dist_batch += np.fabs(values[c.shortest_dist])
+        self.nb_step_batch += 1
+
+        return Task.get_reward_batch(self, values, sims)
+
+    def is_terminal_batch(self, values, sims):
+        """
+        Check terminal states of a batch of simulations, see is_terminal
+        """
+        # Set velocity of the aircraft according to turn and straight line
+        target_vg = np.where(np.abs(values[c.a3]) > 10, 7.0 * self.k2f * self.r, 15.0 * self.k2f * self.r)
+        for sim, value in zip(sims, target_vg):
+            sim.set_property_value(c.target_vg, value)
+
+        return Task.is_terminal_batch(self, values, sims)
@@ -1,6 +1,14 @@
+from collections import deque
+from time import perf_counter
 import gym
 import numpy as np
+from gym.spaces import Discrete
 from gym_jsbsim.simulation import Simulation
+from gym_jsbsim.branch_rollout import BranchRolloutPool
+from gym_jsbsim.envs import get_task
+from gym_jsbsim.prefetcher import SimulationPrefetcher, get_latency_percentiles
+from gym_jsbsim.profiler import Profiler
+from gym_jsbsim.recorder import EpisodeRecorder
 
 
 class JSBSimEnv(gym.Env):
@@ -20,25 +28,70 @@ class JSBSimEnv(gym.Env):
 
     metadata = {"render.modes": ["human", "csv"]}
 
-    def __init__(self, task):
+    def __init__(
+        self, task, warm_reset=False, pool=None, flat_spaces=False, profile=False, prefetch=0, trim_cache=None
+    ):
         """
 
         Constructor. Init some internal state, but JSBSimEnv.reset() must be
 
         called first before interacting with environment.
 
-        :param task: the Task for the task agent is to perform
+        :param task: the Task for the task agent is to perform, or the name of a task of gym_jsbsim.TASKS
+
+        :param warm_reset: if True, reset() sends the loaded simulation back to the task
+
+            initial conditions instead of building a new one
+
+        :param pool: a SimulationPool (e.g. gym_jsbsim.SIMULATION_POOL) to take the simulations from
+
+            instead of loading a new aircraft each time
+
+        :param flat_spaces: if True, observations and actions are a float32 array of the continuous properties
+
+            (and an int array of the Discrete ones, counted from their min, in a separate MultiDiscrete component)
+
+            instead of a tuple of 1-element arrays
+
+        :param profile: if True, the time of the phases of the steps and of the property getters is measured,
+
+            see get_profile
+
+        :param prefetch: number of spare simulations prepared at initial conditions by a background thread,
+
+            so that reset swaps one in instead of building or resetting the simulation, see SimulationPrefetcher
+
+        :param trim_cache: a gym_jsbsim.trim_cache.TrimCache the state of the simulations after their initial
+
+            conditions is restored from, instead of running them and the engines steady state again
 
         """
 
         self.sim = None
-        self.task = task()
-
-        self.observation_space = self.task.get_observation_space()  # None
-        self.action_space = self.task.get_action_space()  # None
+        self.task = get_task(task)()
+        self.warm_reset = warm_reset
+        self.pool = pool
+        self.flat_spaces = flat_spaces
+        self.recorder = None
+        self.profiler = Profiler() if profile else None
+        self.prefetch = prefetch
+        self.trim_cache = trim_cache
+        self.branch_pool = None
+        self.prefetcher = None
+        # simulations of the previous episodes, given back to the prefetcher at the next step
+        self.returned_sims = []
+        # durations of the last resets in seconds, see get_reset_latencies
+        self.reset_latencies = deque(maxlen=10000)
+        self.seed()
+
+        self.observation_space, self.action_space = self.get_spaces()
 
         self.state = None
 
+        # preallocated arrays of the observation and action values, resized at reset
+        self.observation_buffer = np.empty(len(self.task.get_observation_var()))
+        self.action_buffer = np.empty(len(self.task.get_action_var()))
+
     def step(self, action=None):
         """
 
@@ -65,8 +118,13 @@ class JSBSimEnv(gym.Env):
             info: auxiliary information
 
         """
+        if self.returned_sims:
+            self.give_back_simulations()
 
-        if action is not None:
+        if self.profiler is not None:
+            return self.profiled_step(action)
+
+        if action is not None and not self.flat_spaces:
             # print(action, self.action_space)
             # nb_action = 0
             # for x in action:
@@ -83,6 +141,39 @@ class JSBSimEnv(gym.Env):
 
         return state, reward, done, info
 
+    def profiled_step(self, action=None):
+        """
+
+        Runs step, measuring the time of its phases, also returned in info["profile"].
+
+        """
+        if action is not None and not self.flat_spaces:
+            if not len(action) == len(self.action_space.spaces):
+                raise ValueError("mismatch between action and action space size")
+
+        times = [perf_counter()]
+        if action is not None:
+            self.sim.set_property_values_from(self.task.get_action_var(), self.get_action_buffer(action))
+        times.append(perf_counter())
+        self.sim.run()
+        times.append(perf_counter())
+        self.state = self.get_observation()
+        times.append(perf_counter())
+        reward = self.task.get_reward(self.state, self.sim)
+        times.append(perf_counter())
+        done = not self.is_contained()
+        times.append(perf_counter())
+        done = done or self.task.is_terminal(self.state, self.sim)
+        times.append(perf_counter())
+
+        step_times = {phase: end - start for phase, start, end in zip(STEP_PHASES, times[:-1], times[1:])}
+        for phase, elapsed in step_times.items():
+            self.profiler.add(phase, elapsed)
+        self.profiler.add("jsbsim_run", step_times["run"], self.sim.agent_interaction_steps)
+
+        state = self.state if not done else self._get_clipped_state()
+        return state, reward, done, {"profile": step_times}
+
     def make_step(self, action=None):
         """
 
@@ -97,38 +188,212 @@ class JSBSimEnv(gym.Env):
         """
         # take actions
         if action is not None:
-            self.sim.set_property_values(self.task.get_action_var(), action)
+            self.sim.set_property_values_from(self.task.get_action_var(), self.get_action_buffer(action))
 
         # run simulation
         self.sim.run()
 
         return self.get_observation()
 
-    def reset(self):
+    def reset(self, seed=None, options=None):
         """
 
         Resets the state of the environment and returns an initial observation.
 
+        :param seed: if given, the environment is seeded with it first, see seed
+
+        :param options: dict, with a "snapshot" to start the episode from, or a "snapshot_store"
+
+            (gym_jsbsim.snapshot_store.SnapshotStore) to start from one of its snapshots, drawn with a probability
+
+            proportional to their priority if options["prioritized"] is True
+
         :return: array, the initial observation of the space.
 
         """
-        if self.sim:
-            self.sim.close()
+        start = perf_counter()
+        if seed is not None:
+            self.seed(seed)
+        if self.recorder is not None:
+            self.recorder.end_episode()
+
+        if self.prefetch:
+            if self.prefetcher is None:
+                self.prefetcher = SimulationPrefetcher(self.prepare_spare_simulation, self.prefetch)
+            if len(self.returned_sims) >= self.prefetch:
+                # no spare simulation left to wait for without the ones not given back yet
+                self.give_back_simulations()
+            self.returned_sims.append(self.sim)
+            self.sim = self.prefetcher.get()
+        else:
+            self.sim = self.make_simulation(self.sim, self.task.get_initial_conditions(self.np_random))
+        self.sim.np_random = self.np_random
+        self.sim.taxi_path = self.task.taxi_path
+        self.sim.set_catalog(self.task.get_catalog_props())
+        if self.profiler is not None and self.sim.profiler is not self.profiler:
+            self.sim.set_profiler(self.profiler)
+
+        self.observation_buffer = np.empty(len(self.task.get_observation_var()))
+        self.action_buffer = np.empty(len(self.task.get_action_var()))
+
+        self.observation_space, self.action_space = self.get_spaces()
+
+        snapshot = None
+        if options and options.get("snapshot") is not None:
+            snapshot = options["snapshot"]
+        elif options and options.get("snapshot_store") is not None:
+            store, prioritized = options["snapshot_store"], options.get("prioritized", False)
+            _, snapshot = store.sample(self.np_random, prioritized=prioritized)
+        if snapshot is not None:
+            self.sim.restore_snapshot(snapshot)
+
+        self.state = self.get_observation()
+        self.reset_latencies.append(perf_counter() - start)
+
+        return self.state
+
+    def make_simulation(self, sim, init_conditions):
+        """
+
+        Sends a simulation back to initial conditions if it can be warm reset, else closes it and builds a new one.
+
+        :param sim: the Simulation of the previous episode, or None
+
+        :param init_conditions: dict mapping properties to their initial values
+
+        :return: Simulation
 
-        self.sim = Simulation(
+        """
+        if self.warm_reset and sim is not None and self.is_warm_resettable(sim):
+            sim.agent_interaction_steps = self.task.agent_interaction_steps
+            sim.reset(init_conditions)
+            return sim
+        if sim:
+            sim.close()
+
+        make_simulation = self.pool.get_simulation if self.pool is not None else Simulation
+        return make_simulation(
             aircraft_name=self.task.aircraft_name,
-            init_conditions=self.task.init_conditions,
+            init_conditions=init_conditions,
             jsbsim_freq=self.task.jsbsim_freq,
             agent_interaction_steps=self.task.agent_interaction_steps,
+            trim_cache=self.trim_cache,
         )
 
-        self.state = self.get_observation()
+    def prepare_spare_simulation(self, sim):
+        """
 
-        self.observation_space = self.task.get_observation_space()
+        Prepares a spare simulation for the prefetcher, in its thread. The initial conditions are drawn from
 
-        self.action_space = self.task.get_action_space()
+        a random generator of the prefetcher, so that the draws do not depend on the timing of the thread.
 
-        return self.state
+        :param sim: Simulation given back to the prefetcher, or None
+
+        :return: Simulation
+
+        """
+        return self.make_simulation(sim, self.task.get_initial_conditions(self.prefetch_random))
+
+    def give_back_simulations(self):
+        """ Gives the simulations of the previous episodes back to the prefetcher, to be prepared as spare ones. """
+        for sim in self.returned_sims:
+            self.prefetcher.put(sim)
+        self.returned_sims.clear()
+
+    def close_prefetcher(self):
+        """ Closes the prefetcher with its spare simulations, and the simulations not given back yet. """
+        self.prefetcher.close()
+        self.prefetcher = None
+        for sim in self.returned_sims:
+            if sim is not None:
+                sim.close()
+        self.returned_sims.clear()
+
+    def rollout_branches(self, actions, snapshot=None, seed=None, num_workers=None):
+        """
+
+        Evaluates K candidate action sequences of length H from one state, e.g. for model predictive control or
+
+        tree search, without changing the state of the environment. The branches run in the worker processes of a
+
+        BranchRolloutPool, started at the first call and kept with their simulations until close. The branches follow
+
+        the current configuration of the task of the environment, e.g. its taxi_path.
+
+        :param actions: np.array of shape (K, H, n_actions), continuous action values as in the flat action space
+
+        :param snapshot: gym_jsbsim.simulation.Snapshot the branches start from, defaults to the current state
+
+        :param seed: int, seed of the random events of the task in the branches, the same for all of them.
+
+            Defaults to a seed drawn from a generator spawned from the seed of the environment, apart from the one of
+
+            its episodes
+
+        :param num_workers: number of worker processes of the pool, defaults to the number of cpus, 0 to run
+
+            the branches in this process. Only used when the pool is started
+
+        :return: (observations of shape (K, H, n_obs), rewards of shape (K, H), dones of shape (K, H)),
+
+            a branch stops at its first terminal state, see gym_jsbsim.branch_rollout.rollout_branches
+
+        """
+        if snapshot is None:
+            snapshot = self.sim.save_snapshot()
+        if seed is None:
+            seed = int(self.branch_random.integers(2 ** 63))
+        if self.branch_pool is None:
+            self.branch_pool = BranchRolloutPool(self.task, num_workers=num_workers)
+        return self.branch_pool.rollout(snapshot, actions, seed)
+
+    def get_reset_latencies(self, percentiles=(50, 90, 99, 100)):
+        """
+
+        Gets percentiles of the duration of the last resets.
+
+        :param percentiles: sequence of percentiles in [0, 100]
+
+        :return: dict mapping each percentile to a duration in milliseconds
+
+        """
+        return get_latency_percentiles(self.reset_latencies, percentiles)
+
+    def get_spaces(self):
+        """
+
+        Gets the task spaces and, in flat mode, precomputes the layout of the properties in them.
+
+        :return: (observation space, action space)
+
+        """
+        if not self.flat_spaces:
+            return self.task.get_observation_space(), self.task.get_action_space()
+
+        observation_var = self.task.get_observation_var()
+        self.observation_low, self.observation_high = self.task.get_observation_bounds()
+        self.observation_clipped = np.array([prop.clipped for prop in observation_var], dtype=bool)
+        self.observation_layout = make_flat_layout(observation_var)
+        self.action_layout = make_flat_layout(self.task.get_action_var())
+        return self.task.get_flat_observation_space(), self.task.get_flat_action_space()
+
+    def is_warm_resettable(self, sim=None):
+        """
+
+        Checks if a simulation has the aircraft and frequency of the task and can be reset in place.
+
+        :param sim: Simulation, defaults to the current one
+
+        :return: bool
+
+        """
+        sim = self.sim if sim is None else sim
+        return (
+            sim is not None
+            and sim.jsbsim_exec is not None
+            and sim.aircraft_name == self.task.aircraft_name
+            and sim.jsbsim_freq == self.task.jsbsim_freq
+        )
 
     def is_terminal(self):
         """
@@ -138,9 +403,32 @@ class JSBSimEnv(gym.Env):
         :return: bool
 
         """
-        is_not_contained = not self.observation_space.contains(self.state)
+        return not self.is_contained() or self.task.is_terminal(self.state, self.sim)
+
+    def is_contained(self):
+        """
 
-        return is_not_contained or self.task.is_terminal(self.state, self.sim)
+        Checks if the state is in the observation space.
+
+        :return: bool
+
+        """
+        if self.flat_spaces:
+            values = self.observation_buffer
+            return bool(((values >= self.observation_low) & (values <= self.observation_high)).all())
+        return self.observation_space.contains(self.state)
+
+    def get_profile(self):
+        """
+
+        Gets the cumulative times and call counts of the phases of the steps and of the property getters.
+
+        :return: dict, see gym_jsbsim.profiler.Profiler.get_profile
+
+        """
+        if self.profiler is None:
+            raise RuntimeError("profiling is not enabled, make the environment with profile=True")
+        return self.profiler.get_profile()
 
     def render(self, mode="human", **kwargs):
         """Renders the environment.
@@ -152,7 +440,9 @@ class JSBSimEnv(gym.Env):
         if mode is:
 
         - human: print on the terminal
-        - csv: output to cvs files
+        - csv: output to cvs files: the task output properties are recorded in one file per episode by an
+
+          EpisodeRecorder built at the first call with kwargs (directory, file_format, decimation, ...)
 
         Note:
 
@@ -166,6 +456,10 @@ class JSBSimEnv(gym.Env):
 
         :param mode: str, the mode to render with
         """
+        if mode == "csv":
+            if self.recorder is None:
+                self.recorder = EpisodeRecorder(self.task.get_output(), **kwargs)
+            return self.recorder.record(self.sim)
         return self.task.render(self.sim, mode=mode, **kwargs)
 
     def seed(self, seed=None):
@@ -193,8 +487,26 @@ class JSBSimEnv(gym.Env):
 
               this won't be true if seed=None, for example.
 
+        The generator is shared with the simulation: the task draws its random events (e.g. the new target
+
+        headings) from it, so that an episode depends only on the seed and the actions.
+
+        :param seed: int, None to seed from the OS entropy, or np.random.SeedSequence
+
+        :return: list, the entropy of the seed sequence
+
         """
-        return
+        seed_sequence = get_seed_sequence(seed)
+        self.np_random = np.random.default_rng(seed_sequence)
+        if self.sim is not None:
+            self.sim.np_random = self.np_random
+        # the spare simulations were prepared with the previous generator
+        self.prefetch_random = np.random.default_rng(seed_sequence.spawn(1)[0])
+        # the seeds of the branch rollouts are drawn from their own generator, leaving the episodes unchanged
+        self.branch_random = np.random.default_rng(seed_sequence.spawn(1)[0])
+        if self.prefetcher is not None:
+            self.close_prefetcher()
+        return [seed_sequence.entropy]
 
     def close(self):
         """Cleans up this environment's objects
@@ -208,6 +520,14 @@ class JSBSimEnv(gym.Env):
         """
         if self.sim:
             self.sim.close()
+        if self.prefetcher is not None:
+            self.close_prefetcher()
+        if self.branch_pool is not None:
+            self.branch_pool.close()
+            self.branch_pool = None
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
     def get_observation(self):
         """
@@ -216,8 +536,51 @@ class JSBSimEnv(gym.Env):
         :return: NamedTuple, the first state observation of the episode
 
         """
-        obs_list = self.sim.get_property_values(self.task.get_observation_var())
-        return tuple([np.array([obs]) for obs in obs_list])
+        values = self.sim.get_property_values_into(self.task.get_observation_var(), self.observation_buffer)
+        if self.flat_spaces:
+            return self.to_flat_observation(values)
+        obs = values.copy()
+        return tuple(obs[i : i + 1] for i in range(len(obs)))
+
+    def to_flat_observation(self, values):
+        """
+        Converts observation values to the flat observation space.
+
+        :param values: np.array of float64, the values of the observation variables
+
+        :return: np.array of float32 (or int64 for Discrete properties), or tuple of both
+        """
+        obs = []
+        for index, offset in self.observation_layout:
+            if offset is None:
+                obs.append(values[index].astype(np.float32))
+            else:
+                obs.append((values[index] - offset).astype(np.int64))
+        return obs[0] if len(obs) == 1 else tuple(obs)
+
+    def get_action_buffer(self, action):
+        """
+        Copy an action into the preallocated action array.
+
+        :param action: array of floats, or tuple of scalars and 1-element arrays as sampled from the action space
+
+        :return: np.array of float64
+        """
+        if self.flat_spaces:
+            parts = action if len(self.action_layout) > 1 else (action,)
+            if not len(parts) == len(self.action_layout):
+                raise ValueError("mismatch between action and action space size")
+            for (index, offset), part in zip(self.action_layout, parts):
+                part = np.asarray(part).reshape(-1)
+                if not len(part) == len(self.action_buffer[index]):
+                    raise ValueError("mismatch between action and action space size")
+                self.action_buffer[index] = part if offset is None else part + offset
+        elif isinstance(action, np.ndarray):
+            self.action_buffer[:] = action.reshape(-1)
+        else:
+            for i, value in enumerate(action):
+                self.action_buffer[i] = value.item() if isinstance(value, np.ndarray) else value
+        return self.action_buffer
 
     def get_sim_time(self):
         """ Gets the simulation time from sim, a float. """
@@ -227,6 +590,10 @@ class JSBSimEnv(gym.Env):
         return self.sim.get_sim_state()
 
     def _get_clipped_state(self):
+        if self.flat_spaces:
+            values = self.observation_buffer
+            clipped = np.clip(values, self.observation_low, self.observation_high)
+            return self.to_flat_observation(np.where(self.observation_clipped, clipped, values))
         clipped = [
             np.clip(self.state[i], o.low, o.high) if self.task.state_var[i].clipped else self.state[i]
             for i, o in enumerate(self.observation_space)
@@ -236,3 +603,54 @@ class JSBSimEnv(gym.Env):
     def set_state(self, state):
         self.sim.set_sim_state(state)
         self.state = self.get_observation()
+
+    def save_snapshot(self):
+        """
+        Saves the state of the simulation, to branch rollouts from it.
+
+        :return: gym_jsbsim.simulation.Snapshot
+        """
+        return self.sim.save_snapshot()
+
+    def restore_snapshot(self, snapshot):
+        """
+        Sends the simulation back to a snapshot saved by save_snapshot.
+
+        :param snapshot: gym_jsbsim.simulation.Snapshot
+
+        :return: the observation of the restored state
+        """
+        self.sim.restore_snapshot(snapshot)
+        self.state = self.get_observation()
+        return self.state
+
+
+def get_seed_sequence(seed=None):
+    """
+    :param seed: int, None or np.random.SeedSequence
+
+    :return: np.random.SeedSequence
+    """
+    return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+
+# phases of the steps measured by profiled_step
+STEP_PHASES = ("action", "run", "observation", "reward", "contains", "is_terminal")
+
+
+def make_flat_layout(props):
+    """
+    Computes where the properties go in the components of a flat space built by gym_jsbsim.task.make_flat_space.
+
+    :param props: list of Properties
+
+    :return: list of (index of the properties in props, None for the Box or np.array of their min for the MultiDiscrete)
+    """
+    discrete = np.array([prop.spaces is Discrete for prop in props], dtype=bool)
+    layout = []
+    if not discrete.all():
+        layout.append((slice(None) if not discrete.any() else np.flatnonzero(~discrete), None))
+    if discrete.any():
+        index = np.flatnonzero(discrete)
+        layout.append((index, np.array([props[i].min for i in index], dtype=float)))
+    return layout
@@ -0,0 +1,272 @@
+import multiprocessing
+import os
+import pickle
+import traceback
+from multiprocessing import shared_memory
+import gym
+import numpy as np
+from gym_jsbsim.envs import get_task
+from gym_jsbsim.jsbsim_env import get_seed_sequence
+from gym_jsbsim.jsbsim_vector_env import JSBSimVectorEnv, make_vector_spaces
+
+# commands sent to the workers, the pipe carries nothing else but the seeds following SEED
+STEP = b"s"
+STEP_NO_ACTION = b"n"
+RESET = b"r"
+SEED = b"x"
+CLOSE = b"c"
+DONE = b"d"
+ERROR = b"e"
+
+
+def make_buffers(buf, num_envs, n_obs, n_actions):
+    """
+
+    Maps the arrays exchanged with the workers on a shared memory buffer.
+
+    :param buf: buffer of the shared memory, or None to only compute its size
+
+    :return: (dict of np.array, size of the buffer in bytes)
+
+    """
+    layout = [
+        ("actions", (num_envs, n_actions), np.float64),
+        ("state", (num_envs, n_obs), np.float64),
+        ("terminal_observation", (num_envs, n_obs), np.float64),
+        ("reward", (num_envs,), np.float64),
+        ("done", (num_envs,), np.bool_),
+    ]
+    buffers = {}
+    offset = 0
+    for name, shape, dtype in layout:
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if buf is not None:
+            buffers[name] = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        offset += size
+    return buffers, max(offset, 1)
+
+
+def worker(task, start, stop, num_envs, n_obs, n_actions, shm_name, pipe, warm_reset, trim_cache):
+    """
+
+    Runs the simulations start to stop of a JSBSimSubprocVectorEnv in a JSBSimVectorEnv,
+
+    reading their actions from and writing their results to the shared memory.
+
+    """
+    task = pickle.loads(task)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffers, _ = make_buffers(shm.buf, num_envs, n_obs, n_actions)
+    actions = buffers["actions"][start:stop]
+    state = buffers["state"][start:stop]
+    terminal_observation = buffers["terminal_observation"][start:stop]
+    reward = buffers["reward"][start:stop]
+    done = buffers["done"][start:stop]
+
+    env = JSBSimVectorEnv(task, num_envs=stop - start, warm_reset=warm_reset, trim_cache=trim_cache)
+    try:
+        while True:
+            command = pipe.recv_bytes()
+            try:
+                if command == STEP or command == STEP_NO_ACTION:
+                    state[:], reward[:], done[:], info = env.step(actions if command == STEP else None)
+                    if done.any():
+                        terminal_observation[done] = info["terminal_observation"]
+                elif command == RESET:
+                    state[:] = env.reset()
+                    done[:] = False
+                elif command[:1] == SEED:
+                    env.seed(pickle.loads(command[1:]))
+                elif command == CLOSE:
+                    break
+                pipe.send_bytes(DONE)
+            except Exception:
+                pipe.send_bytes(ERROR + traceback.format_exc().encode())
+    finally:
+        env.close()
+        del actions, state, terminal_observation, reward, done, buffers
+        shm.close()
+        pipe.close()
+
+
+class JSBSimSubprocVectorEnv(gym.Env):
+
+    """
+    A class running the simulations of a JSBSimVectorEnv in several worker processes.
+
+    Each worker owns a contiguous slice of the num_envs simulations. Actions, observations, rewards and dones
+    are exchanged through arrays in shared memory: the pipe of each worker only carries the step and reset commands
+    and their acknowledgement. The step, reset and returned values are the same as JSBSimVectorEnv.
+    """
+
+    metadata = {"render.modes": []}
+
+    def __init__(self, task, num_envs=2, num_workers=None, warm_reset=True, context=None, trim_cache=None):
+        """
+
+        Constructor. Starts the workers, JSBSimSubprocVectorEnv.reset() must be called first
+
+        before interacting with environment.
+
+        :param task: the Task instance the agent is to perform, or a Task subclass or the name of a task of
+
+            gym_jsbsim.TASKS. It is pickled to the workers, which run it as configured (define_state, define_action...)
+
+        :param num_envs: number of simulations run together
+
+        :param num_workers: number of worker processes, defaults to the number of cpus (at most num_envs)
+
+        :param warm_reset: if True, a simulation is sent back to the task initial conditions at reset
+
+        :param context: multiprocessing start method, defaults to the platform one
+
+        :param trim_cache: a gym_jsbsim.trim_cache.TrimCache, each worker gets a cache with its settings and shares
+
+            the states with the other workers through the files of its path
+
+        """
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_envs))
+
+        task = get_task(task)
+        self.task = task() if isinstance(task, type) else task
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+
+        n_obs = len(self.task.get_observation_var())
+        n_actions = len(self.task.get_action_var())
+        (
+            self.single_observation_space,
+            self.single_action_space,
+            self.observation_space,
+            self.action_space,
+        ) = make_vector_spaces(self.task, num_envs)
+
+        _, size = make_buffers(None, num_envs, n_obs, n_actions)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.buffers, _ = make_buffers(self.shm.buf, num_envs, n_obs, n_actions)
+
+        ctx = multiprocessing.get_context(context)
+        self.pipes = []
+        self.processes = []
+        self.bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        # pickled once, before any worker is started, so that a task that cannot be pickled fails here
+        task = pickle.dumps(self.task)
+        for start, stop in zip(self.bounds[:-1], self.bounds[1:]):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=worker,
+                args=(task, start, stop, num_envs, n_obs, n_actions, self.shm.name, child_pipe, warm_reset, trim_cache),
+                daemon=True,
+            )
+            process.start()
+            child_pipe.close()
+            self.pipes.append(parent_pipe)
+            self.processes.append(process)
+        self.closed = False
+        self.seed()
+
+    def send_command(self, command, payloads=None):
+        """
+
+        Sends a command to all the workers and waits for their acknowledgement.
+
+        :param command: bytes, one of the commands of the module
+
+        :param payloads: list of bytes appended to the command of each worker, or None
+
+        """
+        for i, pipe in enumerate(self.pipes):
+            pipe.send_bytes(command if payloads is None else command + payloads[i])
+        errors = []
+        for pipe in self.pipes:
+            answer = pipe.recv_bytes()
+            if answer[:1] == ERROR:
+                errors.append(answer[1:].decode())
+        if errors:
+            raise RuntimeError("Error in JSBSimSubprocVectorEnv worker:\n" + errors[0])
+
+    def step(self, actions=None):
+        """
+
+        Run one timestep of the dynamics of all the simulations.
+
+        :param actions: np.array of shape (num_envs, n_actions), or None to run without acting
+
+        :return: state, reward, done and info as JSBSimVectorEnv.step
+
+        """
+        if actions is None:
+            self.send_command(STEP_NO_ACTION)
+        else:
+            actions = np.asarray(actions, dtype=float)
+            if not actions.shape == self.buffers["actions"].shape:
+                raise ValueError("mismatch between actions and action space size")
+            self.buffers["actions"][:] = actions
+            self.send_command(STEP)
+
+        done = self.buffers["done"].copy()
+        info = {}
+        if done.any():
+            info["terminal_observation"] = self.buffers["terminal_observation"][done]
+        return self.buffers["state"].copy(), self.buffers["reward"].copy(), done, info
+
+    def reset(self, seed=None):
+        """
+
+        Resets all the simulations.
+
+        :param seed: if given, the environment is seeded with it first, see seed
+
+        :return: np.array of shape (num_envs, n_obs), the initial observations
+
+        """
+        if seed is not None:
+            self.seed(seed)
+        self.send_command(RESET)
+        return self.buffers["state"].copy()
+
+    def seed(self, seed=None):
+        """
+
+        Seeds the simulations with the same independent streams as a JSBSimVectorEnv of num_envs simulations,
+
+        whatever the number of workers.
+
+        :param seed: int, None to seed from the OS entropy, or np.random.SeedSequence
+
+        :return: list, the entropy of the seed sequence
+
+        """
+        seed_sequence = get_seed_sequence(seed)
+        seed_sequences = seed_sequence.spawn(self.num_envs)
+        self.send_command(
+            SEED,
+            [pickle.dumps(seed_sequences[start:stop]) for start, stop in zip(self.bounds[:-1], self.bounds[1:])],
+        )
+        return [seed_sequence.entropy]
+
+    def close(self):
+        """ Stops the workers and frees the shared memory. """
+        if self.closed:
+            return
+        self.closed = True
+        for pipe in self.pipes:
+            try:
+                pipe.send_bytes(CLOSE)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for pipe in self.pipes:
+            pipe.close()
+        self.buffers = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
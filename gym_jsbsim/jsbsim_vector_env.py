@@ -0,0 +1,340 @@
+from collections import deque
+from time import perf_counter
+import gym
+import numpy as np
+from gym.spaces import Box
+from gym_jsbsim.simulation import Simulation
+from gym_jsbsim.envs import get_task
+from gym_jsbsim.jsbsim_env import get_seed_sequence
+from gym_jsbsim.prefetcher import SimulationPrefetcher, get_latency_percentiles
+
+
+def make_vector_spaces(task, num_envs):
+    """
+
+    Builds the Box spaces of a batch of num_envs simulations of a task.
+
+    :param task: Task instance
+
+    :param num_envs: number of simulations
+
+    :return: (single observation space, single action space, batched observation space, batched action space)
+
+    """
+    observation_low, observation_high = task.get_observation_bounds()
+    action_low, action_high = task.get_action_bounds()
+    return (
+        Box(low=observation_low, high=observation_high, dtype=float),
+        Box(low=action_low, high=action_high, dtype=float),
+        Box(low=np.tile(observation_low, (num_envs, 1)), high=np.tile(observation_high, (num_envs, 1)), dtype=float),
+        Box(low=np.tile(action_low, (num_envs, 1)), high=np.tile(action_high, (num_envs, 1)), dtype=float),
+    )
+
+
+class JSBSimVectorEnv(gym.Env):
+
+    """
+    A class running num_envs JSBSim simulations of the same Task as one batched environment.
+
+    Actions are given as a (num_envs, n_actions) array, observations are returned as a (num_envs, n_obs) array,
+    rewards and dones as (num_envs,) arrays. Rewards and terminal conditions are computed on the whole batch
+    with the Task get_reward_batch and is_terminal_batch methods. A simulation reaching a terminal state is reset
+    automatically: its observation is then the first observation of the next episode and the last observation of
+    the finished episode is given in info["terminal_observation"].
+    """
+
+    metadata = {"render.modes": []}
+
+    def __init__(self, task, num_envs=2, warm_reset=True, pool=None, prefetch=0, trim_cache=None):
+        """
+
+        Constructor. JSBSimVectorEnv.reset() must be called first before interacting with environment.
+
+        :param task: the Task instance the agent is to perform, or a Task subclass or the name of a task of
+
+            gym_jsbsim.TASKS
+
+        :param num_envs: number of simulations run together
+
+        :param warm_reset: if True, a simulation is sent back to the task initial conditions at reset
+
+            instead of being rebuilt
+
+        :param pool: a SimulationPool to take the simulations from
+
+        :param prefetch: number of spare simulations prepared at initial conditions by a background thread,
+
+            swapped in when a simulation is reset, see SimulationPrefetcher
+
+        :param trim_cache: a gym_jsbsim.trim_cache.TrimCache the state of the simulations after their initial
+
+            conditions is restored from
+
+        """
+        task = get_task(task)
+        self.task = task() if isinstance(task, type) else task
+        self.num_envs = num_envs
+        self.warm_reset = warm_reset
+        self.pool = pool
+        self.sims = [None] * num_envs
+        self.np_randoms = None
+        self.prefetch = prefetch
+        self.trim_cache = trim_cache
+        self.prefetcher = None
+        # simulations of the previous episodes, given back to the prefetcher at the next step
+        self.returned_sims = []
+        # durations of the last resets of a simulation in seconds, see get_reset_latencies
+        self.reset_latencies = deque(maxlen=10000)
+        self.seed()
+
+        self.observation_low, self.observation_high = self.task.get_observation_bounds()
+        self.action_low, self.action_high = self.task.get_action_bounds()
+        self.clipped = np.array([prop.clipped for prop in self.task.get_observation_var()], dtype=bool)
+
+        (
+            self.single_observation_space,
+            self.single_action_space,
+            self.observation_space,
+            self.action_space,
+        ) = make_vector_spaces(self.task, num_envs)
+
+        self.state = np.zeros((num_envs, len(self.observation_low)))
+        self.reward_values = np.empty((num_envs, len(self.task.get_reward_var())))
+
+    def step(self, actions=None):
+        """
+
+        Run one timestep of the dynamics of all the simulations.
+
+        :param actions: np.array of shape (num_envs, n_actions), or None to run without acting
+
+        :return:
+
+            state: np.array of shape (num_envs, n_obs)
+
+            reward: np.array of shape (num_envs,)
+
+            done: np.array of shape (num_envs,) of bool
+
+            info: dict, with the clipped last observation of each finished episode in "terminal_observation"
+
+        """
+        action_var = self.task.get_action_var()
+        observation_var = self.task.get_observation_var()
+        if actions is not None:
+            actions = np.asarray(actions, dtype=float)
+            if not actions.shape == (self.num_envs, len(action_var)):
+                raise ValueError("mismatch between actions and action space size")
+        if self.returned_sims:
+            self.give_back_simulations()
+
+        for i, sim in enumerate(self.sims):
+            if actions is not None:
+                sim.set_property_values_from(action_var, actions[i])
+            sim.run()
+            sim.get_property_values_into(observation_var, self.state[i])
+
+        values = self.get_reward_values()
+        reward = self.task.get_reward_batch(values, self.sims)
+        done = self.is_terminal(values)
+
+        info = {}
+        if done.any():
+            terminal_observation = np.where(
+                self.clipped, np.clip(self.state, self.observation_low, self.observation_high), self.state
+            )
+            info["terminal_observation"] = terminal_observation[done]
+            for i in np.flatnonzero(done):
+                self.reset_sim(i)
+
+        return self.state.copy(), reward, done, info
+
+    def reset(self, seed=None):
+        """
+
+        Resets all the simulations.
+
+        :param seed: if given, the environment is seeded with it first, see seed
+
+        :return: np.array of shape (num_envs, n_obs), the initial observations
+
+        """
+        if seed is not None:
+            self.seed(seed)
+        for i in range(self.num_envs):
+            self.reset_sim(i)
+        return self.state.copy()
+
+    def seed(self, seed=None):
+        """
+
+        Seeds the random generators of the simulations with independent streams spawned from one seed sequence,
+
+        so that a batch is reproducible without correlating its simulations.
+
+        :param seed: int, None to seed from the OS entropy, np.random.SeedSequence, or list of num_envs
+
+            np.random.SeedSequence of the simulations
+
+        :return: list, the entropy of the seed sequence
+
+        """
+        if isinstance(seed, (list, tuple)):
+            seed_sequences = seed
+            prefetch_seed_sequence = seed_sequences[0].spawn(1)[0]
+        else:
+            seed_sequence = get_seed_sequence(seed)
+            seed_sequences = seed_sequence.spawn(self.num_envs)
+            prefetch_seed_sequence = seed_sequence.spawn(1)[0]
+        self.np_randoms = [np.random.default_rng(seed_sequence) for seed_sequence in seed_sequences]
+        for sim, np_random in zip(self.sims, self.np_randoms):
+            if sim is not None:
+                sim.np_random = np_random
+        # the spare simulations are prepared with their own generator, independent of the timing of the thread
+        self.prefetch_random = np.random.default_rng(prefetch_seed_sequence)
+        if self.prefetcher is not None:
+            self.close_prefetcher()
+        return [seed_sequences[0].entropy]
+
+    def reset_sim(self, i):
+        """
+
+        Resets the i-th simulation and writes its initial observation in the state.
+
+        :param i: index of the simulation
+
+        """
+        start = perf_counter()
+        if self.prefetch:
+            if self.prefetcher is None:
+                self.prefetcher = SimulationPrefetcher(self.prepare_spare_simulation, self.prefetch)
+            if len(self.returned_sims) >= self.prefetch:
+                # no spare simulation left to wait for without the ones not given back yet
+                self.give_back_simulations()
+            self.returned_sims.append(self.sims[i])
+            sim = self.sims[i] = self.prefetcher.get()
+        else:
+            init_conditions = self.task.get_initial_conditions(self.np_randoms[i])
+            sim = self.sims[i] = self.make_simulation(self.sims[i], init_conditions)
+        sim.np_random = self.np_randoms[i]
+        sim.taxi_path = self.task.taxi_path
+        self.task.reset_batch(self.num_envs, [i])
+        sim.get_property_values_into(self.task.get_observation_var(), self.state[i])
+        self.reset_latencies.append(perf_counter() - start)
+
+    def make_simulation(self, sim, init_conditions):
+        """
+
+        Sends a simulation back to initial conditions with a warm reset, or closes it and builds a new one.
+
+        :param sim: the Simulation of the previous episode, or None
+
+        :param init_conditions: dict mapping properties to their initial values
+
+        :return: Simulation
+
+        """
+        if self.warm_reset and sim is not None and sim.jsbsim_exec is not None:
+            sim.agent_interaction_steps = self.task.agent_interaction_steps
+            sim.reset(init_conditions)
+            return sim
+        if sim is not None:
+            sim.close()
+        make_simulation = self.pool.get_simulation if self.pool is not None else Simulation
+        sim = make_simulation(
+            aircraft_name=self.task.aircraft_name,
+            init_conditions=init_conditions,
+            jsbsim_freq=self.task.jsbsim_freq,
+            agent_interaction_steps=self.task.agent_interaction_steps,
+            trim_cache=self.trim_cache,
+        )
+        sim.set_catalog(self.task.get_catalog_props())
+        return sim
+
+    def prepare_spare_simulation(self, sim):
+        """
+
+        Prepares a spare simulation for the prefetcher, in its thread, see JSBSimEnv.prepare_spare_simulation.
+
+        :param sim: Simulation given back to the prefetcher, or None
+
+        :return: Simulation
+
+        """
+        return self.make_simulation(sim, self.task.get_initial_conditions(self.prefetch_random))
+
+    def give_back_simulations(self):
+        """ Gives the simulations of the previous episodes back to the prefetcher, to be prepared as spare ones. """
+        for sim in self.returned_sims:
+            self.prefetcher.put(sim)
+        self.returned_sims.clear()
+
+    def close_prefetcher(self):
+        """ Closes the prefetcher with its spare simulations, and the simulations not given back yet. """
+        self.prefetcher.close()
+        self.prefetcher = None
+        for sim in self.returned_sims:
+            if sim is not None:
+                sim.close()
+        self.returned_sims.clear()
+
+    def get_reset_latencies(self, percentiles=(50, 90, 99, 100)):
+        """
+
+        Gets percentiles of the duration of the last resets of a simulation, automatic resets included.
+
+        :param percentiles: sequence of percentiles in [0, 100]
+
+        :return: dict mapping each percentile to a duration in milliseconds
+
+        """
+        return get_latency_percentiles(self.reset_latencies, percentiles)
+
+    def get_reward_values(self):
+        """
+
+        Reads the properties needed by the task to compute rewards and terminal conditions.
+
+        :return: dict mapping each property of the task reward_var to the np.array of its values
+
+        """
+        reward_var = self.task.get_reward_var()
+        if self.reward_values.shape[1] != len(reward_var):
+            self.reward_values = np.empty((self.num_envs, len(reward_var)))
+        for i, sim in enumerate(self.sims):
+            sim.get_property_values_into(reward_var, self.reward_values[i])
+        return {prop: self.reward_values[:, j] for j, prop in enumerate(reward_var)}
+
+    def is_terminal(self, values):
+        """
+
+        Checks which simulations are in a terminal state.
+
+        :param values: dict mapping properties of the task reward_var to their values
+
+        :return: np.array of bool
+
+        """
+        is_contained = ((self.state >= self.observation_low) & (self.state <= self.observation_high)).all(axis=1)
+        if is_contained.all():
+            return self.task.is_terminal_batch(values, self.sims)
+        # as JSBSimEnv.is_terminal, the task terminal conditions (and their side effects, like a new target)
+        # are only checked for the simulations in the observation space
+        done = ~is_contained
+        index = np.flatnonzero(is_contained)
+        if len(index):
+            contained_values = {prop: value[index] for prop, value in values.items()}
+            done[index] = self.task.is_terminal_batch(contained_values, [self.sims[i] for i in index])
+        return done
+
+    def close(self):
+        """ Closes all the simulations. """
+        for sim in self.sims:
+            if sim is not None:
+                sim.close()
+        if self.prefetcher is not None:
+            self.close_prefetcher()
+
+    def get_sim_time(self):
+        """ Gets the simulation times, a np.array. """
+        return np.array([sim.get_sim_time() for sim in self.sims])
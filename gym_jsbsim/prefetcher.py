@@ -0,0 +1,115 @@
+import queue
+import threading
+import numpy as np
+
+# message of the work queue stopping the thread
+STOP = "stop"
+
+
+class SimulationPrefetcher:
+    """
+
+    Spare simulations prepared by a background thread, so that a reset swaps in a ready simulation instead of
+
+    loading an aircraft or running its initial conditions.
+
+    Each simulation taken with get is replaced by preparing a new one, from the simulation given back with put.
+
+    The JSBSim bindings hold the GIL: the thread does not run in parallel with the steps but in the switch intervals
+
+    between them, which spreads the cost of the resets over the episode instead of stalling the reset.
+
+    """
+
+    def __init__(self, prepare_simulation, spares=1):
+        """
+
+        Constructor. Starts the thread, which prepares the spare simulations.
+
+        :param prepare_simulation: function(Simulation or None) returning a Simulation at initial conditions,
+
+            reset from the given one or new, called in the thread
+
+        :param spares: number of simulations kept ready
+
+        """
+        self.prepare_simulation = prepare_simulation
+        self.spares = spares
+        self.error = None
+        self.work = queue.Queue()
+        self.ready = queue.Queue()
+        for _ in range(spares):
+            self.work.put(None)
+        self.thread = threading.Thread(target=self.prepare_simulations, daemon=True)
+        self.thread.start()
+
+    def get(self):
+        """
+
+        Takes a ready simulation, waiting for one if none is ready yet. Each simulation taken must be followed by a put,
+
+        which replaces it by a new spare one.
+
+        :return: Simulation
+
+        """
+        sim = self.ready.get()
+        if sim is None:
+            raise RuntimeError("SimulationPrefetcher failed to prepare a simulation") from self.error
+        return sim
+
+    def put(self, sim=None):
+        """
+
+        Gives a simulation back to be reset as a spare one.
+
+        The thread starts preparing it as soon as it gets the GIL, so the environments put the simulation of the
+
+        previous episode at their next step rather than in their reset, which would be delayed by the preparation.
+
+        :param sim: Simulation, or None to prepare a new one
+
+        """
+        self.work.put(sim)
+
+    def prepare_simulations(self):
+        """ Prepares the simulations of the work queue until the prefetcher is closed. Runs in the thread. """
+        while True:
+            sim = self.work.get()
+            if sim is STOP:
+                break
+            try:
+                self.ready.put(self.prepare_simulation(sim))
+            except Exception as error:
+                self.error = error
+                self.ready.put(None)
+
+    def close(self):
+        """ Stops the thread and closes the spare simulations. """
+        if self.thread.is_alive():
+            self.work.put(STOP)
+            self.thread.join()
+        while not self.work.empty():
+            sim = self.work.get()
+            if sim is not None and sim is not STOP:
+                sim.close()
+        while not self.ready.empty():
+            sim = self.ready.get()
+            if sim is not None:
+                sim.close()
+
+
+def get_latency_percentiles(latencies, percentiles=(50, 90, 99, 100)):
+    """
+
+    :param latencies: sequence of durations in seconds
+
+    :param percentiles: sequence of percentiles in [0, 100]
+
+    :return: dict mapping each percentile to a duration in milliseconds, empty without latencies
+
+    """
+    if not len(latencies):
+        return {}
+    values = np.percentile(np.array(latencies) * 1000, percentiles)
+    return dict(zip(percentiles, values.tolist()))
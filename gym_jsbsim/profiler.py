@@ -0,0 +1,84 @@
+from collections import defaultdict
+from time import perf_counter
+from gym_jsbsim.catalogs.catalog import get_property_name
+
+
+class Profiler:
+    """
+
+    Cumulative times and call counts of the phases of the steps of an environment and of the property getters
+
+    of its simulations.
+
+    The time of a getter includes the update function of its property and the getters it calls.
+
+    """
+
+    def __init__(self):
+        self.phase_times = defaultdict(float)
+        self.phase_counts = defaultdict(int)
+        self.property_times = defaultdict(float)
+        self.property_counts = defaultdict(int)
+
+    def add(self, phase, elapsed, count=1):
+        """
+
+        Adds a measure of a phase.
+
+        :param phase: str, name of the phase
+
+        :param elapsed: float, time spent in the phase in seconds
+
+        :param count: number of calls measured
+
+        """
+        self.phase_times[phase] += elapsed
+        self.phase_counts[phase] += count
+
+    def wrap_getter(self, prop, getter):
+        """
+
+        Wraps a property getter to count its calls and their time.
+
+        :param prop: Property
+
+        :param getter: function returning the property value
+
+        :return: function returning the property value
+
+        """
+        name = get_property_name(prop)
+        property_times, property_counts = self.property_times, self.property_counts
+
+        def profiled_getter():
+            start = perf_counter()
+            value = getter()
+            property_times[name] += perf_counter() - start
+            property_counts[name] += 1
+            return value
+
+        return profiled_getter
+
+    def get_profile(self):
+        """
+
+        Gets the measures.
+
+        :return: dict with "phases" and "properties", each mapping names to {"time": seconds, "count": int}
+
+            sorted by decreasing time
+
+        """
+        return {
+            "phases": make_table(self.phase_times, self.phase_counts),
+            "properties": make_table(self.property_times, self.property_counts),
+        }
+
+    def clear(self):
+        """ Sets back all the measures to 0. """
+        for measures in (self.phase_times, self.phase_counts, self.property_times, self.property_counts):
+            measures.clear()
+
+
+def make_table(times, counts):
+    return {name: {"time": times[name], "count": counts[name]} for name in sorted(times, key=times.get, reverse=True)}
@@ -0,0 +1,141 @@
+import os
+import queue
+import threading
+import numpy as np
+from gym_jsbsim.catalogs.catalog import get_property_name
+
+CSV = "csv"
+NPZ = "npz"
+
+# message of the writer thread queue closing an episode, followed by its index
+END_EPISODE = "end"
+
+
+class EpisodeRecorder:
+    """
+
+    A recorder of the values of a list of properties at each step of the episodes of a simulation.
+
+    The values are written into preallocated NumPy chunks, one row per recorded step with the simulation time first.
+
+    Full chunks and the last chunk of each episode are handed to a background thread which writes them in bulk
+
+    to one file per episode: appended to a CSV file, or saved at the end of the episode to an npz file
+
+    with one array per column.
+
+    """
+
+    def __init__(self, props, directory="records", file_format=CSV, decimation=1, chunk_size=1024, max_pending=16):
+        """
+
+        Constructor. Starts the writer thread.
+
+        :param props: list of the Properties recorded, e.g. Task.get_output()
+
+        :param directory: directory of the episode files, created if needed
+
+        :param file_format: CSV or NPZ
+
+        :param decimation: a row is recorded every decimation calls of record
+
+        :param chunk_size: number of rows of a chunk
+
+        :param max_pending: maximum number of chunks waiting to be written, record blocks when it is reached
+
+        """
+        if file_format not in (CSV, NPZ):
+            raise ValueError(f"unknown record format: {file_format}")
+        self.props = list(props)
+        self.columns = ["time"] + [get_property_name(prop) for prop in self.props]
+        self.directory = directory
+        self.file_format = file_format
+        self.decimation = decimation
+        self.chunk_size = chunk_size
+
+        self.episode = 0
+        self.steps = 0
+        self.rows = 0
+        self.chunk = np.empty((chunk_size, len(self.columns)))
+
+        os.makedirs(directory, exist_ok=True)
+        self.error = None
+        self.queue = queue.Queue(max_pending)
+        self.thread = threading.Thread(target=self.write_chunks, daemon=True)
+        self.thread.start()
+
+    def record(self, sim):
+        """
+
+        Records the values of the properties in a simulation, one call out of decimation.
+
+        :param sim: Simulation
+
+        """
+        if self.steps % self.decimation == 0:
+            row = self.chunk[self.rows]
+            row[0] = sim.get_sim_time()
+            sim.get_property_values_into(self.props, row[1:])
+            self.rows += 1
+            if self.rows == self.chunk_size:
+                self.submit()
+        self.steps += 1
+
+    def submit(self):
+        """ Hands the recorded rows to the writer thread and starts a new chunk. """
+        if self.error is not None:
+            raise RuntimeError("EpisodeRecorder failed to write an episode") from self.error
+        if self.rows:
+            self.queue.put((self.episode, self.chunk[: self.rows]))
+            self.chunk = np.empty_like(self.chunk)
+            self.rows = 0
+
+    def end_episode(self):
+        """ Closes the file of the current episode; the next recorded steps go to a new one. """
+        if self.steps:
+            self.submit()
+            self.queue.put((END_EPISODE, self.episode))
+            self.episode += 1
+            self.steps = 0
+
+    def get_path(self, episode):
+        return os.path.join(self.directory, f"episode_{episode:05d}.{self.file_format}")
+
+    def write_chunks(self):
+        """ Writes the chunks of the queue until the recorder is closed. Runs in the writer thread. """
+        files = {}  # episode -> open CSV file, or list of chunks
+        while True:
+            episode, chunk = self.queue.get()
+            if episode is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                if episode == END_EPISODE:
+                    episode_file = files.pop(chunk)
+                    if self.file_format == CSV:
+                        episode_file.close()
+                    else:
+                        values = np.concatenate(episode_file)
+                        np.savez(self.get_path(chunk), **{name: values[:, i] for i, name in enumerate(self.columns)})
+                elif self.file_format == CSV:
+                    if episode not in files:
+                        files[episode] = open(self.get_path(episode), "w")
+                        files[episode].write(",".join(self.columns) + "\n")
+                    np.savetxt(files[episode], chunk, delimiter=",", fmt="%.17g")
+                else:
+                    files.setdefault(episode, []).append(chunk)
+            except Exception as error:
+                self.error = error
+        for episode_file in files.values():
+            if self.file_format == CSV:
+                episode_file.close()
+
+    def close(self):
+        """ Writes the current episode and waits for the writer thread to end. """
+        if self.thread.is_alive():
+            self.end_episode()
+            self.queue.put((None, None))
+            self.thread.join()
+        if self.error is not None:
+            raise RuntimeError("EpisodeRecorder failed to write an episode") from self.error
@@ -0,0 +1,349 @@
+import math
+import operator
+import numpy as np
+
+GAUSSIAN = "gaussian"
+LAPLACE = "laplace"
+
+GEOMETRIC_MEAN = "geometric_mean"
+WEIGHTED_SUM = "weighted_sum"
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class Term:
+    """
+
+    A reward term exp(-sum of the components) ** power over one or several properties, each component being
+
+    ((value - offset) / scale) ** 2 for a GAUSSIAN term or |value - offset| / scale for a LAPLACE one.
+
+    """
+
+    def __init__(self, components, kind=GAUSSIAN, power=1.0):
+        """
+
+        Constructor.
+
+        :param components: list of (Property, scale) or (Property, scale, offset)
+
+        :param kind: GAUSSIAN or LAPLACE
+
+        :param power: exponent of the term
+
+        """
+        if kind not in (GAUSSIAN, LAPLACE):
+            raise ValueError(f"unknown reward term kind: {kind}")
+        self.components = [(component + (0.0,))[:3] for component in map(tuple, components)]
+        self.kind = kind
+        self.power = power
+
+
+def gaussian(prop, scale, offset=0.0, power=1.0):
+    """ Term exp(-((value - offset) / scale) ** 2) ** power of a property. """
+    return Term([(prop, scale, offset)], GAUSSIAN, power)
+
+
+def laplace(prop, scale=1.0, offset=0.0, power=1.0):
+    """ Term exp(-|value - offset| / scale) ** power of a property. """
+    return Term([(prop, scale, offset)], LAPLACE, power)
+
+
+class RewardSpec:
+    """
+
+    A reward declared as terms over properties combined by a geometric mean or a weighted sum.
+
+    The spec is compiled once into arrays of the columns, offsets and scales of its components: evaluate computes
+
+    the reward of one simulation from the vector of its property values, or of a batch from a matrix with one row per
+
+    simulation, with a fixed number of NumPy operations whatever the number of terms.
+
+    """
+
+    def __init__(self, terms, weights=None, combine=GEOMETRIC_MEAN):
+        """
+
+        Constructor.
+
+        :param terms: list of Term
+
+        :param weights: list of float, weight of each term, defaults to 1
+
+        :param combine: GEOMETRIC_MEAN, (prod term ** weight) ** (1 / sum of weights),
+
+            or WEIGHTED_SUM, sum of weight * term
+
+        """
+        if combine not in (GEOMETRIC_MEAN, WEIGHTED_SUM):
+            raise ValueError(f"unknown reward combination: {combine}")
+        self.terms = list(terms)
+        self.weights = np.ones(len(self.terms)) if weights is None else np.array(weights, dtype=float)
+        if not len(self.weights) == len(self.terms):
+            raise ValueError("mismatch between terms and weights size")
+        self.combine = combine
+
+        self.props = []
+        columns, scales, offsets, squared, starts = [], [], [], [], []
+        for term in self.terms:
+            starts.append(len(columns))
+            for prop, scale, offset in term.components:
+                if prop not in self.props:
+                    self.props.append(prop)
+                columns.append(self.props.index(prop))
+                scales.append(scale)
+                offsets.append(offset)
+                squared.append(term.kind == GAUSSIAN)
+        self.columns = np.array(columns, dtype=int)
+        self.scales = np.array(scales, dtype=float)
+        self.offsets = np.array(offsets, dtype=float)
+        self.squared = np.array(squared, dtype=bool)
+        self.starts = np.array(starts, dtype=int)
+        self.powers = np.array([term.power for term in self.terms], dtype=float)
+
+        # the same layout as tuples of Python floats, for a single simulation
+        stops = starts[1:] + [len(columns)]
+        components = list(zip(columns, offsets, scales, squared))
+        self.scalar_terms = [
+            (components[start:stop], power, weight)
+            for start, stop, power, weight in zip(starts, stops, self.powers.tolist(), self.weights.tolist())
+        ]
+        self.inverse_weight = 1 / self.weights.sum()
+
+    def evaluate(self, values):
+        """
+
+        Computes the reward.
+
+        :param values: np.array of the values of self.props, of shape (len(props),) or (n, len(props))
+
+        :return: float, or np.array of shape (n,)
+
+        """
+        if values.ndim == 1:
+            return self.evaluate_one(values.tolist())
+        with np.errstate(over="ignore", invalid="ignore"):
+            z = (values[..., self.columns] - self.offsets) / self.scales
+            z = np.where(self.squared, z * z, np.fabs(z))
+            terms = np.exp(-np.add.reduceat(z, self.starts, axis=-1))
+            if (self.powers != 1).any():
+                terms = terms ** self.powers
+            if self.combine == WEIGHTED_SUM:
+                return (terms * self.weights).sum(axis=-1)
+            if (self.weights != 1).any():
+                terms = terms ** self.weights
+            return terms.prod(axis=-1) ** self.inverse_weight
+
+    def evaluate_one(self, values):
+        """
+
+        Computes the reward of one simulation with Python floats, faster than NumPy for a few values.
+
+        :param values: list of the values of self.props
+
+        :return: float
+
+        """
+        weighted_sum = self.combine == WEIGHTED_SUM
+        result = 0.0 if weighted_sum else 1.0
+        for components, power, weight in self.scalar_terms:
+            total = 0.0
+            for column, offset, scale, squared in components:
+                z = (values[column] - offset) / scale
+                total += z * z if squared else abs(z)
+            term = math.exp(-total)
+            if power != 1:
+                term = term ** power
+            if weighted_sum:
+                result += weight * term
+            else:
+                result *= term if weight == 1 else term ** weight
+        return result if weighted_sum else result ** self.inverse_weight
+
+
+class Condition:
+    """
+
+    A terminal condition comparing a property, or its absolute value, to a threshold: op(value + offset, threshold).
+
+    """
+
+    def __init__(self, prop, op, threshold, offset=0.0, absolute=False):
+        """
+
+        Constructor.
+
+        :param prop: Property
+
+        :param op: one of ">", ">=", "<", "<=", "==", "!="
+
+        :param threshold: float
+
+        :param offset: float added to the value before the comparison
+
+        :param absolute: if True, the absolute value of value + offset is compared
+
+        """
+        if op not in OPERATORS:
+            raise ValueError(f"unknown comparison: {op}")
+        self.prop = prop
+        self.op = op
+        self.threshold = threshold
+        self.offset = offset
+        self.absolute = absolute
+
+
+class AnyOf:
+    """ A terminal condition met when one of its conditions is met. """
+
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+
+class AllOf:
+    """ A terminal condition met when all its conditions are met. """
+
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+
+class TerminalSpec:
+    """
+
+    Terminal conditions declared as comparisons of properties to thresholds combined with AnyOf and AllOf.
+
+    As RewardSpec, it is compiled once: evaluate compares all the properties of one simulation, or of a batch,
+
+    with one NumPy operation per comparison operator then combines the comparisons.
+
+    """
+
+    def __init__(self, *conditions):
+        """
+
+        Constructor.
+
+        :param conditions: Condition, AnyOf or AllOf, the state is terminal when one of them is met
+
+        """
+        self.condition = AnyOf(*conditions)
+        self.props = []
+        self.leaves = []
+        self.tree = self.compile(self.condition)
+
+        self.columns = np.array([self.props.index(leaf.prop) for leaf in self.leaves], dtype=int)
+        self.offsets = np.array([leaf.offset for leaf in self.leaves], dtype=float)
+        self.absolute = np.array([leaf.absolute for leaf in self.leaves], dtype=bool)
+        self.thresholds = np.array([leaf.threshold for leaf in self.leaves], dtype=float)
+        self.operators = [
+            (OPERATORS[op], np.array([i for i, leaf in enumerate(self.leaves) if leaf.op == op], dtype=int))
+            for op in sorted({leaf.op for leaf in self.leaves})
+        ]
+        self.scalar_tree = self.compile_scalar(self.condition)
+
+    def compile(self, condition):
+        """
+
+        Numbers the comparisons of a condition.
+
+        :param condition: Condition, AnyOf or AllOf
+
+        :return: index of the comparison of a Condition, or (np.any or np.all, list of compiled conditions or
+
+            np.array of the indexes of its comparisons)
+
+        """
+        if isinstance(condition, Condition):
+            if condition.prop not in self.props:
+                self.props.append(condition.prop)
+            self.leaves.append(condition)
+            return len(self.leaves) - 1
+        reduce = np.any if isinstance(condition, AnyOf) else np.all
+        children = [self.compile(child) for child in condition.conditions]
+        if all(isinstance(child, int) for child in children):
+            # only comparisons: reduced in one operation
+            return reduce, np.array(children, dtype=int)
+        return reduce, children
+
+    def compile_scalar(self, condition):
+        """
+
+        Compiles a condition into a function of the list of the values of self.props, for evaluate_one.
+
+        :param condition: Condition, AnyOf or AllOf
+
+        :return: function returning a bool
+
+        """
+        if isinstance(condition, Condition):
+            column, compare = self.props.index(condition.prop), OPERATORS[condition.op]
+            offset, threshold = condition.offset, condition.threshold
+            if condition.absolute:
+                return lambda values: compare(abs(values[column] + offset), threshold)
+            return lambda values: compare(values[column] + offset, threshold)
+
+        children = [self.compile_scalar(child) for child in condition.conditions]
+        if isinstance(condition, AnyOf):
+
+            def any_of(values):
+                for child in children:
+                    if child(values):
+                        return True
+                return False
+
+            return any_of
+
+        def all_of(values):
+            for child in children:
+                if not child(values):
+                    return False
+            return True
+
+        return all_of
+
+    def evaluate(self, values):
+        """
+
+        Checks the terminal conditions.
+
+        :param values: np.array of the values of self.props, of shape (len(props),) or (n, len(props))
+
+        :return: bool, or np.array of bool of shape (n,)
+
+        """
+        if values.ndim == 1:
+            return self.evaluate_one(values.tolist())
+        x = values[..., self.columns] + self.offsets
+        x = np.where(self.absolute, np.fabs(x), x)
+        results = np.empty(x.shape, dtype=bool)
+        for compare, index in self.operators:
+            results[..., index] = compare(x[..., index], self.thresholds[index])
+        return self.reduce(self.tree, results)
+
+    def reduce(self, node, results):
+        if not isinstance(node, tuple):
+            return results[..., node]
+        reduce, children = node
+        if isinstance(children, np.ndarray):
+            return reduce(results[..., children], axis=-1)
+        return reduce([self.reduce(child, results) for child in children], axis=0)
+
+    def evaluate_one(self, values):
+        """
+
+        Checks the terminal conditions of one simulation with Python floats, faster than NumPy for a few values.
+
+        :param values: list of the values of self.props
+
+        :return: bool
+
+        """
+        return self.scalar_tree(values)
@@ -1,9 +1,48 @@
 from collections import namedtuple
+from functools import partial
 import re
 from os import environ
 import jsbsim
-from gym_jsbsim.catalogs.catalog import Catalog
+import numpy as np
+from gym_jsbsim.catalogs.catalog import Catalog, CatalogView, get_jsbsim_catalog
+from gym_jsbsim.catalogs.my_catalog import MyCatalog
 from gym_jsbsim.catalogs.property import Property, CustomProperty
+from gym_jsbsim import __jsbsim_version__
+
+if __jsbsim_version__ != jsbsim.__version__:
+    print(
+        "Warning: You are using jsbsim-{} while gym-jsbsin was generated with {}".format(
+            jsbsim.__version__, __jsbsim_version__
+        )
+    )
+
+# JSBSim properties of the aircraft state saved by a snapshot, with the initial conditions they are restored through
+SNAPSHOT_STATE = (
+    ("position/lat-gc-rad", "ic/lat-gc-rad"),
+    ("position/long-gc-rad", "ic/long-gc-rad"),
+    ("position/h-sl-ft", "ic/h-sl-ft"),
+    ("attitude/phi-rad", "ic/phi-rad"),
+    ("attitude/theta-rad", "ic/theta-rad"),
+    ("attitude/psi-rad", "ic/psi-true-rad"),
+    ("velocities/u-fps", "ic/u-fps"),
+    ("velocities/v-fps", "ic/v-fps"),
+    ("velocities/w-fps", "ic/w-fps"),
+    ("velocities/p-rad_sec", "ic/p-rad_sec"),
+    ("velocities/q-rad_sec", "ic/q-rad_sec"),
+    ("velocities/r-rad_sec", "ic/r-rad_sec"),
+)
+
+# writable JSBSim properties saved by a snapshot with the MyCatalog ones:
+# flight controls, autopilot, gear, engines, fuel
+SNAPSHOT_PROPERTY = re.compile(
+    r"^(fcs/|ap/|tc/|gear/gear-"
+    r"|propulsion/engine(\[\d+\])?/(n1|n2|set-running)$"
+    r"|propulsion/tank(\[\d+\])?/contents-lbs$)"
+)
+
+# state of a Simulation: its time, the np.array of the SNAPSHOT_STATE values and the np.array of the values of the
+# properties matching SNAPSHOT_PROPERTY and of MyCatalog
+Snapshot = namedtuple("Snapshot", ["aircraft_name", "sim_time", "state", "values"])
 
 
 class Simulation:
@@ -13,7 +52,16 @@ class Simulation:
 
     """
 
-    def __init__(self, aircraft_name="A320", init_conditions=None, jsbsim_freq=60, agent_interaction_steps=5):
+    def __init__(
+        self,
+        aircraft_name="A320",
+        init_conditions=None,
+        jsbsim_freq=60,
+        agent_interaction_steps=5,
+        jsbsim_exec=None,
+        pool=None,
+        trim_cache=None,
+    ):
         """
 
         Constructor. Creates an instance of JSBSim, loads an aircraft and sets initial conditions.
@@ -31,31 +79,149 @@ class Simulation:
 
         :param agent_interaction_steps: simulation steps before the agent interact
 
+        :param jsbsim_exec: an already loaded JSBSim instance of aircraft_name at jsbsim_freq, sent back
+
+            to its initial conditions. Defaults to None, causing a new instance to be created.
+
+        :param pool: the SimulationPool jsbsim_exec is given back to when the simulation is closed
+
+        :param trim_cache: a gym_jsbsim.trim_cache.TrimCache the initialised states are restored from, or None
+
         """
 
-        self.jsbsim_exec = jsbsim.FGFDMExec(environ["JSBSIM_ROOT_DIR"])
-        self.jsbsim_exec.set_debug_level(0)  # requests JSBSim not to output any messages whatsoever
+        self.aircraft_name = aircraft_name
+        self.jsbsim_freq = jsbsim_freq
+        self.pool = pool
+        self.trim_cache = trim_cache
+        # random generator of the task, set by the environment from its seed
+        self.np_random = np.random.default_rng()
+        # centerline followed by the taxi properties, None for gym_jsbsim.catalogs.my_catalog.get_taxi_path()
+        self.taxi_path = None
+
+        if jsbsim_exec is None:
+            jsbsim_exec = self.load_jsbsim_exec(aircraft_name, jsbsim_freq)
+        self.jsbsim_exec = jsbsim_exec
+
+        # properties saved by get_sim_state: the JSBSim properties of the aircraft and the task ones
+        self.catalog = CatalogView(get_jsbsim_catalog(aircraft_name, jsbsim_exec))
+
+        # accessors of the properties, resolved at their first use
+        self.nodes = {}
+        self.getters = {}
+        self.setters = {}
+        self.property_groups = {}
+        self.snapshot_accessors = None
+        self.profiler = None
+
+        # derived properties with declared dependencies whose value is up to date, and for each JSBSim property name
+        # the derived properties to recompute when it is written
+        self.derived = set()
+        self.dependents = {}
 
-        self.jsbsim_exec.load_model(aircraft_name)
+        self.agent_interaction_steps = agent_interaction_steps
+
+        if trim_cache is not None:
+            self.initialise_from_trim_cache(init_conditions)
+        else:
+            self.initialise(init_conditions)
 
-        # collect all jsbsim properties in Catalog
-        Catalog.add_jsbsim_props(self.jsbsim_exec.query_property_catalog(""))
+    @staticmethod
+    def load_jsbsim_exec(aircraft_name, jsbsim_freq):
+        """
+
+        Creates an instance of JSBSim and loads an aircraft.
+
+        :param aircraft_name: name of aircraft to be loaded.
+
+        :param jsbsim_freq: JSBSim integration frequency
+
+        :return: jsbsim.FGFDMExec
+
+        """
+        jsbsim_exec = jsbsim.FGFDMExec(environ["JSBSIM_ROOT_DIR"])
+        jsbsim_exec.set_debug_level(0)  # requests JSBSim not to output any messages whatsoever
+
+        jsbsim_exec.load_model(aircraft_name)
 
         # set jsbsim integration time step
         dt = 1 / jsbsim_freq
-        self.jsbsim_exec.set_dt(dt)
-
-        self.agent_interaction_steps = agent_interaction_steps
+        jsbsim_exec.set_dt(dt)
 
-        self.initialise(init_conditions)
+        return jsbsim_exec
 
     def initialise(self, init_conditions):
         self.set_initial_conditions(init_conditions)
         success = self.jsbsim_exec.run_ic()
         self.propulsion_init_running(-1)
+        self.invalidate_derived_properties()
         if not success:
             raise RuntimeError("JSBSim failed to init simulation conditions.")
 
+    def reset(self, init_conditions=None):
+        """
+
+        Sends the already loaded JSBSim instance back to initial conditions.
+
+        The aircraft model is not reloaded: the custom properties are cleared, init_conditions are applied,
+
+        initial conditions are run and the engines are started again.
+
+        :param init_conditions: dict mapping properties to their initial values
+
+        """
+        if self.trim_cache is not None:
+            self.initialise_from_trim_cache(init_conditions, reset=True)
+        else:
+            self.reset_to_initial_conditions(self.jsbsim_exec)
+            self.initialise(init_conditions)
+
+    def initialise_from_trim_cache(self, init_conditions, reset=False):
+        """
+
+        Restores the state of the simulation after init_conditions from the trim cache, or initialises the simulation,
+
+        adds its state to the cache and restores it. The restored state is close to the one of initialise but not
+
+        identical (see restore_snapshot), and the same whether the key was in the cache or not.
+
+        :param init_conditions: dict mapping properties to their initial values
+
+        :param reset: if True, the JSBSim instance is sent back to its initial conditions before being initialised
+
+        """
+        key = self.trim_cache.get_key(
+            self.aircraft_name, self.jsbsim_freq, init_conditions, self.jsbsim_exec.get_root_dir()
+        )
+        snapshot = self.trim_cache.get(key)
+        # a state saved with other snapshot properties (another version of the catalogs) is not restored
+        if snapshot is not None and len(snapshot.values) == len(self.get_snapshot_accessors()[3]):
+            self.restore_snapshot(snapshot)
+            return
+        if reset:
+            self.reset_to_initial_conditions(self.jsbsim_exec)
+        self.initialise(init_conditions)
+        snapshot = self.save_snapshot()
+        self.trim_cache.put(key, snapshot)
+        # a miss restores the state it saved, as a hit does, so that an episode does not depend on the cache content
+        self.restore_snapshot(snapshot)
+
+    @staticmethod
+    def reset_to_initial_conditions(jsbsim_exec):
+        """
+
+        Resets a JSBSim instance and sets back to 0 the properties of MyCatalog created by a previous episode,
+
+        as they would be in a newly loaded JSBSim instance.
+
+        :param jsbsim_exec: jsbsim.FGFDMExec
+
+        """
+        jsbsim_exec.reset_to_initial_conditions(0)
+        property_manager = jsbsim_exec.get_property_manager()
+        for prop in MyCatalog:
+            if property_manager.hasNode(prop.name_jsbsim):
+                jsbsim_exec.set_property_value(prop.name_jsbsim, 0)
+
     def propulsion_init_running(self, i):
         propulsion = self.jsbsim_exec.get_propulsion()
         n = propulsion.get_num_engines()
@@ -99,11 +265,56 @@ class Simulation:
         :return: bool, False if sim has met JSBSim termination criteria else True.
 
         """
-        for _ in range(self.agent_interaction_steps):
-            result = self.jsbsim_exec.run()
-            if not result:
+        self.run_steps()
+        return True
+
+    def run_steps(self, nb_steps=None, trace=None, out=None):
+        """
+
+        Runs nb_steps JSBSim integration steps, optionally recording properties after each of them
+
+        (e.g. to average a reward over the steps of a repeated action).
+
+        :param nb_steps: number of steps, defaults to agent_interaction_steps
+
+        :param trace: list of Properties recorded after each step, or None
+
+        :param out: np.array of float64 of shape (nb_steps, len(trace)) filled with the trace, allocated if None
+
+        :return: out, or None without trace
+
+        """
+        if nb_steps is None:
+            nb_steps = self.agent_interaction_steps
+        run = self.jsbsim_exec.run
+        if trace is None:
+            for _ in range(nb_steps):
+                if not run():
+                    raise RuntimeError("JSBSim failed.")
+            self.invalidate_derived_properties()
+            return None
+
+        if out is None:
+            out = np.empty((nb_steps, len(trace)))
+        elif not out.shape == (nb_steps, len(trace)):
+            raise ValueError("mismatch between trace and out size")
+        group = self.get_property_group(trace)
+        for i in range(nb_steps):
+            if not run():
                 raise RuntimeError("JSBSim failed.")
-        return result
+            self.invalidate_derived_properties()
+            group.get_values_into(out[i])
+        return out
+
+    def invalidate_derived_properties(self):
+        """
+
+        Marks the derived properties as out of date: their update function runs again at their next read.
+
+        Must be called after writing a property directly in jsbsim_exec.
+
+        """
+        self.derived.clear()
 
     def get_sim_time(self):
         """ Gets the simulation time from JSBSim, a float. """
@@ -114,6 +325,8 @@ class Simulation:
         """ Closes the simulation and any plots. """
 
         if self.jsbsim_exec:
+            if self.pool is not None:
+                self.pool.release(self.jsbsim_exec, self.aircraft_name, self.jsbsim_freq)
             self.jsbsim_exec = None
 
     def get_property_values(self, props):
@@ -143,6 +356,52 @@ class Simulation:
         for prop, value in zip(props, values):
             self.set_property_value(prop, value)
 
+    def get_property_group(self, props):
+        """
+
+        Get the PropertyGroup binding a list of properties to this simulation.
+
+        The group is built at the first call with props and reused by the next calls with the same list object.
+
+        :param props: list of Properties
+
+        :return: PropertyGroup
+
+        """
+        entry = self.property_groups.get(id(props))
+        if entry is None or entry[0] is not props or len(entry[1].props) != len(props):
+            entry = (props, PropertyGroup(self, props))
+            self.property_groups[id(props)] = entry
+        return entry[1]
+
+    def get_property_values_into(self, props, out):
+        """
+
+        Get the values of the specified properties into a preallocated array
+
+        :param props: list of Properties
+
+        :param out: np.array of float64 of size len(props), filled with the properties values
+
+        :return: out
+
+        """
+        return self.get_property_group(props).get_values_into(out)
+
+    def set_property_values_from(self, props, values):
+        """
+
+        Set the values of the specified properties from an array
+
+        :param props: list of Properties
+
+        :param values: np.array of float64 of size len(props)
+
+        """
+        if not len(props) == len(values):
+            raise ValueError("mismatch between properties and values size")
+        self.get_property_group(props).set_values_from(values)
+
     def get_property_value(self, prop):
         """
         Get the value of the specified property from the JSBSim simulation
@@ -151,50 +410,170 @@ class Simulation:
 
         :return : float
         """
+        getter = self.getters.get(prop)
+        if getter is None:
+            getter = self.compile_getter(prop)
+        return getter()
+
+    def set_property_value(self, prop, value):
+        """
+        Set the values of the specified property
+
+        :param prop: Property
+
+        :param value: float
+
+        """
+        setter = self.setters.get(prop)
+        if setter is None:
+            setter = self.compile_setter(prop)
+        return setter(value)
+
+    def get_node(self, name_jsbsim):
+        """
+        Get a direct accessor to a JSBSim property, created if it does not exist yet
+
+        :param name_jsbsim: str, JSBSim property name
+
+        :return : (function returning the property value, function setting the property value)
+        """
+        accessors = self.nodes.get(name_jsbsim)
+        if accessors is None:
+            property_manager = self.jsbsim_exec.get_property_manager()
+            if hasattr(property_manager, "get_node"):
+                node = property_manager.get_node(name_jsbsim, True)
+                accessors = (node.get_double_value, node.set_double_value)
+            else:
+                # older JSBSim bindings have no access to property nodes
+                accessors = (
+                    partial(self.jsbsim_exec.get_property_value, name_jsbsim),
+                    partial(self.jsbsim_exec.set_property_value, name_jsbsim),
+                )
+            self.nodes[name_jsbsim] = accessors
+        return accessors
+
+    def get_dependents(self, name_jsbsim):
+        """
+        Get the derived properties depending on a JSBSim property, filled as their getters are compiled
+
+        :param name_jsbsim: str, JSBSim property name
+
+        :return : list of Properties
+        """
+        dependents = self.dependents.get(name_jsbsim)
+        if dependents is None:
+            dependents = self.dependents[name_jsbsim] = []
+        return dependents
+
+    def compile_getter(self, prop):
+        """
+        Resolve once the way to read a property: its JSBSim node and its update function
+
+        :param prop: Property
+
+        :return : function returning the property value
+        """
         if isinstance(prop, Property):
-            if prop.access == "R":
-                if prop.update:
-                    prop.update(self)
-            return self.jsbsim_exec.get_property_value(prop.name_jsbsim)
+            get_value, _ = self.get_node(prop.name_jsbsim)
+            if prop.access == "R" and prop.update and prop.depends is not None:
+                # derived property: updated at most once per run or write of one of its dependencies
+                update = prop.update
+                derived = self.derived
+                for dependency in prop.depends:
+                    # a getter compiled again, e.g. by set_profiler, is not added twice to the invalidated properties
+                    dependents = self.get_dependents(dependency.name_jsbsim)
+                    if prop not in dependents:
+                        dependents.append(prop)
+
+                def getter():
+                    if prop not in derived:
+                        update(self)
+                        derived.add(prop)
+                    return get_value()
+
+            elif prop.access == "R" and prop.update:
+                update = prop.update
+
+                def getter():
+                    update(self)
+                    return get_value()
+
+            else:
+                getter = get_value
         elif isinstance(prop, CustomProperty):
             if "R" in prop.access and prop.read:
-                return prop.read(self)
+                getter = partial(prop.read, self)
             else:
                 raise RuntimeError(f"{prop} is not readable")
         else:
             raise ValueError(f"prop type unhandled: {type(prop)} ({prop})")
+        if self.profiler is not None:
+            getter = self.profiler.wrap_getter(prop, getter)
+        self.getters[prop] = getter
+        return getter
 
-    def set_property_value(self, prop, value):
+    def compile_setter(self, prop):
         """
-        Set the values of the specified property
+        Resolve once the way to write a property: its JSBSim node, its bounds and its update function
 
         :param prop: Property
 
-        :param value: float
-
+        :return : function setting the property value
         """
-        # set value in property bounds
         if isinstance(prop, Property):
-            if value < prop.min:
-                value = prop.min
-            elif value > prop.max:
-                value = prop.max
+            _, set_value = self.get_node(prop.name_jsbsim)
+            prop_min, prop_max = prop.min, prop.max
+            update = prop.update if "W" in prop.access else None
+            dependents = self.get_dependents(prop.name_jsbsim)
+            derived = self.derived
+
+            def setter(value):
+                # set value in property bounds
+                if value < prop_min:
+                    value = prop_min
+                elif value > prop_max:
+                    value = prop_max
+                set_value(value)
+                if dependents:
+                    derived.difference_update(dependents)
+                if update:
+                    update(self)
 
-            self.jsbsim_exec.set_property_value(prop.name_jsbsim, value)
-
-            if "W" in prop.access:
-                if prop.update:
-                    prop.update(self)
         elif isinstance(prop, CustomProperty):
             if "W" in prop.access and prop.write:
-                return prop.write(self, value)
+                setter = partial(prop.write, self)
             else:
-                raise RuntimeError(f"{prop} is not readable")
+                raise RuntimeError(f"{prop} is not writable")
         else:
             raise ValueError(f"prop type unhandled: {type(prop)} ({prop})")
+        self.setters[prop] = setter
+        return setter
+
+    def set_profiler(self, profiler):
+        """
+
+        Sets the Profiler counting the calls of the property getters and their time.
+
+        :param profiler: gym_jsbsim.profiler.Profiler, or None to stop profiling
+
+        """
+        self.profiler = profiler
+        # the getters are compiled again, with or without profiling
+        self.getters.clear()
+        self.property_groups.clear()
+
+    def set_catalog(self, props):
+        """
+
+        Sets the task properties saved by get_sim_state with the JSBSim properties of the aircraft.
+
+        :param props: list of Properties
+
+        """
+        self.catalog = CatalogView(self.catalog.base, props)
 
     def get_sim_state(self):
-        return {prop: self.get_property_value(prop) for prop in Catalog.values()}
+        return {prop: self.get_property_value(prop) for prop in self.catalog.values()}
 
     def state_to_ic(self, state):
         init_conditions = {}
@@ -228,3 +607,164 @@ class Simulation:
         init_conditions = self.state_to_ic(state)
         self.jsbsim_exec.reset_to_initial_conditions(0)
         self.initialise(init_conditions)
+
+    def get_snapshot_accessors(self):
+        """
+
+        Get the accessors of the properties saved by a snapshot, resolved at the first call.
+
+        :return: (getters of SNAPSHOT_STATE, setters of their initial conditions, getters of the snapshot values,
+
+            setters of the snapshot values)
+
+        """
+        if self.snapshot_accessors is None:
+            names = [
+                prop.name_jsbsim
+                for prop in self.catalog.base.values()
+                if "W" in prop.access and SNAPSHOT_PROPERTY.match(prop.name_jsbsim)
+            ]
+            names = list(dict.fromkeys(names + [prop.name_jsbsim for prop in MyCatalog]))
+            values_accessors = [self.get_node(name) for name in names]
+            self.snapshot_accessors = (
+                [self.get_node(name)[0] for name, _ in SNAPSHOT_STATE],
+                [self.get_node(ic_name)[1] for _, ic_name in SNAPSHOT_STATE],
+                [get_value for get_value, _ in values_accessors],
+                [set_value for _, set_value in values_accessors],
+            )
+        return self.snapshot_accessors
+
+    def save_snapshot(self):
+        """
+
+        Saves the state of the simulation.
+
+        :return: Snapshot
+
+        """
+        state_getters, _, getters, _ = self.get_snapshot_accessors()
+        return Snapshot(
+            self.aircraft_name,
+            self.get_sim_time(),
+            np.array([get_value() for get_value in state_getters]),
+            np.array([get_value() for get_value in getters]),
+        )
+
+    def restore_snapshot(self, snapshot):
+        """
+
+        Sends the simulation back to a snapshot of a simulation of the same aircraft.
+
+        The JSBSim models are reset to the aircraft state through the initial conditions, without trimming
+
+        the aircraft, then the flight controls, engines, fuel and MyCatalog values are written back. The JSBSim
+
+        bindings give no access to the past derivatives of the integrators, which restart from the restored state:
+
+        the trajectory stays close to the one of the saved simulation, and the restores of a snapshot give the same
+
+        trajectory up to rounding errors.
+
+        :param snapshot: Snapshot
+
+        """
+        if snapshot.aircraft_name != self.aircraft_name:
+            raise ValueError(f"snapshot of {snapshot.aircraft_name} restored in a simulation of {self.aircraft_name}")
+        _, ic_setters, _, setters = self.get_snapshot_accessors()
+        # the initial conditions are converted to each other: set twice so that they do not depend on the previous ones
+        for _ in range(2):
+            for set_value, value in zip(ic_setters, snapshot.state.tolist()):
+                set_value(value)
+        self.jsbsim_exec.reset_to_initial_conditions(0)
+        values = snapshot.values.tolist()
+        for set_value, value in zip(setters, values):
+            set_value(value)
+        if not self.jsbsim_exec.run_ic():
+            raise RuntimeError("JSBSim failed to init simulation conditions.")
+        # initial conditions run the flight controls and engines
+        for set_value, value in zip(setters, values):
+            set_value(value)
+        self.jsbsim_exec.set_sim_time(snapshot.sim_time)
+        self.invalidate_derived_properties()
+
+
+class PropertyGroup:
+    """
+
+    A list of properties bound once to the accessors of a Simulation, to read or write all their values
+
+    with a caller-owned float64 array.
+
+    """
+
+    def __init__(self, sim, props):
+        """
+
+        Constructor. Resolves the getters of the properties, and the JSBSim nodes, bounds and update functions
+
+        used to write them.
+
+        :param sim: Simulation
+
+        :param props: list of Properties
+
+        """
+        self.sim = sim
+        self.props = list(props)
+        self.getters = [sim.getters.get(prop) or sim.compile_getter(prop) for prop in self.props]
+        self.setters = None
+        self.min = np.array([prop.min if isinstance(prop, Property) else -np.inf for prop in self.props], dtype=float)
+        self.max = np.array([prop.max if isinstance(prop, Property) else np.inf for prop in self.props], dtype=float)
+        self.buffer = np.empty(len(self.props))
+
+    def compile_setters(self):
+        """
+
+        Resolves for each property the function writing an already bounded value and its update function.
+
+        """
+        self.setters = []
+        for prop in self.props:
+            if isinstance(prop, Property):
+                _, set_value = self.sim.get_node(prop.name_jsbsim)
+                update = prop.update if "W" in prop.access else None
+                dependents = self.sim.get_dependents(prop.name_jsbsim)
+            else:
+                set_value, update, dependents = self.sim.setters.get(prop) or self.sim.compile_setter(prop), None, None
+            self.setters.append((set_value, update, dependents))
+
+    def get_values_into(self, out):
+        """
+
+        Reads the values of the properties
+
+        :param out: np.array of float64 of size len(props)
+
+        :return: out
+
+        """
+        i = 0
+        for getter in self.getters:
+            out[i] = getter()
+            i += 1
+        return out
+
+    def set_values_from(self, values):
+        """
+
+        Writes the values of the properties, bounded by their min and max
+
+        :param values: np.array of size len(props)
+
+        """
+        if self.setters is None:
+            self.compile_setters()
+        np.clip(values, self.min, self.max, out=self.buffer)
+        sim = self.sim
+        derived = sim.derived
+        for (set_value, update, dependents), value in zip(self.setters, self.buffer.tolist()):
+            set_value(value)
+            if dependents:
+                derived.difference_update(dependents)
+            if update:
+                update(sim)
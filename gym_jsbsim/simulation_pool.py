@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from threading import Lock
+from gym_jsbsim.simulation import Simulation
+
+
+class SimulationPool:
+    """
+
+    A pool of loaded JSBSim instances shared by the Simulation objects of a process.
+
+    Instances are kept idle per (aircraft_name, jsbsim_freq): a Simulation checks one out when it is created
+
+    and gives it back, reset to initial conditions, when it is closed. When more than max_size instances are idle,
+
+    the least recently used ones are evicted.
+
+    """
+
+    def __init__(self, max_size=32):
+        """
+
+        Constructor.
+
+        :param max_size: maximum number of idle JSBSim instances kept in the pool
+
+        """
+        self.max_size = max_size
+        self.idle = OrderedDict()  # (aircraft_name, jsbsim_freq, id) -> jsbsim.FGFDMExec, least recently used first
+        self.lock = Lock()
+
+    def get_simulation(
+        self, aircraft_name="A320", init_conditions=None, jsbsim_freq=60, agent_interaction_steps=5, trim_cache=None
+    ):
+        """
+
+        Creates a Simulation from an idle JSBSim instance of the pool, or from a new one if none is available.
+
+        :param aircraft_name: name of aircraft to be loaded.
+
+        :param init_conditions: dict mapping properties to their initial values.
+
+        :param jsbsim_freq: JSBSim integration frequency
+
+        :param agent_interaction_steps: simulation steps before the agent interact
+
+        :param trim_cache: a TrimCache the initialised states are restored from, or None
+
+        :return: Simulation, giving back its JSBSim instance to the pool when closed
+
+        """
+        jsbsim_exec = self.acquire(aircraft_name, jsbsim_freq)
+        if jsbsim_exec is None:
+            jsbsim_exec = Simulation.load_jsbsim_exec(aircraft_name, jsbsim_freq)
+        return Simulation(
+            aircraft_name=aircraft_name,
+            init_conditions=init_conditions,
+            jsbsim_freq=jsbsim_freq,
+            agent_interaction_steps=agent_interaction_steps,
+            jsbsim_exec=jsbsim_exec,
+            pool=self,
+            trim_cache=trim_cache,
+        )
+
+    def acquire(self, aircraft_name, jsbsim_freq):
+        """
+
+        Checks out the most recently used idle JSBSim instance of aircraft_name at jsbsim_freq.
+
+        :return: jsbsim.FGFDMExec, or None if no such instance is idle
+
+        """
+        with self.lock:
+            for key in reversed(self.idle):
+                if key[:2] == (aircraft_name, jsbsim_freq):
+                    return self.idle.pop(key)
+        return None
+
+    def release(self, jsbsim_exec, aircraft_name, jsbsim_freq):
+        """
+
+        Resets a JSBSim instance to initial conditions and gives it back to the pool.
+
+        :param jsbsim_exec: jsbsim.FGFDMExec with aircraft_name loaded
+
+        :param aircraft_name: name of the loaded aircraft
+
+        :param jsbsim_freq: JSBSim integration frequency of jsbsim_exec
+
+        """
+        Simulation.reset_to_initial_conditions(jsbsim_exec)
+        with self.lock:
+            self.idle[(aircraft_name, jsbsim_freq, id(jsbsim_exec))] = jsbsim_exec
+            self.evict()
+
+    def resize(self, max_size):
+        """
+
+        Changes the maximum number of idle JSBSim instances, evicting the least recently used ones if needed.
+
+        :param max_size: int
+
+        """
+        with self.lock:
+            self.max_size = max_size
+            self.evict()
+
+    def evict(self):
+        while len(self.idle) > self.max_size:
+            self.idle.popitem(last=False)
+
+    def clear(self):
+        """ Evicts all idle JSBSim instances. """
+        with self.lock:
+            self.idle.clear()
+
+    def __len__(self):
+        return len(self.idle)
+
+
+# the pool shared by all the environments of the process
+SIMULATION_POOL = SimulationPool()
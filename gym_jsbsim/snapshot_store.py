@@ -0,0 +1,222 @@
+import os
+import numpy as np
+from gym_jsbsim.simulation import Snapshot
+
+LRU = "lru"
+PRIORITY = "priority"
+
+
+class SnapshotStore:
+    """
+
+    A bounded library of simulation snapshots to start episodes from, e.g. states visited just before a failure.
+
+    The snapshots of a store share one schema, set by the first one added: they are kept in contiguous NumPy arrays,
+
+    optionally memory-mapped in files of a directory to spill them to disk. When the store is full, adding a snapshot
+
+    evicts the least recently used one (LRU) or the one of lowest priority (PRIORITY).
+
+    """
+
+    def __init__(self, capacity=None, max_bytes=64 * 2 ** 20, eviction=LRU, path=None):
+        """
+
+        Constructor.
+
+        :param capacity: maximum number of snapshots, defaults to the number fitting in max_bytes
+
+        :param max_bytes: memory budget of the arrays of the store, used when capacity is None
+
+        :param eviction: LRU or PRIORITY
+
+        :param path: directory of the memory-mapped arrays, or None to keep them in memory
+
+        """
+        if eviction not in (LRU, PRIORITY):
+            raise ValueError(f"unknown eviction policy: {eviction}")
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.path = path
+
+        self.aircraft_name = None
+        self.arrays = None
+        self.slots = {}  # key -> slot of the snapshot in the arrays
+        self.next_key = 0
+        self.clock = 0
+
+    def allocate(self, snapshot):
+        """
+
+        Sets the schema of the store from a snapshot and allocates its arrays.
+
+        :param snapshot: gym_jsbsim.simulation.Snapshot
+
+        """
+        layout = [
+            ("sim_time", (), np.float64),
+            ("state", snapshot.state.shape, np.float64),
+            ("values", snapshot.values.shape, np.float64),
+            ("priority", (), np.float64),
+            ("last_used", (), np.int64),
+            ("key", (), np.int64),
+        ]
+        if self.capacity is None:
+            row_bytes = sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in layout)
+            self.capacity = self.max_bytes // row_bytes
+        if self.capacity < 1:
+            raise ValueError("the snapshot store cannot hold a single snapshot")
+
+        if self.path is not None:
+            os.makedirs(self.path, exist_ok=True)
+        self.arrays = {}
+        for name, shape, dtype in layout:
+            shape = (self.capacity,) + shape
+            if self.path is None:
+                self.arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                self.arrays[name] = np.lib.format.open_memmap(
+                    os.path.join(self.path, name + ".npy"), mode="w+", dtype=dtype, shape=shape
+                )
+        self.aircraft_name = snapshot.aircraft_name
+
+    def add(self, snapshot, priority=0.0):
+        """
+
+        Adds a snapshot to the store, evicting another one if the store is full.
+
+        :param snapshot: gym_jsbsim.simulation.Snapshot
+
+        :param priority: float, weight of the snapshot in the prioritized sampling and eviction
+
+        :return: int, the key of the snapshot in the store
+
+        """
+        if self.arrays is None:
+            self.allocate(snapshot)
+        elif (
+            snapshot.aircraft_name != self.aircraft_name
+            or snapshot.state.shape != self.arrays["state"].shape[1:]
+            or snapshot.values.shape != self.arrays["values"].shape[1:]
+        ):
+            raise ValueError("snapshot does not match the schema of the store")
+
+        if len(self.slots) < self.capacity:
+            slot = len(self.slots)
+        else:
+            slot = self.get_evicted_slot()
+            del self.slots[int(self.arrays["key"][slot])]
+
+        key = self.next_key
+        self.next_key += 1
+        self.slots[key] = slot
+        self.arrays["sim_time"][slot] = snapshot.sim_time
+        self.arrays["state"][slot] = snapshot.state
+        self.arrays["values"][slot] = snapshot.values
+        self.arrays["priority"][slot] = priority
+        self.arrays["key"][slot] = key
+        self.touch(slot)
+        return key
+
+    def get_evicted_slot(self):
+        """
+
+        Chooses the snapshot evicted from a full store.
+
+        :return: int, slot of the least recently used snapshot, or of the lowest priority one (LRU among them)
+
+        """
+        last_used = self.arrays["last_used"]
+        if self.eviction == LRU:
+            return int(np.argmin(last_used))
+        priority = self.arrays["priority"]
+        lowest = np.flatnonzero(priority == priority.min())
+        return int(lowest[np.argmin(last_used[lowest])])
+
+    def touch(self, slot):
+        self.clock += 1
+        self.arrays["last_used"][slot] = self.clock
+
+    def get(self, key):
+        """
+
+        Gets a snapshot of the store.
+
+        :param key: int, key returned by add
+
+        :return: gym_jsbsim.simulation.Snapshot
+
+        """
+        slot = self.slots[key]
+        self.touch(slot)
+        return Snapshot(
+            self.aircraft_name,
+            float(self.arrays["sim_time"][slot]),
+            np.array(self.arrays["state"][slot]),
+            np.array(self.arrays["values"][slot]),
+        )
+
+    def set_priority(self, key, priority):
+        """
+
+        Changes the priority of a snapshot.
+
+        :param key: int, key returned by add
+
+        :param priority: float
+
+        """
+        self.arrays["priority"][self.slots[key]] = priority
+
+    def sample(self, rng=np.random, prioritized=False):
+        """
+
+        Draws a snapshot of the store.
+
+        :param rng: np.random.Generator or np.random.RandomState
+
+        :param prioritized: if True, snapshots are drawn with a probability proportional to their priority
+
+        :return: (key, gym_jsbsim.simulation.Snapshot)
+
+        """
+        if not self.slots:
+            raise IndexError("sample from an empty snapshot store")
+        n = len(self.slots)
+        if prioritized:
+            priority = self.arrays["priority"][:n]
+            if (priority < 0).any() or priority.sum() <= 0:
+                raise ValueError("prioritized sampling needs non-negative priorities with a positive sum")
+            slot = rng.choice(n, p=priority / priority.sum())
+        else:
+            slot = rng.integers(n) if hasattr(rng, "integers") else rng.randint(n)
+        key = int(self.arrays["key"][slot])
+        return key, self.get(key)
+
+    def remove(self, key):
+        """
+
+        Removes a snapshot from the store, the last snapshot of the arrays taking its slot.
+
+        :param key: int, key returned by add
+
+        """
+        slot = self.slots.pop(key)
+        last = len(self.slots)
+        if slot != last:
+            for array in self.arrays.values():
+                array[slot] = array[last]
+            self.slots[int(self.arrays["key"][slot])] = slot
+
+    def flush(self):
+        """ Writes the memory-mapped arrays to disk. """
+        if self.arrays is not None and self.path is not None:
+            for array in self.arrays.values():
+                array.flush()
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def __len__(self):
+        return len(self.slots)
@@ -1,8 +1,7 @@
 from types import MethodType
 import numpy as np
 import gym
-from gym.spaces import Box, Discrete
-from gym_jsbsim.catalogs.catalog import Catalog
+from gym.spaces import Box, Discrete, MultiDiscrete
 
 
 class Task:
@@ -16,7 +15,13 @@ class Task:
 
     action_var = None
     state_var = None
+    reward_var = []
+    # gym_jsbsim.reward_spec.RewardSpec and TerminalSpec used by the default reward and terminal conditions
+    reward_spec = None
+    terminal_spec = None
     init_conditions = None
+    # taxi_path centerline of the taxi properties (shortest_dist, di, ai), None for the default one
+    taxi_path = None
     output = state_var
     jsbsim_freq = 60
     agent_interaction_steps = 5
@@ -28,24 +33,63 @@ class Task:
         if self.output is None:
             self.output = self.state_var
 
-        # modify Catalog to have only the current task properties
-        names_away = []
-        for name, prop in Catalog.items():
-            if not (
-                prop in self.action_var
-                or prop in self.state_var
-                or prop in self.init_conditions
-                or prop in self.output
-            ):
-                names_away.append(name)
-        for name in names_away:
-            Catalog.pop(name)
+        # the batched rewards and terminal conditions read the properties of the specs in reward_var
+        for spec in (self.reward_spec, self.terminal_spec):
+            if spec is not None and not set(spec.props) <= set(self.reward_var):
+                self.reward_var = self.reward_var + [prop for prop in spec.props if prop not in self.reward_var]
+        # buffers of the values of the spec properties of one simulation, filled at each step
+        self.reward_spec_values = np.empty(len(self.reward_spec.props)) if self.reward_spec is not None else None
+        self.terminal_spec_values = np.empty(len(self.terminal_spec.props)) if self.terminal_spec is not None else None
 
     def get_reward(self, state, sim):
-        return 0
+        if self.reward_spec is None:
+            return 0
+        values = sim.get_property_values_into(self.reward_spec.props, self.reward_spec_values)
+        return float(self.reward_spec.evaluate(values))
 
     def is_terminal(self, state, sim):
-        return False
+        if self.terminal_spec is None:
+            return False
+        values = sim.get_property_values_into(self.terminal_spec.props, self.terminal_spec_values)
+        return bool(self.terminal_spec.evaluate(values))
+
+    def get_reward_batch(self, values, sims):
+        """
+        Compute the rewards of a batch of simulations of the task
+
+        :param values: dict mapping each property of reward_var to the np.array of its values in the simulations
+
+        :param sims: list of Simulation
+
+        :return : np.array of rewards
+        """
+        if self.reward_spec is not None:
+            return self.reward_spec.evaluate(np.column_stack([values[prop] for prop in self.reward_spec.props]))
+        return np.array([self.get_reward(None, sim) for sim in sims], dtype=float)
+
+    def reset_batch(self, nb_sims, indexes=None):
+        """
+        Reset the running statistics of the batched rewards, tasks whose get_reward_batch keeps some override it
+
+        :param nb_sims: number of simulations of the batch
+
+        :param indexes: indexes of the simulations starting a new episode, None for all of them
+        """
+        pass
+
+    def is_terminal_batch(self, values, sims):
+        """
+        Check which simulations of a batch are in a terminal state
+
+        :param values: dict mapping each property of reward_var to the np.array of its values in the simulations
+
+        :param sims: list of Simulation
+
+        :return : np.array of bool
+        """
+        if self.terminal_spec is not None:
+            return self.terminal_spec.evaluate(np.column_stack([values[prop] for prop in self.terminal_spec.props]))
+        return np.array([self.is_terminal(None, sim) for sim in sims], dtype=bool)
 
     def get_observation_var(self):
         return self.state_var
@@ -53,12 +97,56 @@ class Task:
     def get_action_var(self):
         return self.action_var
 
-    def get_initial_conditions(self):
+    def get_reward_var(self):
+        return self.reward_var
+
+    def get_initial_conditions(self, np_random=None):
+        """
+        Get the initial conditions of an episode, tasks with random initial conditions draw them from np_random
+
+        :param np_random: np.random.Generator of the environment, None to get the default initial conditions
+
+        :return: dict mapping properties to their initial values
+        """
         return self.init_conditions
 
     def get_output(self):
         return self.output
 
+    def get_catalog_props(self):
+        """
+        Get the task's properties saved in the simulation state with the JSBSim properties of the aircraft
+
+        :return : list of the action, observation, initial conditions and output properties
+        """
+        props = []
+        for prop in [*self.action_var, *self.state_var, *(self.init_conditions or ()), *(self.output or ())]:
+            if prop not in props:
+                props.append(prop)
+        return props
+
+    def get_observation_bounds(self):
+        """
+        Get the bounds of the task's observation variables
+
+        :return : (np.array of min values, np.array of max values)
+        """
+        return (
+            np.array([prop.min for prop in self.state_var], dtype=float),
+            np.array([prop.max for prop in self.state_var], dtype=float),
+        )
+
+    def get_action_bounds(self):
+        """
+        Get the bounds of the task's action variables
+
+        :return : (np.array of min values, np.array of max values)
+        """
+        return (
+            np.array([prop.min for prop in self.action_var], dtype=float),
+            np.array([prop.max for prop in self.action_var], dtype=float),
+        )
+
     def get_observation_space(self):
         """
         Get the task's observation Space object
@@ -90,6 +178,22 @@ class Task:
                 space_tuple += (Discrete(prop.max - prop.min + 1),)
         return gym.spaces.Tuple(space_tuple)
 
+    def get_flat_observation_space(self):
+        """
+        Get the task's observation Space object in flat mode
+
+        :return : Box of float32, MultiDiscrete, or spaces.Tuple of both if the task has both kinds of properties
+        """
+        return make_flat_space(self.state_var)
+
+    def get_flat_action_space(self):
+        """
+        Get the task's action Space object in flat mode
+
+        :return : Box of float32, MultiDiscrete, or spaces.Tuple of both if the task has both kinds of properties
+        """
+        return make_flat_space(self.action_var)
+
     def render(self, sim, mode="human", **kwargs):
         pass
 
@@ -119,3 +223,29 @@ class Task:
 
     def define_is_terminal(self, func):
         self.is_terminal = MethodType(func, self)
+
+
+def make_flat_space(props):
+    """
+    Build a flat Space object from a list of properties: a single Box for the continuous properties
+
+    and a MultiDiscrete for the Discrete ones, counting values from their min.
+
+    :param props: list of Properties
+
+    :return : Box of float32, MultiDiscrete, or spaces.Tuple (Box, MultiDiscrete) if props has both kinds
+    """
+    box_props = [prop for prop in props if prop.spaces is not Discrete]
+    discrete_props = [prop for prop in props if prop.spaces is Discrete]
+    spaces = ()
+    if box_props:
+        spaces += (
+            Box(
+                low=np.array([prop.min for prop in box_props], dtype=np.float32),
+                high=np.array([prop.max for prop in box_props], dtype=np.float32),
+                dtype=np.float32,
+            ),
+        )
+    if discrete_props:
+        spaces += (MultiDiscrete([prop.max - prop.min + 1 for prop in discrete_props]),)
+    return spaces[0] if len(spaces) == 1 else gym.spaces.Tuple(spaces)
@@ -0,0 +1,72 @@
+import unittest
+import tempfile
+import numpy as np
+from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.envs.taxi_control_task import TaxiControlTask
+from gym_jsbsim.envs.taxi_utils import get_bearing
+from gym_jsbsim.envs.airport_graph import (
+    AirportGraph,
+    get_route_initial_conditions,
+    load_airport_graph,
+    polyline_length,
+    NODE_HOLDING_POSITION,
+    NODE_PARKING_STAND,
+)
+
+
+class TestAirportGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = AirportGraph.from_amdb()
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            load_airport_graph(cache_dir=cache_dir)
+            graph = load_airport_graph(cache_dir=cache_dir)
+        for name in ["node_coords", "node_types", "node_names", "edge_nodes", "edge_lengths", "edge_points"]:
+            np.testing.assert_array_equal(getattr(graph, name), getattr(self.graph, name))
+
+    def test_route(self):
+        route = np.array(self.graph.route("A15", "S4"))
+        start = self.graph.find_nodes("A15")
+        goal = self.graph.find_nodes("S4")
+        self.assertTrue((self.graph.node_types[start] == NODE_PARKING_STAND).all())
+        self.assertTrue((self.graph.node_types[goal] == NODE_HOLDING_POSITION).all())
+        self.assertIn(tuple(route[0]), [tuple(p) for p in self.graph.node_coords[start]])
+        self.assertIn(tuple(route[-1]), [tuple(p) for p in self.graph.node_coords[goal]])
+        # the route is made of short centerline segments and is not shorter than the straight line
+        self.assertLess(polyline_length(route[:2]), 200)
+        self.assertGreaterEqual(polyline_length(route), polyline_length(route[[0, -1]]))
+        with self.assertRaises(ValueError):
+            self.graph.route("A15", "unknown")
+        # a route without segment
+        with self.assertRaises(ValueError):
+            self.graph.route("A15", "A15")
+        start = int(self.graph.find_nodes("A15")[0])
+        with self.assertRaises(ValueError):
+            self.graph.route(start, start)
+        with self.assertRaises(ValueError):
+            get_route_initial_conditions(route[:1])
+        with self.assertRaises(ValueError):
+            TaxiControlTask().define_route("S4", "S4", self.graph)
+
+    def test_task_route(self):
+        env = JSBSimEnv("TaxiControlTask")
+        env.task.define_route("A15", "S4", self.graph)
+        route = self.graph.route("A15", "S4")
+        env.seed(0)
+        env.reset()
+        # the aircraft starts on the centerline of the route, along its first segment
+        self.assertAlmostEqual(env.sim.get_property_value(c.position_long_gc_deg), route[0][0], places=6)
+        self.assertAlmostEqual(env.sim.get_property_value(c.position_lat_geod_deg), route[0][1], places=6)
+        self.assertAlmostEqual(
+            env.sim.get_property_value(c.attitude_psi_deg), get_bearing(route[0], route[1]), places=3
+        )
+        self.assertLess(env.sim.get_property_value(c.shortest_dist), 0.1)
+        for _ in range(20):
+            _, _, done, _ = env.step(np.array([0, 0, 0.3]))
+            self.assertFalse(done)
+        self.assertLess(env.sim.get_property_value(c.shortest_dist), 5)
+        env.close()
+        # the class keeps its default initial position
+        self.assertEqual(TaxiControlTask.init_conditions[c.ic_long_gc_deg], TaxiControlTask.INIT_AC_LON)
@@ -0,0 +1,168 @@
+import unittest
+import numpy as np
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.branch_rollout import BranchRolloutPool
+from gym_jsbsim.envs.taxi_control_task import TaxiControlTask
+from gym_jsbsim.envs.taxi_utils import taxi_path
+
+
+def get_straight_path(lon, lat, heading, length=2000, step=50):
+    """ Gets the (long, lat) points of a straight centerline starting at (lon, lat). """
+    distances = np.arange(0, length, step)
+    psi = np.radians(heading)
+    return [
+        (lon + d * np.sin(psi) / (111320 * np.cos(np.radians(lat))), lat + d * np.cos(psi) / 110574) for d in distances
+    ]
+
+
+class TestBranchRollout(unittest.TestCase):
+    """
+
+    Class to test that the branches run from a snapshot, in the calling process or in workers,
+
+    are the episodes of an environment restored from the snapshot.
+
+    """
+
+    nb_branches = 5
+
+    horizon = 120
+
+    def setUp(self):
+        self.env = JSBSimEnv("HeadingControlTask")
+        self.env.seed(0)
+        self.env.reset()
+        for _ in range(10):
+            self.env.step(np.zeros(4))
+        self.snapshot = self.env.sim.save_snapshot()
+        low, high = self.env.task.get_action_bounds()
+        # bang-bang actions, ending the branches before the horizon
+        rng = np.random.default_rng(0)
+        self.actions = np.where(rng.random((self.nb_branches, self.horizon, 4)) < 0.5, low, high)
+
+    def tearDown(self):
+        self.env.close()
+
+    def test_same_as_env(self):
+        sim_time = self.env.sim.get_sim_time()
+        observations, rewards, dones = self.env.rollout_branches(self.actions, seed=1, num_workers=0)
+        self.assertEqual(observations.shape, (self.nb_branches, self.horizon, 9))
+        self.assertEqual(self.env.sim.get_sim_time(), sim_time)
+        self.assertTrue(dones[:, -1].any())
+
+        for k in range(self.nb_branches):
+            self.env.sim.restore_snapshot(self.snapshot)
+            self.env.sim.np_random = np.random.default_rng(1)
+            for t in range(self.horizon):
+                _, reward, done, _ = self.env.step(self.actions[k, t])
+                np.testing.assert_allclose(observations[k, t], np.ravel(self.env.state), rtol=1e-9)
+                self.assertAlmostEqual(rewards[k, t], reward, places=9)
+                self.assertEqual(dones[k, t], done)
+                if done:
+                    # the branch is stopped
+                    self.assertTrue(dones[k, t:].all())
+                    self.assertFalse(rewards[k, t + 1 :].any())
+                    self.assertTrue((observations[k, t:] == observations[k, t]).all())
+                    break
+
+    def test_random_stream(self):
+        # the seed drawn for the branches leaves the random events of the next episodes unchanged
+        values = []
+        for rollout in (False, True):
+            env = JSBSimEnv("HeadingControlTask")
+            env.seed(3)
+            env.reset()
+            if rollout:
+                env.rollout_branches(self.actions[:2], num_workers=0)
+            values.append(env.np_random.random())
+            env.close()
+        self.assertEqual(values[0], values[1])
+
+    def test_workers(self):
+        pool = BranchRolloutPool("HeadingControlTask", num_workers=0, sims_per_worker=2)
+        expected = pool.rollout(self.snapshot, self.actions, seed=1)
+        pool.close()
+        pool = BranchRolloutPool("HeadingControlTask", num_workers=2, sims_per_worker=2)
+        for _ in range(2):
+            # the restores of a snapshot give the same trajectory up to rounding errors
+            observations, rewards, dones = pool.rollout(self.snapshot, self.actions, seed=1)
+            np.testing.assert_allclose(observations, expected[0], rtol=1e-9)
+            np.testing.assert_allclose(rewards, expected[1], rtol=1e-9, atol=1e-12)
+            np.testing.assert_array_equal(dones, expected[2])
+        with self.assertRaises(ValueError):
+            pool.rollout(self.snapshot, self.actions[0])
+        pool.close()
+
+    def test_task_instance(self):
+        # the workers run the task as configured, not a new instance of its class
+        task = self.env.task
+        task.define_state(task.state_var[:3])
+        expected = BranchRolloutPool(task, num_workers=0).rollout(self.snapshot, self.actions, seed=1)
+        self.assertEqual(expected[0].shape, (self.nb_branches, self.horizon, 3))
+        pool = BranchRolloutPool(task, num_workers=1)
+        observations, rewards, dones = pool.rollout(self.snapshot, self.actions, seed=1)
+        np.testing.assert_allclose(observations, expected[0], rtol=1e-9)
+        np.testing.assert_array_equal(dones, expected[2])
+        pool.close()
+
+
+class TestTaxiBranchRollout(unittest.TestCase):
+    """
+
+    Class to test the branches of a task whose batched rewards keep running statistics, ending at different steps.
+
+    """
+
+    def test_same_as_env(self):
+        env = JSBSimEnv("TaxiControlTask")
+        task = env.task
+        task.taxi_path = taxi_path(
+            get_straight_path(TaxiControlTask.INIT_AC_LON, TaxiControlTask.INIT_AC_LAT, TaxiControlTask.INIT_AC_HEADING)
+        )
+        env.seed(0)
+        env.reset()
+        for _ in range(5):
+            env.step(np.array([0, 0, 0.3]))
+        snapshot = env.sim.save_snapshot()
+        # the branches brake later and later, stopping below the minimal velocity one after the other
+        actions = np.zeros((5, 60, 3))
+        actions[:, :, 2] = 0.3
+        for k in range(len(actions)):
+            actions[k, 8 * k + 5 :, 1] = 1
+
+        pool = BranchRolloutPool(task, num_workers=0, sims_per_worker=2)
+        for _ in range(2):
+            # the statistics of a rollout do not depend on the previous ones
+            observations, rewards, dones = pool.rollout(snapshot, actions, seed=1)
+            self.assertEqual(len(set(dones.argmax(axis=1))), len(actions))
+            self.assertTrue(dones[:, -1].all())
+        pool.close()
+
+        for k in range(len(actions)):
+            env.sim.restore_snapshot(snapshot)
+            env.sim.np_random = np.random.default_rng(1)
+            task.avg_dist = task.nb_step = task.perf_time = 0
+            for t in range(actions.shape[1]):
+                _, reward, done, _ = env.step(actions[k, t])
+                np.testing.assert_allclose(observations[k, t], np.ravel(env.state), rtol=1e-9)
+                self.assertAlmostEqual(rewards[k, t], reward, places=9)
+                self.assertEqual(dones[k, t], done)
+                if done:
+                    self.assertFalse(rewards[k, t + 1 :].any())
+                    break
+
+        pool = BranchRolloutPool(task, num_workers=1, sims_per_worker=2)
+        worker_observations, worker_rewards, worker_dones = pool.rollout(snapshot, actions, seed=1)
+        np.testing.assert_allclose(worker_observations, observations, rtol=1e-9)
+        np.testing.assert_allclose(worker_rewards, rewards, rtol=1e-9)
+        np.testing.assert_array_equal(worker_dones, dones)
+        pool.close()
+        # with the default centerline of the class, the aircraft is too far from it
+        pool = BranchRolloutPool(TaxiControlTask, num_workers=1)
+        self.assertTrue(pool.rollout(snapshot, actions, seed=1)[2][:, 0].all())
+        pool.close()
+        env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
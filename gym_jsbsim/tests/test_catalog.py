@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+import gym_jsbsim
+from gym_jsbsim import Catalog as c
+from gym_jsbsim.catalogs.catalog import (
+    DynamicCatalog,
+    JsbsimPropertyCatalog,
+    JSBSIM_CATALOGS,
+    get_catalog_file_key,
+    get_jsbsim_catalog,
+    parse_jsbsim_props,
+)
+from gym_jsbsim.simulation import Simulation
+
+
+class TestCatalog(unittest.TestCase):
+    def test_catalog_per_environment(self):
+        heading_env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        heading_env.reset()
+        state = heading_env.get_state()
+        base = heading_env.sim.catalog.base
+
+        # creating and resetting an environment of another task leaves the first one unchanged
+        taxi_env = gym_jsbsim.make("GymJsbsim-TaxiControlTask-v0")
+        taxi_env.reset()
+        self.assertIs(taxi_env.sim.catalog.base, base, "The JSBSim properties were collected again")
+        self.assertEqual(set(heading_env.get_state()), set(state))
+        self.assertIn(c.delta_heading, state)
+        self.assertNotIn(c.shortest_dist, state)
+        self.assertIn(c.shortest_dist, taxi_env.get_state())
+        self.assertEqual(heading_env.sim.catalog.delta_heading, c.delta_heading)
+        self.assertEqual(heading_env.sim.catalog.position_h_sl_ft, c.position_h_sl_ft)
+
+        heading_env.close()
+        taxi_env.close()
+
+    def test_jsbsim_property_catalog(self):
+        jsbsim_props = ["position/h-sl-ft (RW)", "fcs/throttle-cmd-norm[1] (RW)", "propulsion/engine[1]/n1 (R)"]
+        catalog = DynamicCatalog()
+        catalog.add_jsbsim_props(jsbsim_props)
+        lazy_catalog = JsbsimPropertyCatalog(parse_jsbsim_props("\n".join(jsbsim_props)))
+        self.assertEqual(len(lazy_catalog.props), 0, "Properties created before their first access")
+        self.assertEqual(dict(lazy_catalog), dict(catalog))
+        self.assertEqual(lazy_catalog["fcs_throttle_cmd_norm_1"], c.fcs_throttle_cmd_norm_1)
+        self.assertEqual(lazy_catalog["propulsion_engine_1_n1"].access, "R")
+
+    def test_catalog_file_key(self):
+        with tempfile.TemporaryDirectory() as root_dir:
+            for filename in ["aircraft/A320/A320.xml", "aircraft/A320/Systems/fcs.xml", "engine/CFM56.xml"]:
+                os.makedirs(os.path.join(root_dir, os.path.dirname(filename)), exist_ok=True)
+                with open(os.path.join(root_dir, filename), "w") as f:
+                    f.write("<xml/>")
+            key = get_catalog_file_key("A320", root_dir)
+            self.assertEqual(key, get_catalog_file_key("A320", root_dir))
+            self.assertNotEqual(key, get_catalog_file_key("A320", os.path.join(root_dir, "engine")))
+            for filename in ["aircraft/A320/Systems/fcs.xml", "engine/CFM56.xml"]:
+                # a modified aircraft, system or engine file changes the key
+                os.utime(os.path.join(root_dir, filename), ns=(0, 0))
+                self.assertNotEqual(get_catalog_file_key("A320", root_dir), key)
+                key = get_catalog_file_key("A320", root_dir)
+
+    def test_catalog_cache_file(self):
+        sim = Simulation()
+        root_dir = sim.jsbsim_exec.get_root_dir()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            catalogs = []
+            for _ in range(2):
+                # a new process, reading the file of the first one
+                JSBSIM_CATALOGS.clear()
+                catalogs.append(get_jsbsim_catalog(sim.aircraft_name, sim.jsbsim_exec, cache_dir=cache_dir))
+            filename = f"catalog-{sim.aircraft_name}-{get_catalog_file_key(sim.aircraft_name, root_dir)}.json"
+            self.assertEqual(os.listdir(cache_dir), [filename])
+        self.assertEqual(catalogs[1].jsbsim_props, catalogs[0].jsbsim_props)
+        sim.close()
@@ -0,0 +1,108 @@
+import unittest
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.jsbsim_vector_env import JSBSimVectorEnv
+from gym_jsbsim.prefetcher import SimulationPrefetcher, get_latency_percentiles
+
+
+class FakeSimulation:
+    def __init__(self):
+        self.resets = 0
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestPrefetcher(unittest.TestCase):
+    """
+
+    Class to test SimulationPrefetcher, and that the environments reset with prefetched simulations
+
+    are reproducible and keep stepping.
+
+    """
+
+    def test_prefetcher(self):
+        def prepare(sim):
+            sim = sim or FakeSimulation()
+            sim.resets += 1
+            return sim
+
+        prefetcher = SimulationPrefetcher(prepare)
+        first = prefetcher.get()
+        prefetcher.put(None)
+        second = prefetcher.get()
+        self.assertIsNot(first, second)
+        prefetcher.put(first)
+        # the simulation given back is the next spare one
+        spare = prefetcher.get()
+        self.assertIs(spare, first)
+        self.assertEqual(spare.resets, 2)
+        prefetcher.put(second)
+        prefetcher.close()
+        self.assertFalse(prefetcher.thread.is_alive())
+        self.assertTrue(second.closed)
+        self.assertFalse(spare.closed)
+
+    def test_error(self):
+        def prepare(sim):
+            raise ValueError("no aircraft")
+
+        prefetcher = SimulationPrefetcher(prepare)
+        with self.assertRaises(RuntimeError) as context:
+            prefetcher.get()
+        self.assertIsInstance(context.exception.__cause__, ValueError)
+        prefetcher.close()
+
+    def test_latency_percentiles(self):
+        self.assertEqual(get_latency_percentiles([]), {})
+        latencies = get_latency_percentiles([0.001] * 99 + [0.1], (50, 100))
+        self.assertAlmostEqual(latencies[50], 1.0)
+        self.assertAlmostEqual(latencies[100], 100.0)
+
+    def rollout(self, env, action, nb_episodes=3, nb_steps=20):
+        observations = []
+        for _ in range(nb_episodes):
+            observations.append(env.reset())
+            for _ in range(nb_steps):
+                observation, _, done, _ = env.step(action)
+                observations.append(observation)
+                if np.all(done):
+                    break
+        return np.array(observations)
+
+    def test_env(self):
+        task = gym_jsbsim.TASKS["HeadingControlTask"]
+        rollouts = []
+        for _ in range(2):
+            env = JSBSimEnv(task, prefetch=1)
+            env.seed(3)
+            rollouts.append(self.rollout(env, np.zeros(4)))
+            self.assertEqual(len(env.reset_latencies), 3)
+            self.assertEqual(set(env.get_reset_latencies()), {50, 90, 99, 100})
+            # more resets than spare simulations without stepping
+            env.reset()
+            env.reset()
+            env.close()
+            self.assertIsNone(env.prefetcher)
+        np.testing.assert_array_equal(rollouts[0], rollouts[1])
+        self.assertTrue(np.isfinite(rollouts[0]).all())
+
+    def test_vector_env(self):
+        task = gym_jsbsim.TASKS["HeadingControlTask"]
+        rollouts = []
+        for _ in range(2):
+            env = JSBSimVectorEnv(task, num_envs=2, prefetch=1)
+            env.seed(3)
+            rollouts.append(self.rollout(env, np.zeros((2, 4))))
+            self.assertGreaterEqual(len(env.reset_latencies), 6)
+            env.reset()
+            env.close()
+        np.testing.assert_array_equal(rollouts[0], rollouts[1])
+        self.assertTrue(np.isfinite(rollouts[0]).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
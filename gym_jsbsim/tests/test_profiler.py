@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.jsbsim_env import STEP_PHASES
+from gym_jsbsim.profiler import Profiler
+from gym_jsbsim.simulation import Simulation
+
+
+class TestProfiler(unittest.TestCase):
+    action = [0.1, -0.05, 0.0, 0.8]
+
+    nb_steps = 20
+
+    def run_episode(self, env):
+        states = [np.concatenate(env.reset())]
+        for _ in range(self.nb_steps):
+            state, _, _, info = env.step(self.action)
+            states.append(np.concatenate(state))
+        return np.array(states), info
+
+    def test_profile(self):
+        env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0", profile=True)
+        states, info = self.run_episode(env)
+        self.assertEqual(set(info["profile"]), set(STEP_PHASES))
+
+        profile = env.get_profile()
+        for phase in STEP_PHASES:
+            self.assertEqual(profile["phases"][phase]["count"], self.nb_steps)
+            self.assertGreaterEqual(profile["phases"][phase]["time"], 0)
+        nb_runs = self.nb_steps * env.unwrapped.sim.agent_interaction_steps
+        self.assertEqual(profile["phases"]["jsbsim_run"]["count"], nb_runs)
+        self.assertGreater(profile["properties"]["delta_heading"]["count"], self.nb_steps)
+        env.close()
+
+        unprofiled_env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        unprofiled_states, unprofiled_info = self.run_episode(unprofiled_env)
+        np.testing.assert_array_equal(states, unprofiled_states)
+        self.assertNotIn("profile", unprofiled_info)
+        with self.assertRaises(RuntimeError):
+            unprofiled_env.get_profile()
+        unprofiled_env.close()
+
+    def test_set_profiler(self):
+        sim = Simulation()
+        for profiler in (Profiler(), None, Profiler()):
+            sim.set_profiler(profiler)
+            sim.get_property_value(c.delta_heading)
+        # the getters compiled again do not repeat the derived properties to invalidate
+        self.assertEqual(sim.get_dependents(c.attitude_psi_deg.name_jsbsim), [c.delta_heading])
+        sim.close()
@@ -1,7 +1,9 @@
 import unittest
 import random
+import numpy as np
 import gym_jsbsim
 from gym_jsbsim import Catalog as c
+from gym_jsbsim.catalogs.property import Property, CustomProperty
 from gym_jsbsim.catalogs.utils import reduce_reflex_angle_deg
 
 
@@ -65,3 +67,57 @@ class TestPropertyUpdates(unittest.TestCase):
         self.assertEqual(
             new_brake_cmd, self.env.sim.get_property_value(c.fcs_right_brake_cmd_norm), "Right brake was not updated"
         )
+
+    def test_property_accessors(self):
+        sim = self.env.sim
+        for prop in [c.position_h_sl_ft, c.attitude_psi_deg, c.velocities_u_fps]:
+            self.assertEqual(sim.get_property_value(prop), sim.jsbsim_exec.get_property_value(prop.name_jsbsim))
+        sim.set_property_value(c.fcs_aileron_cmd_norm, 3)
+        self.assertEqual(sim.jsbsim_exec.get_property_value(c.fcs_aileron_cmd_norm.name_jsbsim), 1, "Value not clamped")
+        sim.jsbsim_exec.set_property_value(c.fcs_aileron_cmd_norm.name_jsbsim, -0.5)
+        self.assertEqual(sim.get_property_value(c.fcs_aileron_cmd_norm), -0.5)
+
+    def test_custom_property_access(self):
+        read_only = CustomProperty("custom/read-only", access="R", read=lambda sim: 1.0)
+        self.assertEqual(self.env.sim.get_property_value(read_only), 1.0)
+        with self.assertRaisesRegex(RuntimeError, "is not writable"):
+            self.env.sim.set_property_value(read_only, 2.0)
+        write_only = CustomProperty("custom/write-only", access="W", write=lambda sim, value: None)
+        with self.assertRaisesRegex(RuntimeError, "is not readable"):
+            self.env.sim.get_property_value(write_only)
+
+    def test_property_values_arrays(self):
+        sim = self.env.sim
+        props = self.env.task.get_observation_var()
+        values = sim.get_property_values_into(props, np.empty(len(props)))
+        self.assertEqual(values.tolist(), sim.get_property_values(props))
+        sim.set_property_values_from([c.fcs_throttle_cmd_norm, c.fcs_aileron_cmd_norm], np.array([0.5, -3.0]))
+        self.assertEqual(sim.get_property_value(c.fcs_throttle_cmd_norm_1), 0.5, "Throttle 1 was not updated")
+        self.assertEqual(sim.get_property_value(c.fcs_aileron_cmd_norm), -1, "Value not clamped")
+
+    def test_derived_property_cache(self):
+        sim = self.env.sim
+        updates = []
+        derived = Property("test/derived", access="R", update=updates.append, depends=(c.target_heading_deg,))
+        for _ in range(3):
+            sim.get_property_value(derived)
+        self.assertEqual(len(updates), 1, "Derived property updated more than once")
+        sim.set_property_value(c.target_heading_deg, 90)
+        sim.get_property_value(derived)
+        sim.run()
+        sim.get_property_value(derived)
+        self.assertEqual(len(updates), 3, "Derived property not updated after a write or a run")
+
+        for _ in range(3):
+            sim.set_property_value(c.target_heading_deg, random.uniform(0, 360))
+            sim.set_property_value(c.target_altitude_ft, random.uniform(5000, 10000))
+            for _ in range(2):
+                delta_heading = reduce_reflex_angle_deg(
+                    sim.get_property_value(c.target_heading_deg) - sim.get_property_value(c.attitude_psi_deg)
+                )
+                delta_altitude = sim.get_property_value(c.target_altitude_ft) - sim.get_property_value(
+                    c.position_h_sl_ft
+                )
+                self.assertEqual(sim.get_property_value(c.delta_heading), delta_heading, "Delta heading incorrect")
+                self.assertEqual(sim.get_property_value(c.delta_altitude), delta_altitude, "Delta altitude incorrect")
+                sim.run()
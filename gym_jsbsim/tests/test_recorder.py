@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim.recorder import NPZ
+
+
+class TestRecorder(unittest.TestCase):
+    action = [0.1, -0.05, 0.0, 0.8]
+
+    def setUp(self):
+        self.env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.env.close()
+        self.directory.cleanup()
+
+    def run_episodes(self, nb_steps, **kwargs):
+        last_values = []
+        for n in nb_steps:
+            self.env.reset()
+            for _ in range(n):
+                self.env.step(self.action)
+                self.env.render(mode="csv", directory=self.directory.name, **kwargs)
+            sim = self.env.unwrapped.sim
+            last_values.append([sim.get_sim_time()] + sim.get_property_values(self.env.unwrapped.task.get_output()))
+        self.env.close()
+        return last_values
+
+    def test_csv(self):
+        last_values = self.run_episodes([30, 9], decimation=2, chunk_size=4)
+        for episode, (nb_rows, values) in enumerate(zip([15, 5], last_values)):
+            path = os.path.join(self.directory.name, f"episode_{episode:05d}.csv")
+            with open(path) as f:
+                header = f.readline().strip().split(",")
+            self.assertEqual(header[0], "time")
+            self.assertEqual(len(header), len(self.env.unwrapped.task.get_output()) + 1)
+            rows = np.loadtxt(path, delimiter=",", skiprows=1)
+            self.assertEqual(rows.shape, (nb_rows, len(header)))
+            self.assertTrue((np.diff(rows[:, 0]) > 0).all())
+            if episode == 1:
+                np.testing.assert_array_equal(rows[-1], values)
+
+    def test_npz(self):
+        last_values = self.run_episodes([10], file_format=NPZ)
+        columns = np.load(os.path.join(self.directory.name, "episode_00000.npz"))
+        self.assertEqual(len(columns["time"]), 10)
+        self.assertEqual(columns["time"][-1], last_values[0][0])
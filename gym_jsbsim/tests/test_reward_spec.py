@@ -0,0 +1,173 @@
+import unittest
+import unittest.mock
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.reward_spec import RewardSpec, TerminalSpec, Condition, AllOf, AnyOf, gaussian, laplace
+
+k2f = 1.68781
+
+# (mean, standard deviation) of the random values of the properties, around the scales and thresholds of the tasks
+DISTRIBUTIONS = {
+    c.delta_heading: (0, 10),
+    c.delta_altitude: (0, 100),
+    c.attitude_roll_rad: (0, 0.5),
+    c.velocities_u_fps: (800, 30),
+    c.accelerations_n_pilot_x_norm: (0, 1.5),
+    c.accelerations_n_pilot_y_norm: (0, 1.5),
+    c.accelerations_n_pilot_z_norm: (-1, 1.5),
+    c.accelerations_a_pilot_x_ft_sec2: (0, 2),
+    c.accelerations_a_pilot_y_ft_sec2: (0, 2),
+    c.accelerations_a_pilot_z_ft_sec2: (0, 2),
+    c.simulation_sim_time_sec: (300, 200),
+    c.position_h_sl_ft: (5000, 3000),
+    c.shortest_dist: (10, 8),
+    c.velocities_vc_fps: (20, 15),
+}
+
+
+# rewards and terminal conditions of the tasks before they were declared as specs
+def heading_reward(v):
+    with np.errstate(over="ignore"):
+        accel_r = np.exp(
+            -(
+                (v[c.accelerations_n_pilot_x_norm] / 0.1) ** 2
+                + (v[c.accelerations_n_pilot_y_norm] / 0.1) ** 2
+                + ((v[c.accelerations_n_pilot_z_norm] + 1) / 0.5) ** 2
+            )
+        ) ** (1 / 3)
+    return (
+        np.exp(-((v[c.delta_heading] / 5.0) ** 2))
+        * np.exp(-((v[c.delta_altitude] / 50.0) ** 2))
+        * accel_r
+        * np.exp(-((v[c.attitude_roll_rad] / 0.35) ** 2))
+        * np.exp(-(((v[c.velocities_u_fps] - 800) / 16) ** 2))
+    ) ** (1 / 5)
+
+
+def heading_terminal(v):
+    return (
+        (v[c.simulation_sim_time_sec] > 10)
+        & (
+            (np.fabs(v[c.accelerations_n_pilot_x_norm]) > 2.0)
+            | (np.fabs(v[c.accelerations_n_pilot_y_norm]) > 2.0)
+            | (np.fabs(v[c.accelerations_n_pilot_z_norm] + 1) > 2.0)
+        )
+        | (v[c.position_h_sl_ft] < 3000)
+        | (v[c.detect_extreme_state] != 0)
+    )
+
+
+def approach_reward(v):
+    angle_speed_r = np.exp(
+        -(
+            0.1 * np.fabs(v[c.accelerations_a_pilot_x_ft_sec2])
+            + 0.1 * np.fabs(v[c.accelerations_a_pilot_y_ft_sec2])
+            + 0.8 * np.fabs(v[c.accelerations_a_pilot_z_ft_sec2])
+        )
+    )
+    heading_r, alt_r = np.exp(-np.fabs(v[c.delta_heading])), np.exp(-np.fabs(v[c.delta_altitude]))
+    return 0.4 * heading_r + 0.1 * alt_r + 0.4 * angle_speed_r
+
+
+def taxiap_reward(v):
+    return np.exp(-np.fabs(v[c.shortest_dist])) ** 2
+
+
+def taxiap_terminal(v):
+    return (
+        (v[c.simulation_sim_time_sec] >= 450)
+        | (np.fabs(v[c.shortest_dist]) >= 10)
+        | (np.fabs(v[c.velocities_vc_fps]) <= 5.0 * k2f)
+    )
+
+
+def taxi_terminal(v):
+    velocity = np.fabs(v[c.velocities_vc_fps])
+    return (
+        (v[c.simulation_sim_time_sec] >= 450)
+        | (np.fabs(v[c.shortest_dist]) >= 20)
+        | (velocity > 20 * k2f)
+        | (velocity < 5 * k2f)
+    )
+
+
+LEGACY = {
+    "HeadingControlTask": (heading_reward, heading_terminal),
+    "HeadingAltitudeControlTask": (heading_reward, heading_terminal),
+    "ApproachControlTask": (approach_reward, None),
+    "TaxiapControlTask": (taxiap_reward, taxiap_terminal),
+    "TaxiControlTask": (None, taxi_terminal),
+}
+
+
+class TestRewardSpec(unittest.TestCase):
+    """
+
+    Class to test the compiled reward and terminal specs, and that the tasks ported to them compute the same rewards
+
+    and terminal conditions as before.
+
+    """
+
+    nb_samples = 2000
+
+    def random_values(self, props, rng):
+        values = {}
+        for prop in props:
+            if prop is c.detect_extreme_state:
+                values[prop] = (rng.random(self.nb_samples) < 0.1).astype(float)
+            elif prop is c.steady_flight:
+                values[prop] = np.full(self.nb_samples, 1e6)  # no change of target
+            else:
+                mean, std = DISTRIBUTIONS.get(prop, (0, 1))
+                values[prop] = rng.normal(mean, std, self.nb_samples)
+        return values
+
+    def test_spec(self):
+        spec = RewardSpec([gaussian(c.delta_heading, 5.0), laplace(c.delta_altitude, 2.0, offset=1.0, power=2)])
+        self.assertEqual(spec.props, [c.delta_heading, c.delta_altitude])
+        np.testing.assert_allclose(spec.evaluate(np.array([5.0, 3.0])), (np.exp(-1) * np.exp(-2)) ** 0.5)
+        np.testing.assert_allclose(spec.evaluate(np.array([[0.0, 1.0], [5.0, 3.0]])), [1, (np.exp(-3)) ** 0.5])
+
+        terminal_spec = TerminalSpec(
+            AllOf(Condition(c.delta_heading, ">", 1), Condition(c.delta_altitude, "<", 0)),
+            AnyOf(Condition(c.delta_heading, "<=", -2, offset=1)),
+        )
+        values = np.array([[2.0, -1.0], [2.0, 1.0], [-3.0, 0.0], [-2.0, 0.0]])
+        np.testing.assert_array_equal(terminal_spec.evaluate(values), [True, False, True, False])
+        self.assertTrue(terminal_spec.evaluate(values[0]))
+        with self.assertRaises(ValueError):
+            Condition(c.delta_heading, "=>", 1)
+
+    def test_same_as_legacy_tasks(self):
+        rng = np.random.default_rng(0)
+        for name, (reward, terminal) in LEGACY.items():
+            with self.subTest(task=name):
+                task = gym_jsbsim.TASKS[name]()
+                values = self.random_values(task.get_reward_var(), rng)
+                sims = [unittest.mock.Mock() for _ in range(self.nb_samples)]
+                if reward is not None:
+                    np.testing.assert_allclose(task.get_reward_batch(values, sims), reward(values), rtol=1e-12)
+                if terminal is not None:
+                    expected = terminal(values)
+                    self.assertTrue(expected.any() and not expected.all())
+                    np.testing.assert_array_equal(task.is_terminal_batch(values, sims), expected)
+
+    def test_single_env_rewards(self):
+        for name in ("HeadingControlTask", "ApproachControlTask", "TaxiapControlTask"):
+            with self.subTest(task=name):
+                env = JSBSimEnv(name)
+                env.reset()
+                reward, _ = LEGACY[name]
+                rng = np.random.default_rng(0)
+                low, high = env.task.get_action_bounds()
+                for _ in range(20):
+                    env.step(rng.uniform(low, high))
+                    values = {prop: np.array([env.sim.get_property_value(prop)]) for prop in env.task.reward_var}
+                    self.assertAlmostEqual(env.task.get_reward(None, env.sim), reward(values)[0], places=12)
+                # the values of the spec properties are read into buffers of the task, not new arrays
+                with unittest.mock.patch("numpy.empty", side_effect=AssertionError("allocation")):
+                    env.task.get_reward(None, env.sim)
+                env.close()
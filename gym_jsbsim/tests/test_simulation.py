@@ -1,5 +1,6 @@
 import unittest
 import math
+import numpy as np
 import gym_jsbsim
 from gym_jsbsim import Catalog as c
 
@@ -163,3 +164,166 @@ class TestSimulation(unittest.TestCase):
             else:
                 error = math.fabs(p2 - p1) / max(math.fabs(p1), math.fabs(p2))
             self.assertLess(error, self.error_max, "The two simulations have diverged")
+
+
+class TestWarmReset(unittest.TestCase):
+    """
+
+    Class to test that a warm reset of the simulation gives the same trajectories as a new simulation.
+
+    """
+
+    rtol = 1e-9
+
+    nb_steps = 200
+
+    action = [0.1, -0.05, 0.0, 0.8]
+
+    def setUp(self):
+        self.cold_env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        self.warm_env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0", warm_reset=True)
+
+    def tearDown(self):
+        self.cold_env.close()
+        self.warm_env.close()
+
+    def run_episode(self, env):
+        states = [np.concatenate(env.reset())]
+        rewards = []
+        for _ in range(self.nb_steps):
+            state, reward, done, _ = env.step(self.action)
+            states.append(np.concatenate(state))
+            rewards.append(reward)
+        return np.array(states), np.array(rewards)
+
+    def test_warm_reset_matches_cold_reset(self):
+        cold_states, cold_rewards = self.run_episode(self.cold_env)
+
+        # a first episode with other actions then a warm reset
+        self.warm_env.reset()
+        sim = self.warm_env.sim
+        for _ in range(self.nb_steps):
+            self.warm_env.step([-0.3, 0.2, 0.1, 0.2])
+        warm_states, warm_rewards = self.run_episode(self.warm_env)
+
+        self.assertIs(sim, self.warm_env.sim, "The simulation was rebuilt")
+        np.testing.assert_allclose(warm_states, cold_states, rtol=self.rtol, atol=1e-9)
+        np.testing.assert_allclose(warm_rewards, cold_rewards, rtol=self.rtol, atol=1e-12)
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+
+    Class to test that the trajectories restored from a snapshot follow the uninterrupted one.
+
+    """
+
+    nb_steps = 100
+
+    def setUp(self):
+        self.env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        self.other_env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        self.actions = np.random.RandomState(0).uniform(-0.3, 0.3, (self.nb_steps, 4))
+
+    def tearDown(self):
+        self.env.close()
+        self.other_env.close()
+
+    def run_steps(self, env):
+        states = []
+        for action in self.actions:
+            state, _, _, _ = env.step(action)
+            states.append(np.concatenate(state))
+        return np.array(states)
+
+    def test_restored_trajectories(self):
+        self.env.reset()
+        for _ in range(20):
+            self.env.step(self.actions[0])
+        snapshot = self.env.save_snapshot()
+        observation, time = np.concatenate(self.env.get_observation()), self.env.get_sim_time()
+        states = self.run_steps(self.env)
+
+        restored_states = []
+        for env in [self.env, self.env, self.other_env]:
+            if env.sim is None:
+                env.reset()
+            np.testing.assert_allclose(np.concatenate(env.restore_snapshot(snapshot)), observation, rtol=1e-9)
+            self.assertEqual(env.get_sim_time(), time)
+            restored_states.append(self.run_steps(env))
+
+        np.testing.assert_allclose(restored_states[0], states, rtol=1e-3, atol=1e-4)
+        # the restored trajectories only differ by rounding errors
+        np.testing.assert_allclose(restored_states[1], restored_states[0], rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(restored_states[2], restored_states[0], rtol=1e-9, atol=1e-9)
+
+
+class TestRunSteps(unittest.TestCase):
+    def test_trace(self):
+        env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        other_env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        env.reset()
+        other_env.reset()
+        trace = [c.simulation_sim_time_sec, c.position_h_sl_ft, c.delta_heading]
+
+        out = env.sim.run_steps(trace=trace)
+        self.assertEqual(out.shape, (env.sim.agent_interaction_steps, 3))
+        for row in out:
+            other_env.sim.run_steps(1)
+            np.testing.assert_array_equal(row, other_env.sim.get_property_values(trace))
+        self.assertEqual(env.get_sim_time(), out[-1, 0])
+
+        with self.assertRaises(ValueError):
+            env.sim.run_steps(2, trace, out)
+        env.close()
+        other_env.close()
+
+
+class TestFlatSpaces(unittest.TestCase):
+    """
+
+    Class to test that the flat observation and action spaces give the same episodes as the tuple ones.
+
+    """
+
+    nb_steps = 50
+
+    def setUp(self):
+        self.env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        self.flat_env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0", flat_spaces=True)
+
+    def tearDown(self):
+        self.env.close()
+        self.flat_env.close()
+
+    def test_flat_spaces_match_tuple_spaces(self):
+        n_obs = len(self.env.unwrapped.task.get_observation_var())
+        self.assertEqual(self.flat_env.observation_space.shape, (n_obs,))
+        self.assertEqual(self.flat_env.observation_space.dtype, np.float32)
+
+        state = self.env.reset()
+        flat_state = self.flat_env.reset()
+        np.testing.assert_array_equal(flat_state, np.concatenate(state).astype(np.float32))
+        for _ in range(self.nb_steps):
+            action = self.flat_env.action_space.sample()
+            state, reward, done, _ = self.env.step(tuple(np.array([value], dtype=float) for value in action))
+            flat_state, flat_reward, flat_done, _ = self.flat_env.step(action)
+            self.assertTrue(self.flat_env.observation_space.contains(flat_state))
+            np.testing.assert_array_equal(flat_state, np.concatenate(state).astype(np.float32))
+            self.assertEqual((flat_reward, flat_done), (reward, done))
+            if done:
+                break
+
+    def test_discrete_properties(self):
+        task = self.flat_env.unwrapped.task
+        action_var = [c.fcs_aileron_cmd_norm, c.throttle_cmd_dir]
+        space = gym_jsbsim.task.make_flat_space(action_var)
+        self.assertEqual(space[1].nvec.tolist(), [3])
+        self.flat_env.reset()
+        task.define_action(action_var)
+        self.flat_env.reset()
+        self.flat_env.sim.set_property_value(c.incr_throttle, 0.1)
+        throttle = self.flat_env.sim.get_property_value(c.fcs_throttle_cmd_norm)
+        self.flat_env.step((np.array([0.5], dtype=np.float32), np.array([2])))
+        self.assertEqual(self.flat_env.sim.get_property_value(c.fcs_aileron_cmd_norm), 0.5)
+        self.assertAlmostEqual(self.flat_env.sim.get_property_value(c.fcs_throttle_cmd_norm), throttle + 0.1)
@@ -0,0 +1,53 @@
+import unittest
+import gym_jsbsim
+from gym_jsbsim import Catalog as c
+from gym_jsbsim.simulation_pool import SimulationPool
+from gym_jsbsim.envs.heading_control_task import HeadingControlTask
+
+
+class TestSimulationPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = SimulationPool(max_size=2)
+
+    def get_simulation(self, jsbsim_freq=60):
+        return self.pool.get_simulation(init_conditions=HeadingControlTask.init_conditions, jsbsim_freq=jsbsim_freq)
+
+    def test_reuse_jsbsim_exec(self):
+        sim = self.get_simulation()
+        jsbsim_exec = sim.jsbsim_exec
+        sim.run()
+        sim.close()
+        self.assertEqual(len(self.pool), 1)
+
+        sim = self.get_simulation()
+        self.assertIs(sim.jsbsim_exec, jsbsim_exec, "The idle JSBSim instance was not reused")
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(sim.get_sim_time(), 0, "The JSBSim instance was not reset")
+        self.assertAlmostEqual(sim.get_property_value(c.position_h_sl_ft), 10000, delta=1)
+
+    def test_jsbsim_freq(self):
+        sim = self.get_simulation(jsbsim_freq=60)
+        sim.close()
+        sim = self.get_simulation(jsbsim_freq=120)
+        self.assertEqual(len(self.pool), 1, "A JSBSim instance with another frequency was reused")
+        self.assertAlmostEqual(sim.jsbsim_exec.get_delta_t(), 1 / 120)
+
+    def test_lru_eviction(self):
+        sims = [self.get_simulation() for _ in range(3)]
+        jsbsim_execs = [sim.jsbsim_exec for sim in sims]
+        for sim in sims:
+            sim.close()
+        self.assertEqual(len(self.pool), 2)
+        self.assertIs(self.get_simulation().jsbsim_exec, jsbsim_execs[2])
+        self.assertIs(self.get_simulation().jsbsim_exec, jsbsim_execs[1])
+        self.assertIsNot(self.get_simulation().jsbsim_exec, jsbsim_execs[0])
+
+    def test_env_with_pool(self):
+        env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0", pool=self.pool)
+        env.reset()
+        jsbsim_exec = env.sim.jsbsim_exec
+        env.step([0, 0, 0, 0.8])
+        env.reset()
+        self.assertIs(env.sim.jsbsim_exec, jsbsim_exec)
+        env.close()
+        self.assertEqual(len(self.pool), 1)
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim.simulation import Snapshot
+from gym_jsbsim.snapshot_store import SnapshotStore, PRIORITY
+
+
+def make_snapshot(i):
+    return Snapshot("A320", float(i), np.full(3, float(i)), np.arange(5, dtype=float) + i)
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def test_add_get(self):
+        store = SnapshotStore(capacity=4)
+        keys = [store.add(make_snapshot(i)) for i in range(3)]
+        self.assertEqual(len(store), 3)
+        for i, key in enumerate(keys):
+            snapshot = store.get(key)
+            self.assertEqual(snapshot.sim_time, i)
+            np.testing.assert_array_equal(snapshot.values, make_snapshot(i).values)
+        with self.assertRaises(ValueError):
+            store.add(Snapshot("A320", 0.0, np.zeros(4), np.zeros(5)))
+
+    def test_memory_budget(self):
+        store = SnapshotStore(max_bytes=1000)
+        store.add(make_snapshot(0))
+        row_bytes = 8 * (1 + 3 + 5 + 3)
+        self.assertEqual(store.capacity, 1000 // row_bytes)
+        self.assertLessEqual(sum(array.nbytes for array in store.arrays.values()), 1000)
+
+    def test_lru_eviction(self):
+        store = SnapshotStore(capacity=3)
+        keys = [store.add(make_snapshot(i)) for i in range(3)]
+        store.get(keys[0])
+        new_key = store.add(make_snapshot(3))
+        self.assertEqual(len(store), 3)
+        self.assertNotIn(keys[1], store)
+        self.assertIn(keys[0], store)
+        self.assertEqual(store.get(new_key).sim_time, 3)
+
+    def test_priority_eviction_and_sampling(self):
+        store = SnapshotStore(capacity=3, eviction=PRIORITY)
+        keys = [store.add(make_snapshot(i), priority=p) for i, p in enumerate([2.0, 0.0, 1.0])]
+        store.add(make_snapshot(3), priority=0.0)
+        self.assertNotIn(keys[1], store)
+
+        rng = np.random.default_rng(0)
+        counts = {}
+        for _ in range(300):
+            key, _ = store.sample(rng, prioritized=True)
+            counts[key] = counts.get(key, 0) + 1
+        self.assertEqual(set(counts), {keys[0], keys[2]})
+        self.assertGreater(counts[keys[0]], counts[keys[2]])
+
+    def test_remove(self):
+        store = SnapshotStore(capacity=3)
+        keys = [store.add(make_snapshot(i)) for i in range(3)]
+        store.remove(keys[0])
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.get(keys[2]).sim_time, 2)
+
+    def test_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as path:
+            store = SnapshotStore(capacity=2, path=path)
+            key = store.add(make_snapshot(1))
+            store.flush()
+            self.assertTrue(os.path.isfile(os.path.join(path, "values.npy")))
+            np.testing.assert_array_equal(np.load(os.path.join(path, "values.npy"))[0], make_snapshot(1).values)
+            self.assertEqual(store.get(key).sim_time, 1)
+            del store
+
+    def test_reset_from_snapshot(self):
+        env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        env.reset()
+        for _ in range(10):
+            env.step([0.1, -0.1, 0.0, 0.5])
+        store = SnapshotStore(capacity=8)
+        store.add(env.save_snapshot())
+        time = env.get_sim_time()
+
+        env.reset()
+        self.assertNotEqual(env.get_sim_time(), time)
+        env.reset(options={"snapshot_store": store})
+        self.assertEqual(env.get_sim_time(), time)
+        env.close()
@@ -1,4 +1,7 @@
+import subprocess
+import sys
 import unittest
+import gym
 import gym_jsbsim
 
 
@@ -27,3 +30,19 @@ class TestValidTasks(unittest.TestCase):
                 for prop, value in task.init_conditions.items():
                     self.assertGreaterEqual(value, prop.min, f"Initial value of {prop} out of bounds in {name}")
                     self.assertLessEqual(value, prop.max, f"Initial value of {prop} out of bounds in {name}")
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_import_does_not_load_tasks(self):
+        code = (
+            "import sys, gym_jsbsim; "
+            "print(sorted(m for m in sys.modules if m.endswith('_task') or m.split('.')[0] in "
+            "('jsbsim', 'shapely', 'geographiclib') or m == 'gym_jsbsim.envs.taxi_utils'))"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip().splitlines()[-1], "[]")
+
+    def test_make_imports_task(self):
+        env = gym.make("GymJsbsim-HeadingControlTask-v0")
+        self.assertIsInstance(env.unwrapped.task, gym_jsbsim.TASKS["HeadingControlTask"])
+        env.close()
@@ -0,0 +1,81 @@
+import unittest
+import random
+import numpy as np
+from shapely.geometry import Point
+import gym_jsbsim
+from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.envs.taxi_utils import taxi_path, get_bearing
+
+
+class TestTaxiPath(unittest.TestCase):
+    """
+
+    Class to test the centerline points and shortest distance computed by taxi_path against shapely and geographiclib.
+
+    """
+
+    nb_samples = 500
+
+    def setUp(self):
+        self.taxi_path = taxi_path()
+        self.random = random.Random(0)
+
+    def random_state(self):
+        i = self.random.randrange(len(self.taxi_path.centerlinepoints))
+        long, lat = self.taxi_path.centerlinepoints[i]
+        scale = self.random.choice([1e-5, 1e-4, 1e-3])
+        aircraft_loc = (long + self.random.gauss(0, scale), lat + self.random.gauss(0, scale))
+        id_path = min(max(i + self.random.randint(-2, 2), 0), len(self.taxi_path.centerlinepoints) - 1)
+        return aircraft_loc, self.random.uniform(0, 360), id_path
+
+    def test_update_path2(self):
+        centerlinepoints = self.taxi_path.centerlinepoints
+        for _ in range(self.nb_samples):
+            aircraft_loc, aircraft_heading, id_path = self.random_state()
+            output, next_point = self.taxi_path.update_path2(aircraft_loc, aircraft_heading, id_path, 8)
+
+            first = id_path + 1 if next_point else id_path
+            next_points = centerlinepoints[first : min(first + 8, len(centerlinepoints) - 1)]
+            self.assertEqual([p for p, _, _ in output], next_points)
+            for p, dist, bearing in output:
+                self.assertAlmostEqual(dist, Point(aircraft_loc).distance(Point(p)) * 100000, places=6)
+                self.assertAlmostEqual((bearing - get_bearing(aircraft_loc, p) + 180) % 360 - 180, 0, places=4)
+            self.assertAlmostEqual(
+                self.taxi_path.shortest_dist, self.taxi_path.centerline.distance(Point(aircraft_loc)) * 100000, places=6
+            )
+
+    def test_get_next_points(self):
+        aircraft_loc, aircraft_heading, id_path = self.random_state()
+        output, next_point, shortest_dist = self.taxi_path.get_next_points(aircraft_loc, aircraft_heading, id_path, 8)
+        self.assertIsNone(self.taxi_path.shortest_dist)  # the path is not modified
+        self.assertEqual((output, next_point), self.taxi_path.update_path2(aircraft_loc, aircraft_heading, id_path, 8))
+        self.assertEqual(shortest_dist, self.taxi_path.shortest_dist)
+
+    def test_batch_shortest_dists(self):
+        states = [self.random_state() for _ in range(self.nb_samples)]
+        points = np.array([aircraft_loc for aircraft_loc, _, _ in states])
+        expected = [self.taxi_path.get_shortest_dist(p, id_path) * 100000 for p, (_, _, id_path) in zip(points, states)]
+        np.testing.assert_allclose(self.taxi_path.get_shortest_dists(points), expected, rtol=1e-9, atol=1e-9)
+
+
+class TestTaxiPathPerSimulation(unittest.TestCase):
+    def test_independent_paths(self):
+        task = gym_jsbsim.TASKS["TaxiControlTask"]
+        envs = [JSBSimEnv(task) for _ in range(2)]
+        # the second aircraft follows a centerline 0.0005 deg north of the default one
+        envs[1].task.taxi_path = taxi_path(np.array(taxi_path().centerlinepoints) + [0.0, 0.0005])
+        for env in envs:
+            env.reset()
+
+        for _ in range(10):
+            for env in envs:
+                env.step([0.0, 0.2, 0.0])
+            dists = [env.sim.get_property_value(c.shortest_dist) for env in envs]
+            self.assertNotAlmostEqual(dists[0], dists[1], places=3)
+            for env, dist in zip(envs, dists):
+                loc = env.sim.get_property_values([c.position_long_gc_deg, c.position_lat_geod_deg])
+                path = env.task.taxi_path or taxi_path()
+                self.assertAlmostEqual(dist, path.get_shortest_dists([loc])[0], places=6)
+        for env in envs:
+            env.close()
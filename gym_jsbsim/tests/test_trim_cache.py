@@ -0,0 +1,110 @@
+import os
+import pickle
+import tempfile
+import unittest
+import jsbsim
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.simulation import Simulation, Snapshot
+from gym_jsbsim.trim_cache import TrimCache
+
+
+def make_snapshot(i):
+    return Snapshot("A320", 0.0, np.full(3, float(i)), np.arange(5, dtype=float) + i)
+
+
+class TestTrimCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = TrimCache(max_size=2)
+        for i in range(2):
+            cache.put(("A320", 60, i), make_snapshot(i))
+        cache.get(("A320", 60, 0))
+        cache.put(("A320", 60, 2), make_snapshot(2))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(("A320", 60, 1)))
+        self.assertEqual(cache.get(("A320", 60, 0)).state[0], 0)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = TrimCache(path=path)
+            cache.put(("A320", 60, 1), make_snapshot(1))
+            # a cache of another process, e.g. a worker
+            other = pickle.loads(pickle.dumps(cache))
+            self.assertEqual((len(other), other.path), (0, path))
+            snapshot = other.get(("A320", 60, 1))
+            np.testing.assert_array_equal(snapshot.values, make_snapshot(1).values)
+            self.assertIsNone(other.get(("A320", 60, 2)))
+
+    def test_key(self):
+        cache = TrimCache(decimals=3)
+        key = cache.get_key("A320", 60, {c.ic_h_sl_ft: 5000.0001, c.ic_psi_true_deg: 90})
+        self.assertEqual(key, cache.get_key("A320", 60, {c.ic_psi_true_deg: 90.0, c.ic_h_sl_ft: 5000.0}))
+        self.assertNotEqual(key, cache.get_key("A320", 60, {c.ic_psi_true_deg: 90, c.ic_h_sl_ft: 5000.01}))
+        self.assertNotEqual(key, cache.get_key("A320", 120, {c.ic_psi_true_deg: 90, c.ic_h_sl_ft: 5000}))
+        self.assertIn(jsbsim.__version__, key)
+
+    def test_model_key(self):
+        init_conditions = {c.ic_h_sl_ft: 5000}
+        with tempfile.TemporaryDirectory() as root_dir:
+            for filename in ["aircraft/A320/A320.xml", "engine/CFM56.xml"]:
+                os.makedirs(os.path.join(root_dir, os.path.dirname(filename)), exist_ok=True)
+                with open(os.path.join(root_dir, filename), "w") as f:
+                    f.write("<xml/>")
+            key = TrimCache().get_key("A320", 60, init_conditions, root_dir)
+            self.assertEqual(key, TrimCache().get_key("A320", 60, init_conditions, root_dir))
+            self.assertNotEqual(key, TrimCache().get_key("A320", 60, init_conditions, os.path.join(root_dir, "engine")))
+            # the states of an edited aircraft or engine are not restored
+            os.utime(os.path.join(root_dir, "engine/CFM56.xml"), ns=(0, 0))
+            self.assertNotEqual(key, TrimCache().get_key("A320", 60, init_conditions, root_dir))
+
+    def test_simulation(self):
+        task = gym_jsbsim.TASKS["HeadingControlTask"]()
+        init_conditions = task.get_initial_conditions()
+        props = task.get_observation_var()
+        cache = TrimCache()
+
+        def trajectory(sim):
+            values = []
+            for _ in range(50):
+                sim.run()
+                values.append(sim.get_property_values(props))
+            return np.array(values)
+
+        uncached = trajectory(Simulation(task.aircraft_name, init_conditions, task.jsbsim_freq))
+        expected = trajectory(Simulation(task.aircraft_name, init_conditions, task.jsbsim_freq, trim_cache=cache))
+        self.assertEqual((len(cache), cache.hits), (1, 0))
+        # the state is restored without the past derivatives of the integrators
+        np.testing.assert_allclose(expected, uncached, rtol=1e-3, atol=1e-3)
+        # another JSBSim instance restores the same state up to rounding errors
+        sim = Simulation(task.aircraft_name, init_conditions, task.jsbsim_freq, trim_cache=cache)
+        self.assertEqual(cache.hits, 1)
+        np.testing.assert_allclose(trajectory(sim), expected, rtol=1e-7, atol=1e-9)
+        sim.reset(init_conditions)
+        self.assertEqual(cache.hits, 2)
+        np.testing.assert_allclose(trajectory(sim), expected, rtol=1e-7, atol=1e-9)
+        sim.close()
+
+    def test_same_episode_on_miss_and_hit(self):
+        env = JSBSimEnv("HeadingControlTask", warm_reset=True, trim_cache=TrimCache())
+        low, high = env.task.get_action_bounds()
+        actions = np.random.default_rng(0).uniform(low, high, (100, 4))
+        episodes = []
+        for _ in range(3):
+            observations = [env.reset(seed=0)]
+            for action in actions:
+                observation, _, done, _ = env.step(action)
+                observations.append(observation)
+                if done:
+                    break
+            episodes.append(np.array(observations, dtype=float))
+        self.assertEqual((env.trim_cache.hits, env.trim_cache.misses), (2, 1))
+        for episode in episodes[1:]:
+            np.testing.assert_array_equal(episode, episodes[0])
+        env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import unittest
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.jsbsim_vector_env import JSBSimVectorEnv
+from gym_jsbsim.jsbsim_subproc_vector_env import JSBSimSubprocVectorEnv
+
+
+class TestVectorEnv(unittest.TestCase):
+    """
+
+    Class to test that JSBSimVectorEnv and its batched rewards and terminal conditions
+
+    behave as independent JSBSimEnv for all the tasks.
+
+    """
+
+    num_envs = 2
+
+    nb_steps = 60
+
+    def test_shapes(self):
+        env = JSBSimVectorEnv(gym_jsbsim.TASKS["HeadingControlTask"], num_envs=3)
+        state = env.reset()
+        self.assertEqual(state.shape, (3, 9))
+        state, reward, done, info = env.step(np.zeros((3, 4)))
+        self.assertEqual(state.shape, (3, 9))
+        self.assertEqual(reward.shape, (3,))
+        self.assertEqual(done.shape, (3,))
+        with self.assertRaises(ValueError):
+            env.step(np.zeros((2, 4)))
+        env.close()
+
+    def test_same_as_single_envs(self):
+        for name, task in gym_jsbsim.TASKS.items():
+            with self.subTest(task=name):
+                vector_env = JSBSimVectorEnv(task, num_envs=self.num_envs)
+                envs = [JSBSimEnv(task) for _ in range(self.num_envs)]
+
+                random_state = np.random.RandomState(0)
+                low, high = vector_env.action_low, vector_env.action_high
+                state = vector_env.reset()
+                np.testing.assert_allclose(state, [np.concatenate(env.reset()) for env in envs])
+
+                for _ in range(self.nb_steps):
+                    actions = random_state.uniform(low, high, size=(self.num_envs, len(low)))
+                    state, reward, done, info = vector_env.step(actions)
+                    results = [env.step(action) for env, action in zip(envs, actions)]
+
+                    np.testing.assert_allclose(reward, [r[1] for r in results], rtol=1e-12)
+                    np.testing.assert_array_equal(done, [r[2] for r in results])
+                    if done.any():
+                        expected = [np.concatenate(r[0]) for r in results if r[2]]
+                        np.testing.assert_allclose(info["terminal_observation"], expected, rtol=1e-12)
+                        break
+                    np.testing.assert_allclose(state, [np.concatenate(r[0]) for r in results], rtol=1e-12)
+
+                vector_env.close()
+                for env in envs:
+                    env.close()
+
+    def test_auto_reset(self):
+        env = JSBSimVectorEnv(gym_jsbsim.TASKS["TaxiControlTask"], num_envs=2)
+        initial_state = env.reset()
+        done = np.zeros(2, dtype=bool)
+        while not done.any():
+            state, reward, done, info = env.step(np.array([[0, 1, 0], [0, 0, 0.5]]))
+        self.assertEqual(len(info["terminal_observation"]), done.sum())
+        np.testing.assert_allclose(state[done], initial_state[done])
+        np.testing.assert_array_equal(env.get_sim_time()[done], 0)
+        env.close()
+
+    def test_terminal_conditions_of_contained_sims(self):
+        env = JSBSimVectorEnv(gym_jsbsim.TASKS["HeadingControlTask"], num_envs=3)
+        env.reset()
+        env.state[1, 0] = env.observation_high[0] + 1
+        calls = []
+
+        def is_terminal_batch(values, sims):
+            calls.append((sims, {prop: value.copy() for prop, value in values.items()}))
+            return np.array([True] + [False] * (len(sims) - 1))
+
+        env.task.is_terminal_batch = is_terminal_batch
+        values = env.get_reward_values()
+        np.testing.assert_array_equal(env.is_terminal(values), [True, True, False])
+        (sims, checked_values), = calls
+        self.assertEqual(sims, [env.sims[0], env.sims[2]])
+        for prop, value in values.items():
+            np.testing.assert_array_equal(checked_values[prop], value[[0, 2]])
+        env.close()
+
+    def test_batch_statistics_reset(self):
+        env = JSBSimVectorEnv(gym_jsbsim.TASKS["TaxiControlTask"], num_envs=3)
+        env.reset()
+        env.step(np.zeros((3, 3)))
+        env.task.nb_step_batch[:] = [5, 5, 5]
+        # the statistics of a simulation starting a new episode start again
+        env.reset_sim(1)
+        np.testing.assert_array_equal(env.task.nb_step_batch, [5, 0, 5])
+        env.close()
+
+
+class TestSubprocVectorEnv(unittest.TestCase):
+    def test_lazy_attribute(self):
+        self.assertIs(gym_jsbsim.JSBSimSubprocVectorEnv, JSBSimSubprocVectorEnv)
+
+    def test_same_as_vector_env(self):
+        task = gym_jsbsim.TASKS["TaxiapControlTask"]
+        env = JSBSimVectorEnv(task, num_envs=3)
+        subproc_env = JSBSimSubprocVectorEnv(task, num_envs=3, num_workers=2)
+        try:
+            np.testing.assert_array_equal(subproc_env.reset(), env.reset())
+            random_state = np.random.RandomState(0)
+            for _ in range(100):
+                actions = random_state.uniform(-1, 1, size=(3, 1))
+                results = env.step(actions)
+                subproc_results = subproc_env.step(actions)
+                for result, subproc_result in zip(results[:3], subproc_results[:3]):
+                    np.testing.assert_array_equal(subproc_result, result)
+                if results[2].any():
+                    np.testing.assert_array_equal(
+                        subproc_results[3]["terminal_observation"], results[3]["terminal_observation"]
+                    )
+        finally:
+            env.close()
+            subproc_env.close()
+
+    def test_task_instance(self):
+        # the workers run the task as configured, not a new instance of its class
+        task = gym_jsbsim.TASKS["HeadingControlTask"]()
+        task.define_state(task.state_var[:3])
+        env = JSBSimVectorEnv(task, num_envs=2)
+        subproc_env = JSBSimSubprocVectorEnv(task, num_envs=2, num_workers=2)
+        try:
+            self.assertEqual(subproc_env.observation_space.shape, (2, 3))
+            np.testing.assert_array_equal(subproc_env.reset(), env.reset())
+            for _ in range(10):
+                results = env.step(np.zeros((2, 4)))
+                subproc_results = subproc_env.step(np.zeros((2, 4)))
+                for result, subproc_result in zip(results[:3], subproc_results[:3]):
+                    np.testing.assert_array_equal(subproc_result, result)
+        finally:
+            env.close()
+            subproc_env.close()
+
+    def test_worker_error(self):
+        subproc_env = JSBSimSubprocVectorEnv(gym_jsbsim.TASKS["TaxiapControlTask"], num_envs=2, num_workers=2)
+        try:
+            with self.assertRaises(RuntimeError):
+                subproc_env.step()  # not reset
+        finally:
+            subproc_env.close()
+
+
+def draw_target_headings(env, sim, nb_changes):
+    """ Forces nb_changes target heading changes of HeadingControlTask and returns the new headings. """
+    headings = []
+    for _ in range(nb_changes):
+        sim.jsbsim_exec.set_sim_time(300.0)
+        sim.set_property_value(c.steady_flight, 300.0)
+        sim.set_property_value(c.target_heading_deg, sim.get_property_value(c.attitude_psi_deg))
+        env.task.is_terminal(None, sim)
+        headings.append(sim.get_property_value(c.target_heading_deg))
+    return headings
+
+
+class TestSeeding(unittest.TestCase):
+    def test_same_seed_same_episode(self):
+        task = gym_jsbsim.TASKS["HeadingControlTask"]
+        envs = [JSBSimEnv(task) for _ in range(3)]
+        headings = []
+        for env, seed in zip(envs, [1, 1, 2]):
+            env.reset(seed=seed)
+            headings.append(draw_target_headings(env, env.sim, 16))
+        self.assertEqual(headings[0], headings[1])
+        self.assertNotEqual(headings[0], headings[2])
+
+        # the stream goes on across episodes until the environment is seeded again
+        envs[0].reset()
+        self.assertNotEqual(draw_target_headings(envs[0], envs[0].sim, 16), headings[0])
+        envs[0].reset(seed=1)
+        self.assertEqual(draw_target_headings(envs[0], envs[0].sim, 16), headings[0])
+        for env in envs:
+            env.close()
+
+    def test_vector_streams(self):
+        task = gym_jsbsim.TASKS["HeadingControlTask"]
+        env = JSBSimVectorEnv(task, num_envs=3)
+        other_env = JSBSimVectorEnv(task, num_envs=3)
+        env.reset(seed=5)
+        other_env.reset(seed=5)
+        headings = [draw_target_headings(env, sim, 16) for sim in env.sims]
+        self.assertEqual(headings, [draw_target_headings(other_env, sim, 16) for sim in other_env.sims])
+        self.assertEqual(len(set(map(tuple, headings))), 3)  # independent streams
+        env.close()
+        other_env.close()
@@ -0,0 +1,177 @@
+from collections import OrderedDict
+import hashlib
+import os
+from threading import Lock, get_ident
+import jsbsim
+import numpy as np
+from gym_jsbsim.catalogs.catalog import get_catalog_file_key
+from gym_jsbsim.simulation import Snapshot
+
+
+class TrimCache:
+    """
+
+    A bounded cache of the state of the simulations just after their initial conditions were run and their engines
+
+    brought to steady state, keyed by the JSBSim version, the aircraft and the fingerprint of its model (the JSBSim
+
+    root directory and the size and modification time of its XML files, see get_catalog_file_key), the JSBSim
+
+    frequency and the initial conditions rounded to `decimals` digits. The fingerprint of a model is computed once
+
+    per cache. A simulation initialised with a key already in the cache restores the cached Snapshot
+
+    instead of running the initial conditions and the steady state solve again. On a miss, the simulation restores the
+
+    Snapshot it just added, so that its episode is the same whether the key was in the cache or not.
+
+    Initial conditions rounding to the same key share the state of the first of them: with the default rounding only
+
+    initial conditions equal to 6 digits do. The cache keeps max_size states in memory and evicts the least recently
+
+    used ones. With a path, the states are also written to .npz files of that directory, read by the caches of the
+
+    other processes (e.g. the workers of a JSBSimSubprocVectorEnv) when they are not in their memory.
+
+    """
+
+    def __init__(self, max_size=256, decimals=6, path=None):
+        """
+
+        Constructor.
+
+        :param max_size: maximum number of states kept in memory
+
+        :param decimals: number of decimals the initial conditions are rounded to in the keys
+
+        :param path: directory of the .npz files of the states, or None to keep them in memory only
+
+        """
+        self.max_size = max_size
+        self.decimals = decimals
+        self.path = path
+        self.entries = OrderedDict()  # key -> Snapshot, least recently used first
+        self.model_keys = {}  # (root directory, aircraft name) -> fingerprint of the aircraft model
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # a pickled cache, e.g. sent to a worker process, keeps its settings and shares the states through its path
+        return {"max_size": self.max_size, "decimals": self.decimals, "path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def get_key(self, aircraft_name, jsbsim_freq, init_conditions, root_dir=None):
+        """
+
+        :param aircraft_name: name of the aircraft of the simulation
+
+        :param jsbsim_freq: JSBSim integration frequency of the simulation
+
+        :param init_conditions: dict mapping properties to their initial values, or None
+
+        :param root_dir: JSBSim root directory the aircraft is loaded from, defaults to JSBSIM_ROOT_DIR
+
+        :return: tuple, the key of the state of a simulation initialised with init_conditions
+
+        """
+        root_dir = os.environ["JSBSIM_ROOT_DIR"] if root_dir is None else root_dir
+        model_key = self.model_keys.get((root_dir, aircraft_name))
+        if model_key is None:
+            model_key = self.model_keys[root_dir, aircraft_name] = get_catalog_file_key(aircraft_name, root_dir)
+        values = sorted(
+            (prop.name_jsbsim, round(float(value), self.decimals)) for prop, value in (init_conditions or {}).items()
+        )
+        # the states of another JSBSim version or aircraft model, e.g. in the files of the cache, are never restored
+        return (jsbsim.__version__, model_key, aircraft_name, jsbsim_freq, tuple(values))
+
+    def get_filename(self, key):
+        return os.path.join(self.path, f"trim-{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}.npz")
+
+    def get(self, key):
+        """
+
+        Gets the state of a key, from the memory or else from the files of the cache.
+
+        :param key: tuple, see get_key
+
+        :return: gym_jsbsim.simulation.Snapshot, or None if the key is not in the cache
+
+        """
+        with self.lock:
+            snapshot = self.entries.get(key)
+            if snapshot is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return snapshot
+        snapshot = self.load(key)
+        with self.lock:
+            if snapshot is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.add(key, snapshot)
+        return snapshot
+
+    def put(self, key, snapshot):
+        """
+
+        Adds the state of a key to the cache, and writes it to its file if the cache has a path.
+
+        :param key: tuple, see get_key
+
+        :param snapshot: gym_jsbsim.simulation.Snapshot
+
+        """
+        with self.lock:
+            self.add(key, snapshot)
+        if self.path is not None:
+            self.save(key, snapshot)
+
+    def add(self, key, snapshot):
+        self.entries[key] = snapshot
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def load(self, key):
+        if self.path is None:
+            return None
+        filename = self.get_filename(key)
+        if not os.path.exists(filename):
+            return None
+        try:
+            with np.load(filename) as data:
+                if str(data["key"]) != repr(key):
+                    return None  # hash collision
+                return Snapshot(str(data["aircraft_name"]), float(data["sim_time"]), data["state"], data["values"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, key, snapshot):
+        filename = self.get_filename(key)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # write then rename so that concurrent workers never read a partial file
+            tmp_filename = f"{filename}.{os.getpid()}.{get_ident()}.tmp.npz"
+            np.savez(
+                tmp_filename,
+                key=repr(key),
+                aircraft_name=snapshot.aircraft_name,
+                sim_time=snapshot.sim_time,
+                state=snapshot.state,
+                values=snapshot.values,
+            )
+            os.replace(tmp_filename, filename)
+        except OSError:
+            pass
+
+    def clear(self):
+        """ Empties the memory of the cache, its files are kept. """
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
@@ -98,6 +98,7 @@ if __name__ == "__main__":
                 "jsbsim-{}/aircraft/*/*.xml".format(jsbsim_version),
                 "jsbsim-{}/systems/*.xml".format(jsbsim_version),
                 "jsbsim-{}/engine/*.xml".format(jsbsim_version),
+                "amdb/AM_Asrn*",
             ]
         },
         install_requires=requirements,